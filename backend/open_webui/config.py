@@ -3,6 +3,7 @@ import logging
 import os
 import shutil
 import base64
+import time
 import redis
 
 from datetime import datetime
@@ -22,6 +23,7 @@ from open_webui.env import (
     ENV,
     REDIS_URL,
     REDIS_KEY_PREFIX,
+    REDIS_CONFIG_SYNC_INTERVAL,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
     FRONTEND_BUILD_DIR,
@@ -222,6 +224,15 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Attribute access to the PersistentConfig entries of the app.
+
+    Reads are served from the local values. When Redis is configured, every
+    write bumps a shared config version and is announced over pub/sub, which
+    marks the local values as stale on every instance; a stale (or older than
+    `sync_interval` seconds) snapshot is refreshed from Redis on the next read.
+    """
+
     _redis: Union[redis.Redis, redis.cluster.RedisCluster] = None
     _redis_key_prefix: str
 
@@ -233,7 +244,14 @@ class AppConfig:
         redis_sentinels: Optional[list] = [],
         redis_cluster: Optional[bool] = False,
         redis_key_prefix: str = "open-webui",
+        sync_interval: float = REDIS_CONFIG_SYNC_INTERVAL,
     ):
+        super().__setattr__("_state", {})
+        # Config version last loaded from Redis (-1 until the first sync)
+        super().__setattr__("_version", -1)
+        super().__setattr__("_synced_at", 0.0)
+        super().__setattr__("_sync_interval", sync_interval)
+
         if redis_url:
             super().__setattr__("_redis_key_prefix", redis_key_prefix)
             super().__setattr__(
@@ -245,8 +263,56 @@ class AppConfig:
                     decode_responses=True,
                 ),
             )
+            self._subscribe()
 
-        super().__setattr__("_state", {})
+    def _subscribe(self):
+        try:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{f"{self._redis_key_prefix}:config:updates": self._invalidate}
+            )
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            log.warning(
+                f"Unable to subscribe to config updates, falling back to polling: {e}"
+            )
+
+    def _invalidate(self, message=None):
+        super().__setattr__("_synced_at", 0.0)
+
+    def _sync(self):
+        super().__setattr__("_synced_at", time.monotonic())
+
+        try:
+            version = self._redis.get(f"{self._redis_key_prefix}:config:version")
+            if version == self._version:
+                return
+
+            keys = list(self._state.keys())
+            pipe = self._redis.pipeline()
+            for key in keys:
+                pipe.get(f"{self._redis_key_prefix}:config:{key}")
+            redis_values = pipe.execute()
+        except Exception as e:
+            log.error(f"Unable to sync config from Redis: {e}")
+            return
+
+        for key, redis_value in zip(keys, redis_values):
+            if redis_value is None:
+                continue
+
+            try:
+                decoded_value = json.loads(redis_value)
+
+                # Update the in-memory value if different
+                if self._state[key].value != decoded_value:
+                    self._state[key].value = decoded_value
+                    log.info(f"Updated {key} from Redis: {decoded_value}")
+
+            except json.JSONDecodeError:
+                log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+        super().__setattr__("_version", version)
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -258,27 +324,16 @@ class AppConfig:
             if self._redis:
                 redis_key = f"{self._redis_key_prefix}:config:{key}"
                 self._redis.set(redis_key, json.dumps(self._state[key].value))
+                self._redis.incr(f"{self._redis_key_prefix}:config:version")
+                self._redis.publish(f"{self._redis_key_prefix}:config:updates", key)
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"{self._redis_key_prefix}:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
-
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
-
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        # If Redis is available, refresh the local snapshot once it is stale
+        if self._redis and (time.monotonic() - self._synced_at >= self._sync_interval):
+            self._sync()
 
         return self._state[key].value
 
@@ -2102,6 +2157,16 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+PGVECTOR_INSERT_BATCH_SIZE = os.environ.get("PGVECTOR_INSERT_BATCH_SIZE", 1000)
+
+if PGVECTOR_INSERT_BATCH_SIZE == "":
+    PGVECTOR_INSERT_BATCH_SIZE = 1000
+else:
+    try:
+        PGVECTOR_INSERT_BATCH_SIZE = max(int(PGVECTOR_INSERT_BATCH_SIZE), 1)
+    except Exception:
+        PGVECTOR_INSERT_BATCH_SIZE = 1000
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -2531,6 +2596,51 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Maximum number of embedding batches in flight at once against the embedding API
+RAG_EMBEDDING_CONCURRENT_REQUESTS = int(
+    os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "4") or 4
+)
+
+RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "5") or 5)
+
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+
+# Least recently used embeddings are evicted past either limit (0 = unlimited)
+RAG_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "1000000") or 0
+)
+
+# In megabytes
+RAG_EMBEDDING_CACHE_MAX_SIZE = int(
+    float(os.environ.get("RAG_EMBEDDING_CACHE_MAX_SIZE", "2048") or 0) * 1024 * 1024
+)
+
+# Number of per-collection BM25 indexes kept in memory for hybrid search
+RAG_BM25_INDEX_CACHE_SIZE = int(os.environ.get("RAG_BM25_INDEX_CACHE_SIZE", "32") or 32)
+
+# Uploaded files are processed by a staged pipeline (extract -> split -> embed ->
+# store). CPU heavy parsers run in a pool of FILE_PROCESSING_EXTRACT_WORKERS
+# processes (0 = extract in threads) and chunks from several files are embedded
+# together in batches of up to FILE_PROCESSING_EMBEDDING_BATCH_SIZE.
+FILE_PROCESSING_EXTRACT_WORKERS = int(
+    os.environ.get("FILE_PROCESSING_EXTRACT_WORKERS", "") or min(os.cpu_count() or 1, 4)
+)
+
+FILE_PROCESSING_QUEUE_SIZE = int(
+    os.environ.get("FILE_PROCESSING_QUEUE_SIZE", "32") or 32
+)
+
+FILE_PROCESSING_EMBEDDING_BATCH_SIZE = int(
+    os.environ.get("FILE_PROCESSING_EMBEDDING_BATCH_SIZE", "256") or 256
+)
+
+# Files of one user processed at the same time; the rest wait their turn
+FILE_PROCESSING_MAX_CONCURRENT_PER_USER = int(
+    os.environ.get("FILE_PROCESSING_MAX_CONCURRENT_PER_USER", "8") or 8
+)
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2567,6 +2677,21 @@ RAG_EXTERNAL_RERANKER_API_KEY = PersistentConfig(
     os.environ.get("RAG_EXTERNAL_RERANKER_API_KEY", ""),
 )
 
+# Local cross-encoder pairs from concurrent requests are scored together in
+# batches of up to RAG_RERANKING_MAX_BATCH_SIZE pairs, waiting at most
+# RAG_RERANKING_MAX_LATENCY seconds for a batch to fill up
+RAG_RERANKING_MAX_BATCH_SIZE = int(
+    os.environ.get("RAG_RERANKING_MAX_BATCH_SIZE", "64") or 64
+)
+
+RAG_RERANKING_MAX_LATENCY = float(
+    os.environ.get("RAG_RERANKING_MAX_LATENCY", "0.01") or 0.01
+)
+
+RAG_RERANKING_SCORE_CACHE_SIZE = int(
+    os.environ.get("RAG_RERANKING_SCORE_CACHE_SIZE", "10000") or 0
+)
+
 
 RAG_TEXT_SPLITTER = PersistentConfig(
     "RAG_TEXT_SPLITTER",
@@ -343,6 +343,19 @@ DATABASE_ENABLE_SQLITE_WAL = (
     os.environ.get("DATABASE_ENABLE_SQLITE_WAL", "False").lower() == "true"
 )
 
+# Serve the async hot paths with aiosqlite / asyncpg when they are installed
+DATABASE_ENABLE_ASYNC_DRIVER = (
+    os.environ.get("DATABASE_ENABLE_ASYNC_DRIVER", "True").lower() == "true"
+)
+
+# Threads running queries for async callers when there is no async driver
+DATABASE_THREAD_POOL_SIZE = os.environ.get("DATABASE_THREAD_POOL_SIZE", "16")
+
+try:
+    DATABASE_THREAD_POOL_SIZE = int(DATABASE_THREAD_POOL_SIZE)
+except Exception:
+    DATABASE_THREAD_POOL_SIZE = 16
+
 DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = os.environ.get(
     "DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL", None
 )
@@ -354,6 +367,21 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Pending last_active_at timestamps are written in one bulk update per interval
+DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = os.environ.get(
+    "DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL", "5"
+)
+
+if DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL == "":
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = 5.0
+else:
+    try:
+        DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = float(
+            DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL
+        )
+    except Exception:
+        DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = 5.0
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -376,6 +404,16 @@ REDIS_KEY_PREFIX = os.environ.get("REDIS_KEY_PREFIX", "open-webui")
 REDIS_SENTINEL_HOSTS = os.environ.get("REDIS_SENTINEL_HOSTS", "")
 REDIS_SENTINEL_PORT = os.environ.get("REDIS_SENTINEL_PORT", "26379")
 
+# Maximum delay (in seconds) before a config change made on another instance is
+# picked up when the Redis pub/sub notification is missed
+REDIS_CONFIG_SYNC_INTERVAL = os.environ.get("REDIS_CONFIG_SYNC_INTERVAL", "1")
+try:
+    REDIS_CONFIG_SYNC_INTERVAL = float(REDIS_CONFIG_SYNC_INTERVAL)
+    if REDIS_CONFIG_SYNC_INTERVAL < 0:
+        REDIS_CONFIG_SYNC_INTERVAL = 1.0
+except ValueError:
+    REDIS_CONFIG_SYNC_INTERVAL = 1.0
+
 # Maximum number of retries for Redis operations when using Sentinel fail-over
 REDIS_SENTINEL_MAX_RETRY_COUNT = os.environ.get("REDIS_SENTINEL_MAX_RETRY_COUNT", "2")
 try:
@@ -530,6 +568,22 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Seconds after which loaded tools and tool server specs are checked for changes
+TOOLS_CACHE_TTL = os.environ.get("TOOLS_CACHE_TTL", "300")
+
+try:
+    TOOLS_CACHE_TTL = int(TOOLS_CACHE_TTL)
+except Exception:
+    TOOLS_CACHE_TTL = 300
+
+# Seconds for which the group ids and permissions of a user are cached
+GROUPS_CACHE_TTL = os.environ.get("GROUPS_CACHE_TTL", "10")
+
+try:
+    GROUPS_CACHE_TTL = int(GROUPS_CACHE_TTL)
+except Exception:
+    GROUPS_CACHE_TTL = 10
+
 
 ####################################
 # CHAT
@@ -550,6 +604,30 @@ else:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
 
+CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL = os.environ.get(
+    "CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL", "1"
+)
+
+if CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL == "":
+    CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL = 1.0
+else:
+    try:
+        CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL = float(CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL)
+    except Exception:
+        CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL = 1.0
+
+
+CHAT_MESSAGE_BUFFER_MAX_SIZE = os.environ.get("CHAT_MESSAGE_BUFFER_MAX_SIZE", "4096")
+
+if CHAT_MESSAGE_BUFFER_MAX_SIZE == "":
+    CHAT_MESSAGE_BUFFER_MAX_SIZE = 4096
+else:
+    try:
+        CHAT_MESSAGE_BUFFER_MAX_SIZE = int(CHAT_MESSAGE_BUFFER_MAX_SIZE)
+    except Exception:
+        CHAT_MESSAGE_BUFFER_MAX_SIZE = 4096
+
+
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
 )
@@ -586,9 +664,48 @@ try:
 except ValueError:
     WEBSOCKET_REDIS_LOCK_TIMEOUT = 60
 
+# Seconds after which a socket session of a node that stopped refreshing it expires
+websocket_session_ttl = os.environ.get("WEBSOCKET_SESSION_TTL", "60")
+
+try:
+    WEBSOCKET_SESSION_TTL = max(int(websocket_session_ttl), 3)
+except ValueError:
+    WEBSOCKET_SESSION_TTL = 60
+
 WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Number of Yjs updates after which a document's update log is merged into a snapshot
+ydoc_compaction_threshold = os.environ.get("YDOC_COMPACTION_THRESHOLD", "200")
+
+try:
+    YDOC_COMPACTION_THRESHOLD = int(ydoc_compaction_threshold)
+except ValueError:
+    YDOC_COMPACTION_THRESHOLD = 200
+
+# Background jobs (file processing, reindexing) run by each replica at once
+job_queue_concurrency = os.environ.get("JOB_QUEUE_CONCURRENCY", "16")
+
+try:
+    JOB_QUEUE_CONCURRENCY = max(int(job_queue_concurrency), 1)
+except ValueError:
+    JOB_QUEUE_CONCURRENCY = 16
+
+# Seconds after which a job whose worker stopped sending heartbeats is retried
+job_queue_lease_timeout = os.environ.get("JOB_QUEUE_LEASE_TIMEOUT", "60")
+
+try:
+    JOB_QUEUE_LEASE_TIMEOUT = max(int(job_queue_lease_timeout), 3)
+except ValueError:
+    JOB_QUEUE_LEASE_TIMEOUT = 60
+
+job_queue_max_attempts = os.environ.get("JOB_QUEUE_MAX_ATTEMPTS", "3")
+
+try:
+    JOB_QUEUE_MAX_ATTEMPTS = max(int(job_queue_max_attempts), 1)
+except ValueError:
+    JOB_QUEUE_MAX_ATTEMPTS = 3
+
 
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
@@ -605,6 +722,34 @@ AIOHTTP_CLIENT_SESSION_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_SSL", "True").lower() == "true"
 )
 
+# Shared connection pools to upstream model backends, one per origin
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT", "30"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = 30
+
+AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL", "300"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL)
+except Exception:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = 300
+
 AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST",
     os.environ.get("AIOHTTP_CLIENT_TIMEOUT_OPENAI_MODEL_LIST", "10"),
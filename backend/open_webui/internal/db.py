@@ -1,8 +1,13 @@
 import os
 import json
+import time
+import asyncio
 import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TypeVar
 
 from open_webui.internal.wrappers import register_connection
 from open_webui.env import (
@@ -15,9 +20,12 @@ from open_webui.env import (
     DATABASE_POOL_SIZE,
     DATABASE_POOL_TIMEOUT,
     DATABASE_ENABLE_SQLITE_WAL,
+    DATABASE_ENABLE_ASYNC_DRIVER,
+    DATABASE_THREAD_POOL_SIZE,
 )
 from peewee_migrate import Router
 from sqlalchemy import Dialect, create_engine, MetaData, event, types
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -27,6 +35,8 @@ from typing_extensions import Self
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["DB"])
 
+T = TypeVar("T")
+
 
 class JSONField(types.TypeDecorator):
     impl = types.Text
@@ -162,3 +172,157 @@ def get_session():
 
 
 get_db = contextmanager(get_session)
+
+
+####################
+# Async access
+####################
+
+
+def get_async_database_url(url: str) -> Optional[str]:
+    """
+    The URL of the same database for its async driver, or None when the driver
+    is not installed or the URL uses options only the sync driver understands.
+    """
+    if "?" in url or ":memory:" in url:
+        return None
+
+    for prefix, async_prefix, module in (
+        ("sqlite:///", "sqlite+aiosqlite:///", "aiosqlite"),
+        ("postgresql://", "postgresql+asyncpg://", "asyncpg"),
+    ):
+        if url.startswith(prefix):
+            if importlib.util.find_spec(module) is None:
+                return None
+            return async_prefix + url[len(prefix) :]
+
+    return None
+
+
+ASYNC_DATABASE_URL = (
+    get_async_database_url(SQLALCHEMY_DATABASE_URL)
+    if DATABASE_ENABLE_ASYNC_DRIVER
+    else None
+)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DATABASE_URL:
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(ASYNC_DATABASE_URL)
+        event.listen(async_engine.sync_engine, "connect", on_connect)
+    elif isinstance(DATABASE_POOL_SIZE, int):
+        if DATABASE_POOL_SIZE > 0:
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        else:
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL, pool_pre_ping=True, poolclass=NullPool
+            )
+    else:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+    AsyncSessionLocal = async_sessionmaker(
+        autoflush=False, bind=async_engine, expire_on_commit=False
+    )
+    log.info(f"Using the async driver {async_engine.dialect.driver}")
+
+# Runs the sessions of async callers when there is no async driver, so that
+# they neither block the event loop nor queue behind the request threadpool
+DATABASE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=DATABASE_THREAD_POOL_SIZE, thread_name_prefix="database"
+)
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run `fn(db, *args, **kwargs)` for an async caller without blocking the event
+    loop. With an async driver, `fn` gets the sync facade of an `AsyncSession`
+    (see `AsyncSession.run_sync`), otherwise a regular session on a database
+    thread, so the same query code serves the sync and the async methods.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args, **kwargs)
+
+    def run():
+        with get_db() as db:
+            return fn(db, *args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(DATABASE_EXECUTOR, run)
+
+
+####################
+# Pool metrics
+####################
+
+
+class PoolMetrics:
+    """Connection checkouts of the engine pools, reported by the telemetry gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self._stats = {}
+
+    def register(self, name: str, engine):
+        stats = self._stats[name] = {
+            "in_use": 0,
+            "checkouts": 0,
+            "connects": 0,
+            "hold_seconds": 0.0,
+        }
+        self._engines[name] = engine
+
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                stats["connects"] += 1
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checked_out_at"] = time.perf_counter()
+            with self._lock:
+                stats["in_use"] += 1
+                stats["checkouts"] += 1
+
+        def on_checkin(dbapi_connection, connection_record):
+            checked_out_at = connection_record.info.pop("checked_out_at", None)
+            if checked_out_at is None:
+                return
+
+            with self._lock:
+                stats["in_use"] -= 1
+                stats["hold_seconds"] += time.perf_counter() - checked_out_at
+
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+
+    def get_stats(self) -> dict:
+        """Connection usage per engine."""
+        with self._lock:
+            stats = {
+                name: dict(engine_stats) for name, engine_stats in self._stats.items()
+            }
+
+        for name, engine_stats in stats.items():
+            checkedin = getattr(self._engines[name].pool, "checkedin", None)
+            engine_stats["idle"] = checkedin() if checkedin else 0
+            engine_stats["avg_hold_ms"] = (
+                engine_stats["hold_seconds"] * 1000 / engine_stats["checkouts"]
+                if engine_stats["checkouts"]
+                else 0.0
+            )
+        return stats
+
+
+POOL_METRICS = PoolMetrics()
+POOL_METRICS.register("sync", engine)
+if async_engine is not None:
+    POOL_METRICS.register("async", async_engine.sync_engine)
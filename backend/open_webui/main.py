@@ -61,10 +61,12 @@ from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
 from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
-    periodic_usage_pool_cleanup,
+    periodic_socket_pool_refresh,
+    periodic_chat_message_buffer_flush,
     get_event_emitter,
     get_models_in_use,
     get_active_user_ids,
+    CHAT_MESSAGE_BUFFER,
 )
 from open_webui.routers import (
     audio,
@@ -101,7 +103,7 @@ from open_webui.routers.retrieval import (
     get_rf,
 )
 
-from open_webui.internal.db import Session, engine
+from open_webui.internal.db import async_engine, engine, get_db
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
@@ -464,6 +466,9 @@ from open_webui.utils.chat import (
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
 from open_webui.utils.access_control import has_access
+from open_webui.utils.session_pool import CLIENT_SESSION_POOL
+from open_webui.utils.ingestion import INGESTION_PIPELINE
+from open_webui.utils.jobs import JOB_QUEUE
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -471,6 +476,8 @@ from open_webui.utils.auth import (
     decode_token,
     get_admin_user,
     get_verified_user,
+    periodic_user_activity_flush,
+    USER_ACTIVITY_TRACKER,
 )
 from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import (
@@ -571,7 +578,19 @@ async def lifespan(app: FastAPI):
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
-    asyncio.create_task(periodic_usage_pool_cleanup())
+    app.state.socket_pool_refresh_task = asyncio.create_task(
+        periodic_socket_pool_refresh()
+    )
+
+    app.state.chat_message_buffer_flush_task = asyncio.create_task(
+        periodic_chat_message_buffer_flush()
+    )
+
+    app.state.user_activity_flush_task = asyncio.create_task(
+        periodic_user_activity_flush()
+    )
+
+    app.state.job_queue_task = asyncio.create_task(JOB_QUEUE.run(app))
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
@@ -599,6 +618,23 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    app.state.job_queue_task.cancel()
+    await JOB_QUEUE.shutdown()
+
+    await CLIENT_SESSION_POOL.close()
+    INGESTION_PIPELINE.close()
+
+    app.state.socket_pool_refresh_task.cancel()
+
+    app.state.chat_message_buffer_flush_task.cancel()
+    await CHAT_MESSAGE_BUFFER.flush_all()
+
+    app.state.user_activity_flush_task.cancel()
+    USER_ACTIVITY_TRACKER.flush()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1191,14 +1227,6 @@ app.add_middleware(RedirectMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 
 
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
-
-
 @app.middleware("http")
 async def check_url(request: Request, call_next):
     start_time = int(time.time())
@@ -1475,7 +1503,9 @@ async def chat_completion(
 
         if metadata.get("chat_id") and (user and user.role != "admin"):
             if metadata["chat_id"] != "local":
-                chat = Chats.get_chat_by_id_and_user_id(metadata["chat_id"], user.id)
+                chat = await Chats.get_chat_by_id_and_user_id_async(
+                    metadata["chat_id"], user.id
+                )
                 if chat is None:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
@@ -1501,7 +1531,7 @@ async def chat_completion(
             response = await chat_completion_handler(request, form_data, user)
             if metadata.get("chat_id") and metadata.get("message_id"):
                 try:
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1528,7 +1558,7 @@ async def chat_completion(
             if metadata.get("chat_id") and metadata.get("message_id"):
                 # Update the chat message with the error
                 try:
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1633,11 +1663,17 @@ async def list_tasks_endpoint(request: Request, user=Depends(get_verified_user))
     return {"tasks": await list_tasks(request.app.state.redis)}
 
 
+@app.get("/api/tasks/jobs")
+async def get_job_queue_stats(user=Depends(get_admin_user)):
+    """Queue depth and throughput of the background job queue."""
+    return JOB_QUEUE.get_stats()
+
+
 @app.get("/api/tasks/chat/{chat_id}")
 async def list_tasks_by_chat_id_endpoint(
     request: Request, chat_id: str, user=Depends(get_verified_user)
 ):
-    chat = Chats.get_chat_by_id(chat_id)
+    chat = await Chats.get_chat_by_id_async(chat_id)
     if chat is None or chat.user_id != user.id:
         return {"task_ids": []}
 
@@ -1678,7 +1714,7 @@ async def get_app_config(request: Request):
                 detail="Invalid token",
             )
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
     user_count = Users.get_num_users()
     onboarding = False
@@ -1881,7 +1917,10 @@ async def get_current_usage(user=Depends(get_verified_user)):
     This is an experimental endpoint and subject to change.
     """
     try:
-        return {"model_ids": get_models_in_use(), "user_ids": get_active_user_ids()}
+        return {
+            "model_ids": await get_models_in_use(),
+            "user_ids": await get_active_user_ids(),
+        }
     except Exception as e:
         log.error(f"Error getting usage statistics: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -2033,8 +2072,9 @@ async def healthcheck():
 
 
 @app.get("/health/db")
-async def healthcheck_with_db():
-    Session.execute(text("SELECT 1;")).all()
+def healthcheck_with_db():
+    with get_db() as db:
+        db.execute(text("SELECT 1;")).all()
     return {"status": True}
 
 
@@ -0,0 +1,142 @@
+"""Add chat_message table
+
+Revision ID: 023b9b31572b
+Revises: 38d63c18f30f
+Create Date: 2025-09-22 10:12:41.318204
+
+"""
+
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "023b9b31572b"
+down_revision: Union[str, None] = "38d63c18f30f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("id", sa.Text(), nullable=False),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "id"),
+    )
+
+    # Backfill rows from the history stored in each chat document.
+    # Shared chats are read-only snapshots and keep their messages in the document.
+    chat_table = table(
+        "chat",
+        column("id", sa.String()),
+        column("user_id", sa.String()),
+        column("chat", sa.JSON()),
+    )
+    chat_message_table = table(
+        "chat_message",
+        column("chat_id", sa.Text()),
+        column("id", sa.Text()),
+        column("parent_id", sa.Text()),
+        column("data", sa.JSON()),
+        column("created_at", sa.BigInteger()),
+        column("updated_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    chat_ids = (
+        conn.execute(
+            sa.select(chat_table.c.id).where(
+                sa.not_(chat_table.c.user_id.like("shared-%"))
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    now = int(time.time())
+    for idx in range(0, len(chat_ids), BATCH_SIZE):
+        results = conn.execute(
+            sa.select(chat_table.c.id, chat_table.c.chat).where(
+                chat_table.c.id.in_(chat_ids[idx : idx + BATCH_SIZE])
+            )
+        ).fetchall()
+
+        rows = []
+        for row in results:
+            chat = row.chat if isinstance(row.chat, dict) else {}
+            messages = chat.get("history", {}).get("messages", {}) or {}
+
+            for message_id, message in messages.items():
+                if not isinstance(message, dict):
+                    continue
+
+                rows.append(
+                    {
+                        "chat_id": row.id,
+                        "id": message_id,
+                        "parent_id": message.get("parentId"),
+                        "data": message,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+
+        if rows:
+            conn.execute(sa.insert(chat_message_table), rows)
+
+
+def downgrade() -> None:
+    # Fold the per-message rows back into the chat documents before dropping them
+    chat_table = table(
+        "chat",
+        column("id", sa.String()),
+        column("chat", sa.JSON()),
+    )
+    chat_message_table = table(
+        "chat_message",
+        column("chat_id", sa.Text()),
+        column("id", sa.Text()),
+        column("data", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    chat_ids = (
+        conn.execute(sa.select(chat_message_table.c.chat_id).distinct()).scalars().all()
+    )
+
+    for chat_id in chat_ids:
+        chat = conn.execute(
+            sa.select(chat_table.c.chat).where(chat_table.c.id == chat_id)
+        ).scalar()
+        if not isinstance(chat, dict):
+            continue
+
+        messages = {
+            row.id: row.data
+            for row in conn.execute(
+                sa.select(chat_message_table.c.id, chat_message_table.c.data).where(
+                    chat_message_table.c.chat_id == chat_id
+                )
+            )
+        }
+
+        history = chat.get("history", {})
+        chat["history"] = {
+            **history,
+            "messages": {**history.get("messages", {}), **messages},
+        }
+        conn.execute(
+            sa.update(chat_table).where(chat_table.c.id == chat_id).values(chat=chat)
+        )
+
+    op.drop_table("chat_message")
@@ -0,0 +1,42 @@
+"""Add bm25_index and bm25_index_log tables
+
+Revision ID: 4f1a9c2d7b36
+Revises: b2d6e4f80a17
+Create Date: 2025-10-10 09:12:37.418562
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4f1a9c2d7b36"
+down_revision: Union[str, None] = "b2d6e4f80a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bm25_index",
+        sa.Column("collection_name", sa.Text(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("collection_name"),
+    )
+    op.create_table(
+        "bm25_index_log",
+        sa.Column("collection_name", sa.Text(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("op", sa.Text(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("collection_name", "version"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bm25_index_log")
+    op.drop_table("bm25_index")
@@ -0,0 +1,170 @@
+"""Add chat_search table
+
+Revision ID: 5c7d1f2e9a40
+Revises: c3ee42da0161
+Create Date: 2025-10-02 09:41:27.603118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "5c7d1f2e9a40"
+down_revision: Union[str, None] = "c3ee42da0161"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Keep in sync with open_webui.models.chats
+CHAT_SEARCH_CONTENT_MAX_LENGTH = 100_000
+
+
+def get_search_content(content):
+    if not isinstance(content, str):
+        return None
+
+    content = content.replace("\x00", "").strip()
+    return content[:CHAT_SEARCH_CONTENT_MAX_LENGTH] or None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_search",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "chat_search_chat_id_message_id_idx",
+        "chat_search",
+        ["chat_id", "message_id"],
+        unique=True,
+    )
+
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        # External content FTS5 table over chat_search, kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE chat_search_fts USING fts5("
+            "content, content='chat_search', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN "
+            "INSERT INTO chat_search_fts(rowid, content) VALUES (new.id, new.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN "
+            "INSERT INTO chat_search_fts(chat_search_fts, rowid, content) "
+            "VALUES ('delete', old.id, old.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_search_au AFTER UPDATE ON chat_search BEGIN "
+            "INSERT INTO chat_search_fts(chat_search_fts, rowid, content) "
+            "VALUES ('delete', old.id, old.content); "
+            "INSERT INTO chat_search_fts(rowid, content) VALUES (new.id, new.content); "
+            "END"
+        )
+    elif conn.dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE chat_search ADD COLUMN content_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED"
+        )
+        op.execute(
+            "CREATE INDEX chat_search_content_tsv_idx "
+            "ON chat_search USING GIN (content_tsv)"
+        )
+
+    # Backfill the titles and messages of all chats except shared snapshots,
+    # preferring the chat_message rows over the copy in the chat document
+    chat_table = table(
+        "chat",
+        column("id", sa.String()),
+        column("user_id", sa.String()),
+        column("title", sa.Text()),
+        column("chat", sa.JSON()),
+    )
+    chat_message_table = table(
+        "chat_message",
+        column("chat_id", sa.Text()),
+        column("id", sa.Text()),
+        column("data", sa.JSON()),
+    )
+    chat_search_table = table(
+        "chat_search",
+        column("chat_id", sa.Text()),
+        column("message_id", sa.Text()),
+        column("content", sa.Text()),
+    )
+
+    chat_ids = (
+        conn.execute(
+            sa.select(chat_table.c.id).where(
+                sa.not_(chat_table.c.user_id.like("shared-%"))
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    for idx in range(0, len(chat_ids), BATCH_SIZE):
+        batch_ids = chat_ids[idx : idx + BATCH_SIZE]
+
+        messages_by_chat_id = {}
+        for row in conn.execute(
+            sa.select(
+                chat_message_table.c.chat_id,
+                chat_message_table.c.id,
+                chat_message_table.c.data,
+            ).where(chat_message_table.c.chat_id.in_(batch_ids))
+        ):
+            messages_by_chat_id.setdefault(row.chat_id, {})[row.id] = row.data
+
+        rows = []
+        for row in conn.execute(
+            sa.select(chat_table.c.id, chat_table.c.title, chat_table.c.chat).where(
+                chat_table.c.id.in_(batch_ids)
+            )
+        ):
+            chat = row.chat if isinstance(row.chat, dict) else {}
+            messages = chat.get("history", {}).get("messages", {}) or {}
+            if not isinstance(messages, dict):
+                messages = {}
+            messages = {**messages, **messages_by_chat_id.get(row.id, {})}
+
+            contents = {"": get_search_content(row.title)}
+            for message_id, message in messages.items():
+                if isinstance(message, dict):
+                    contents[message_id] = get_search_content(message.get("content"))
+
+            rows.extend(
+                {"chat_id": row.id, "message_id": message_id, "content": content}
+                for message_id, content in contents.items()
+                if content is not None
+            )
+
+        if rows:
+            conn.execute(sa.insert(chat_search_table), rows)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS chat_search_au")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ai")
+        op.execute("DROP TABLE IF EXISTS chat_search_fts")
+    elif conn.dialect.name == "postgresql":
+        op.drop_index("chat_search_content_tsv_idx", table_name="chat_search")
+
+    op.drop_index("chat_search_chat_id_message_id_idx", table_name="chat_search")
+    op.drop_table("chat_search")
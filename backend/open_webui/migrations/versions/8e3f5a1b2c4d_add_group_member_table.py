@@ -0,0 +1,64 @@
+"""Add group_member table
+
+Revision ID: 8e3f5a1b2c4d
+Revises: 5c7d1f2e9a40
+Create Date: 2025-10-06 16:22:05.184376
+
+"""
+
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3f5a1b2c4d"
+down_revision: Union[str, None] = "5c7d1f2e9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill the members from the user_ids of each group
+    group_table = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+    group_member_table = table(
+        "group_member",
+        column("group_id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    rows = []
+    for group in conn.execute(sa.select(group_table.c.id, group_table.c.user_ids)):
+        user_ids = group.user_ids if isinstance(group.user_ids, list) else []
+        rows.extend(
+            {"group_id": group.id, "user_id": user_id, "created_at": now}
+            for user_id in set(user_ids)
+            if isinstance(user_id, str)
+        )
+
+    if rows:
+        conn.execute(sa.insert(group_member_table), rows)
+
+
+def downgrade() -> None:
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,121 @@
+"""Add access_grant table
+
+Revision ID: b2d6e4f80a17
+Revises: 8e3f5a1b2c4d
+Create Date: 2025-10-08 11:05:49.730215
+
+"""
+
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "b2d6e4f80a17"
+down_revision: Union[str, None] = "8e3f5a1b2c4d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# resource type -> (table, id column)
+RESOURCES = {
+    "knowledge": ("knowledge", "id"),
+    "model": ("model", "id"),
+    "tool": ("tool", "id"),
+    "prompt": ("prompt", "command"),
+    "channel": ("channel", "id"),
+}
+
+
+def get_access_grants(access_control):
+    # Keep in sync with open_webui.models.access_grants
+    if access_control is None:
+        return {("read", "public", "*")}
+
+    grants = set()
+    for permission in ("read", "write"):
+        permission_access = access_control.get(permission) or {}
+        for group_id in permission_access.get("group_ids") or []:
+            grants.add((permission, "group", group_id))
+        for user_id in permission_access.get("user_ids") or []:
+            grants.add((permission, "user", user_id))
+    return grants
+
+
+def upgrade() -> None:
+    op.create_table(
+        "access_grant",
+        sa.Column("resource_type", sa.Text(), nullable=False),
+        sa.Column("resource_id", sa.Text(), nullable=False),
+        sa.Column("permission", sa.Text(), nullable=False),
+        sa.Column("principal_type", sa.Text(), nullable=False),
+        sa.Column("principal_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint(
+            "resource_type",
+            "resource_id",
+            "permission",
+            "principal_type",
+            "principal_id",
+        ),
+    )
+    op.create_index(
+        "idx_access_grant_principal",
+        "access_grant",
+        ["resource_type", "permission", "principal_type", "principal_id"],
+    )
+
+    # Backfill the grants from the access_control of every resource
+    access_grant_table = table(
+        "access_grant",
+        column("resource_type", sa.Text()),
+        column("resource_id", sa.Text()),
+        column("permission", sa.Text()),
+        column("principal_type", sa.Text()),
+        column("principal_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    for resource_type, (table_name, id_column) in RESOURCES.items():
+        resource_table = table(
+            table_name,
+            column(id_column, sa.Text()),
+            column("access_control", sa.JSON()),
+        )
+        resources = conn.execute(
+            sa.select(resource_table.c[id_column], resource_table.c.access_control)
+        ).fetchall()
+
+        rows = []
+        for resource_id, access_control in resources:
+            if access_control is not None and not isinstance(access_control, dict):
+                continue
+
+            rows.extend(
+                {
+                    "resource_type": resource_type,
+                    "resource_id": resource_id,
+                    "permission": permission,
+                    "principal_type": principal_type,
+                    "principal_id": principal_id,
+                    "created_at": now,
+                }
+                for permission, principal_type, principal_id in get_access_grants(
+                    access_control
+                )
+            )
+
+        for idx in range(0, len(rows), BATCH_SIZE):
+            conn.execute(sa.insert(access_grant_table), rows[idx : idx + BATCH_SIZE])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_access_grant_principal", table_name="access_grant")
+    op.drop_table("access_grant")
@@ -0,0 +1,135 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base
+from open_webui.env import SRC_LOG_LEVELS
+
+from sqlalchemy import BigInteger, Column, Index, Text, and_, or_, select
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# AccessGrant DB Schema
+####################
+
+
+class AccessGrant(Base):
+    __tablename__ = "access_grant"
+
+    # Mirrors the `access_control` of knowledge bases, models, tools, prompts
+    # and channels, so that listings can filter on it in SQL
+    resource_type = Column(Text, primary_key=True)
+    resource_id = Column(Text, primary_key=True)
+    permission = Column(Text, primary_key=True)  # read, write
+    principal_type = Column(Text, primary_key=True)  # user, group, public
+    principal_id = Column(Text, primary_key=True)  # "*" for public
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        # WHERE resource_type = ... AND permission = ... AND principal_type = ...
+        # AND principal_id IN (...)
+        Index(
+            "idx_access_grant_principal",
+            "resource_type",
+            "permission",
+            "principal_type",
+            "principal_id",
+        ),
+    )
+
+
+def get_access_grants(access_control: Optional[dict]) -> set[tuple[str, str, str]]:
+    """
+    Flatten an `access_control` into (permission, principal type, principal id)
+    grants with the semantics of `has_access`: resources without access control
+    can be read by everyone, otherwise only the listed users and groups have access.
+    """
+    if access_control is None:
+        return {("read", "public", "*")}
+
+    grants = set()
+    for permission in ("read", "write"):
+        permission_access = access_control.get(permission) or {}
+        for group_id in permission_access.get("group_ids") or []:
+            grants.add((permission, "group", group_id))
+        for user_id in permission_access.get("user_ids") or []:
+            grants.add((permission, "user", user_id))
+    return grants
+
+
+class AccessGrantsTable:
+    def set_access_grants(
+        self,
+        db,
+        resource_type: str,
+        resource_id: str,
+        access_control: Optional[dict],
+    ):
+        """Replace the grants of a resource as part of the caller's transaction."""
+        self.delete_access_grants(db, resource_type, resource_id)
+
+        now = int(time.time())
+        db.add_all(
+            [
+                AccessGrant(
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    permission=permission,
+                    principal_type=principal_type,
+                    principal_id=principal_id,
+                    created_at=now,
+                )
+                for permission, principal_type, principal_id in get_access_grants(
+                    access_control
+                )
+            ]
+        )
+
+    def delete_access_grants(
+        self, db, resource_type: str, resource_id: Optional[str] = None
+    ):
+        query = db.query(AccessGrant).filter_by(resource_type=resource_type)
+        if resource_id is not None:
+            query = query.filter_by(resource_id=resource_id)
+        query.delete(synchronize_session=False)
+
+    def get_access_filter(
+        self,
+        resource_type: str,
+        resource_id_column,
+        user_id: str,
+        user_group_ids: set[str],
+        permission: str = "write",
+    ):
+        """
+        Build a filter on `resource_id_column` for the resources of `resource_type`
+        that `user_id`, a member of `user_group_ids`, has `permission` on.
+        """
+        principals = [
+            AccessGrant.principal_type == "public",
+            and_(
+                AccessGrant.principal_type == "user",
+                AccessGrant.principal_id == user_id,
+            ),
+        ]
+        if user_group_ids:
+            principals.append(
+                and_(
+                    AccessGrant.principal_type == "group",
+                    AccessGrant.principal_id.in_(list(user_group_ids)),
+                )
+            )
+
+        return resource_id_column.in_(
+            select(AccessGrant.resource_id).where(
+                AccessGrant.resource_type == resource_type,
+                AccessGrant.permission == permission,
+                or_(*principals),
+            )
+        )
+
+
+AccessGrants = AccessGrantsTable()
@@ -0,0 +1,158 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, JSON, Text
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# BM25 Index DB Schema
+####################
+
+
+class BM25IndexVersion(Base):
+    __tablename__ = "bm25_index"
+
+    collection_name = Column(Text, primary_key=True)
+    # Version of the last log entry; bumped under the row lock so that entries
+    # become visible in version order
+    version = Column(BigInteger, nullable=False)
+    updated_at = Column(BigInteger, nullable=False)
+
+
+class BM25IndexLog(Base):
+    __tablename__ = "bm25_index_log"
+
+    collection_name = Column(Text, primary_key=True)
+    version = Column(BigInteger, primary_key=True)
+
+    # add: {"ids", "texts", "metadatas"}, remove: {"ids"},
+    # snapshot: like add, but replaces everything before it
+    op = Column(Text, nullable=False)
+    data = Column(JSON, nullable=False)
+
+    created_at = Column(BigInteger, nullable=False)
+
+
+class BM25IndexLogModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    collection_name: str
+    version: int
+    op: str
+    data: dict
+
+    created_at: int  # timestamp in epoch
+
+
+class BM25IndexLogsTable:
+    def get_version(self, collection_name: str) -> Optional[int]:
+        with get_db() as db:
+            return (
+                db.query(BM25IndexVersion.version)
+                .filter_by(collection_name=collection_name)
+                .scalar()
+            )
+
+    def get_collection_names(self) -> list[str]:
+        with get_db() as db:
+            return [
+                collection_name
+                for (collection_name,) in db.query(BM25IndexVersion.collection_name)
+            ]
+
+    def get_entries(
+        self, collection_name: str, after_version: int = 0
+    ) -> list[BM25IndexLogModel]:
+        with get_db() as db:
+            return [
+                BM25IndexLogModel.model_validate(entry)
+                for entry in db.query(BM25IndexLog)
+                .filter(
+                    BM25IndexLog.collection_name == collection_name,
+                    BM25IndexLog.version > after_version,
+                )
+                .order_by(BM25IndexLog.version)
+            ]
+
+    def append_entry(
+        self, collection_name: str, op: str, data: dict, attempts: int = 3
+    ) -> int:
+        """Append an entry to the log of a collection and return its version."""
+        for attempt in range(attempts):
+            with get_db() as db:
+                try:
+                    now = int(time.time())
+                    bumped = (
+                        db.query(BM25IndexVersion)
+                        .filter_by(collection_name=collection_name)
+                        .update(
+                            {
+                                "version": BM25IndexVersion.version + 1,
+                                "updated_at": now,
+                            },
+                            synchronize_session=False,
+                        )
+                    )
+                    if bumped:
+                        version = (
+                            db.query(BM25IndexVersion.version)
+                            .filter_by(collection_name=collection_name)
+                            .scalar()
+                        )
+                    else:
+                        version = 1
+                        db.add(
+                            BM25IndexVersion(
+                                collection_name=collection_name,
+                                version=version,
+                                updated_at=now,
+                            )
+                        )
+
+                    db.add(
+                        BM25IndexLog(
+                            collection_name=collection_name,
+                            version=version,
+                            op=op,
+                            data=data,
+                            created_at=now,
+                        )
+                    )
+                    db.commit()
+                    return version
+                except IntegrityError:
+                    # Another worker created the collection's first entry
+                    db.rollback()
+                    if attempt == attempts - 1:
+                        raise
+
+    def compact(self, collection_name: str, version: int, data: dict) -> bool:
+        """
+        Replace the entries up to `version` with a snapshot of the index at
+        that version. Later entries are untouched, so this is safe while
+        other workers append.
+        """
+        with get_db() as db:
+            updated = (
+                db.query(BM25IndexLog)
+                .filter_by(collection_name=collection_name, version=version)
+                .update({"op": "snapshot", "data": data}, synchronize_session=False)
+            )
+            if updated:
+                db.query(BM25IndexLog).filter(
+                    BM25IndexLog.collection_name == collection_name,
+                    BM25IndexLog.version < version,
+                ).delete(synchronize_session=False)
+            db.commit()
+            return updated == 1
+
+
+BM25IndexLogs = BM25IndexLogsTable()
@@ -3,8 +3,9 @@ import time
 import uuid
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
-from open_webui.utils.access_control import has_access
+from open_webui.internal.db import Base, get_db, run_db
+from open_webui.models.access_grants import AccessGrants
+from open_webui.models.groups import Groups
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
@@ -89,6 +90,9 @@ class ChannelTable:
             new_channel = Channel(**channel.model_dump())
 
             db.add(new_channel)
+            AccessGrants.set_access_grants(
+                db, "channel", channel.id, channel.access_control
+            )
             db.commit()
             return channel
 
@@ -97,16 +101,55 @@ class ChannelTable:
             channels = db.query(Channel).all()
             return [ChannelModel.model_validate(channel) for channel in channels]
 
+    def _get_channels_by_user_id(
+        self,
+        db,
+        user_id: str,
+        user_group_ids: set[str],
+        permission: str = "read",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[ChannelModel]:
+        query = (
+            db.query(Channel)
+            .filter(
+                or_(
+                    Channel.user_id == user_id,
+                    AccessGrants.get_access_filter(
+                        "channel", Channel.id, user_id, user_group_ids, permission
+                    ),
+                )
+            )
+            .order_by(Channel.created_at)
+        )
+
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        return [ChannelModel.model_validate(channel) for channel in query.all()]
+
     def get_channels_by_user_id(
+        self,
+        user_id: str,
+        permission: str = "read",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[ChannelModel]:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+        with get_db() as db:
+            return self._get_channels_by_user_id(
+                db, user_id, user_group_ids, permission, skip, limit
+            )
+
+    async def get_channels_by_user_id_async(
         self, user_id: str, permission: str = "read"
     ) -> list[ChannelModel]:
-        channels = self.get_channels()
-        return [
-            channel
-            for channel in channels
-            if channel.user_id == user_id
-            or has_access(user_id, permission, channel.access_control)
-        ]
+        user_group_ids = await Groups.get_group_ids_by_member_id_async(user_id)
+        return await run_db(
+            self._get_channels_by_user_id, user_id, user_group_ids, permission
+        )
 
     def get_channel_by_id(self, id: str) -> Optional[ChannelModel]:
         with get_db() as db:
@@ -126,6 +169,7 @@ class ChannelTable:
             channel.meta = form_data.meta
             channel.access_control = form_data.access_control
             channel.updated_at = int(time.time_ns())
+            AccessGrants.set_access_grants(db, "channel", id, form_data.access_control)
 
             db.commit()
             return ChannelModel.model_validate(channel) if channel else None
@@ -133,6 +177,7 @@ class ChannelTable:
     def delete_channel_by_id(self, id: str):
         with get_db() as db:
             db.query(Channel).filter(Channel.id == id).delete()
+            AccessGrants.delete_access_grants(db, "channel", id)
             db.commit()
             return True
 
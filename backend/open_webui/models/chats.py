@@ -1,19 +1,19 @@
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, run_db
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.folders import Folders
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
-from sqlalchemy import or_, func, select, and_, text
-from sqlalchemy.sql import exists
-from sqlalchemy.sql.expression import bindparam
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, Text, JSON, Index
+from sqlalchemy import or_, func, select, and_, text, literal_column
+from sqlalchemy.sql import column, exists, table
 
 ####################
 # Chat DB Schema
@@ -56,6 +56,46 @@ class Chat(Base):
     )
 
 
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    # Message ids are generated client-side and are copied verbatim when a
+    # chat is cloned or imported, so they are only unique within a chat.
+    chat_id = Column(Text, primary_key=True)
+    id = Column(Text, primary_key=True)
+
+    parent_id = Column(Text, nullable=True)
+    data = Column(JSON)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+# Longer texts are only searchable by their beginning, which also keeps
+# PostgreSQL below the size limit of a tsvector
+CHAT_SEARCH_CONTENT_MAX_LENGTH = 100_000
+
+
+class ChatSearch(Base):
+    __tablename__ = "chat_search"
+
+    # Searchable text of a chat: one row for its title (with an empty message
+    # id) and one per message. The full-text index over `content` depends on
+    # the dialect and is created by the migration: an external content FTS5
+    # table `chat_search_fts` on SQLite, a `content_tsv` column with a GIN
+    # index on PostgreSQL.
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(Text, nullable=False)
+    message_id = Column(Text, nullable=False)
+    content = Column(Text)
+
+    __table_args__ = (
+        Index(
+            "chat_search_chat_id_message_id_idx", "chat_id", "message_id", unique=True
+        ),
+    )
+
+
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -75,6 +115,19 @@ class ChatModel(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    id: str
+
+    parent_id: Optional[str] = None
+    data: dict
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
 ####################
 # Forms
 ####################
@@ -122,7 +175,162 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+class ChatSearchResponse(ChatTitleIdResponse):
+    snippet: Optional[str] = None
+
+
 class ChatTable:
+    def _get_search_content(self, content) -> Optional[str]:
+        if not isinstance(content, str):
+            return None
+
+        content = content.replace("\x00", "").strip()
+        return content[:CHAT_SEARCH_CONTENT_MAX_LENGTH] or None
+
+    def _sync_search_items(self, db, chat_id: str, contents: dict):
+        """
+        Update the `chat_search` rows of a chat from a map of message id (an
+        empty id for the title) to its searchable text, removing rows without text.
+        """
+        if not contents:
+            return
+
+        search_items = {
+            search_item.message_id: search_item
+            for search_item in db.query(ChatSearch).filter(
+                ChatSearch.chat_id == chat_id,
+                ChatSearch.message_id.in_(list(contents.keys())),
+            )
+        }
+
+        for message_id, content in contents.items():
+            search_item = search_items.get(message_id)
+            if content is None:
+                if search_item is not None:
+                    db.delete(search_item)
+            elif search_item is None:
+                db.add(
+                    ChatSearch(chat_id=chat_id, message_id=message_id, content=content)
+                )
+            elif search_item.content != content:
+                search_item.content = content
+
+    def _sync_message_items(self, db, chat_id: str, chat: dict):
+        """
+        Mirror `history.messages` of a full chat document into `chat_message`,
+        and the title and changed messages into `chat_search`.
+        """
+        search_contents = {"": self._get_search_content(chat.get("title", "New Chat"))}
+
+        messages = chat.get("history", {}).get("messages", {}) or {}
+        if not isinstance(messages, dict):
+            self._sync_search_items(db, chat_id, search_contents)
+            return
+
+        message_items = {
+            message_item.id: message_item
+            for message_item in db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+        }
+
+        now = int(time.time())
+        for message_id, message in messages.items():
+            if not isinstance(message, dict):
+                continue
+
+            message_item = message_items.pop(message_id, None)
+            if message_item is None:
+                db.add(
+                    ChatMessage(
+                        chat_id=chat_id,
+                        id=message_id,
+                        parent_id=message.get("parentId"),
+                        data=message,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                )
+            elif message_item.data != message:
+                message_item.data = message
+                message_item.parent_id = message.get("parentId")
+                message_item.updated_at = now
+            else:
+                continue
+
+            search_contents[message_id] = self._get_search_content(
+                message.get("content")
+            )
+
+        if message_items:
+            db.query(ChatMessage).filter(
+                ChatMessage.chat_id == chat_id,
+                ChatMessage.id.in_(list(message_items.keys())),
+            ).delete(synchronize_session=False)
+            search_contents.update({message_id: None for message_id in message_items})
+
+        self._sync_search_items(db, chat_id, search_contents)
+
+    def _to_chat_models(self, db, chats) -> list[ChatModel]:
+        """
+        Build chat models with `history.messages` assembled from the `chat_message`
+        rows, which take precedence over the (possibly stale) copy in the document.
+        """
+        chats = list(chats)
+        if not chats:
+            return []
+
+        messages_by_chat_id = {}
+        for message_item in db.query(ChatMessage).filter(
+            ChatMessage.chat_id.in_([chat.id for chat in chats])
+        ):
+            messages_by_chat_id.setdefault(message_item.chat_id, {})[
+                message_item.id
+            ] = message_item.data
+
+        chat_models = []
+        for chat in chats:
+            chat_model = ChatModel.model_validate(chat)
+
+            messages = messages_by_chat_id.get(chat.id)
+            if messages:
+                history = chat_model.chat.get("history", {})
+                chat_model.chat = {
+                    **chat_model.chat,
+                    "history": {
+                        **history,
+                        "messages": {**history.get("messages", {}), **messages},
+                    },
+                }
+
+            chat_models.append(chat_model)
+        return chat_models
+
+    def _to_chat_model(self, db, chat) -> Optional[ChatModel]:
+        if chat is None:
+            return None
+        return self._to_chat_models(db, [chat])[0]
+
+    def _to_chat_title_id_list(self, query) -> list[ChatTitleIdResponse]:
+        """
+        Run a chat query for the list views, which only need the id, title and
+        timestamps, so neither the chat documents nor the messages are loaded.
+        """
+        all_chats = query.with_entities(
+            Chat.id, Chat.title, Chat.updated_at, Chat.created_at
+        ).all()
+
+        # result has to be destructured from sqlalchemy `row` and mapped to a dict since the `ChatModel`is not the returned dataclass.
+        return [
+            ChatTitleIdResponse.model_validate(
+                {
+                    "id": chat[0],
+                    "title": chat[1],
+                    "updated_at": chat[2],
+                    "created_at": chat[3],
+                }
+            )
+            for chat in all_chats
+        ]
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -144,6 +352,7 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._sync_message_items(db, id, form_data.chat)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -181,6 +390,7 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._sync_message_items(db, id, form_data.chat)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -192,6 +402,7 @@ class ChatTable:
                 chat_item.chat = chat
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                self._sync_message_items(db, id, chat)
                 db.commit()
                 db.refresh(chat_item)
 
@@ -236,6 +447,13 @@ class ChatTable:
 
         return chat.chat.get("title", "New Chat")
 
+    async def get_chat_title_by_id_async(self, id: str) -> Optional[str]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        return chat.chat.get("title", "New Chat")
+
     def get_messages_map_by_chat_id(self, id: str) -> Optional[dict]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -243,59 +461,129 @@ class ChatTable:
 
         return chat.chat.get("history", {}).get("messages", {}) or {}
 
-    def get_message_by_id_and_message_id(
-        self, id: str, message_id: str
-    ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
+    async def get_messages_map_by_chat_id_async(self, id: str) -> Optional[dict]:
+        chat = await self.get_chat_by_id_async(id)
         if chat is None:
             return None
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+        return chat.chat.get("history", {}).get("messages", {}) or {}
 
-    def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
+    def _get_message_by_id_and_message_id(
+        self, db, id: str, message_id: str
+    ) -> Optional[dict]:
+        message_item = db.get(ChatMessage, (id, message_id))
+        if message_item:
+            return message_item.data
+
+        chat = self._to_chat_model(db, db.get(Chat, id))
         if chat is None:
             return None
 
+        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+
+    def get_message_by_id_and_message_id(
+        self, id: str, message_id: str
+    ) -> Optional[dict]:
+        with get_db() as db:
+            return self._get_message_by_id_and_message_id(db, id, message_id)
+
+    async def get_message_by_id_and_message_id_async(
+        self, id: str, message_id: str
+    ) -> Optional[dict]:
+        return await run_db(self._get_message_by_id_and_message_id, id, message_id)
+
+    def _upsert_message_to_chat_by_id_and_message_id(
+        self, db, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = message["content"].replace("\x00", "")
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        try:
+            now = int(time.time())
+            message_item = db.get(ChatMessage, (id, message_id))
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+            if message_item:
+                message_item.data = {**message_item.data, **message}
+                message_item.parent_id = message_item.data.get("parentId")
+                message_item.updated_at = now
 
-        history["currentId"] = message_id
+                db.query(Chat).filter_by(id=id).update({"updated_at": now})
+            else:
+                # The message has no row yet (new message, or a chat that was
+                # never normalized), so fall back to the chat document once.
+                chat_item = db.get(Chat, id)
+                if chat_item is None:
+                    return None
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                chat = chat_item.chat
+                history = chat.get("history", {})
+                messages = history.get("messages", {})
+
+                message = {**messages.get(message_id, {}), **message}
+                chat_item.chat = {
+                    **chat,
+                    "history": {
+                        **history,
+                        "messages": {**messages, message_id: message},
+                        "currentId": message_id,
+                    },
+                }
+                chat_item.updated_at = now
+
+                message_item = ChatMessage(
+                    chat_id=id,
+                    id=message_id,
+                    parent_id=message.get("parentId"),
+                    data=message,
+                    created_at=now,
+                    updated_at=now,
+                )
+                db.add(message_item)
+
+            self._sync_search_items(
+                db,
+                id,
+                {
+                    message_id: self._get_search_content(
+                        message_item.data.get("content")
+                    )
+                },
+            )
+            db.commit()
+            db.refresh(message_item)
+            return ChatMessageModel.model_validate(message_item)
+        except Exception as e:
+            log.exception(f"Error upserting message {message_id} to chat {id}: {e}")
+            return None
+
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        with get_db() as db:
+            return self._upsert_message_to_chat_by_id_and_message_id(
+                db, id, message_id, message
+            )
+
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        return await run_db(
+            self._upsert_message_to_chat_by_id_and_message_id, id, message_id, message
+        )
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+    ) -> Optional[ChatMessageModel]:
+        message = self.get_message_by_id_and_message_id(id, message_id)
+        if not message:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
-
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.upsert_message_to_chat_by_id_and_message_id(
+            id,
+            message_id,
+            {"statusHistory": [*message.get("statusHistory", []), status]},
+        )
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -305,12 +593,13 @@ class ChatTable:
             if chat.share_id:
                 return self.get_chat_by_id_and_user_id(chat.share_id, "shared")
             # Create a new chat with the same data, but with a new ID
+            # (shared snapshots keep their messages in the document only)
             shared_chat = ChatModel(
                 **{
                     "id": str(uuid.uuid4()),
                     "user_id": f"shared-{chat_id}",
                     "title": chat.title,
-                    "chat": chat.chat,
+                    "chat": self._to_chat_model(db, chat).chat,
                     "meta": chat.meta,
                     "pinned": chat.pinned,
                     "folder_id": chat.folder_id,
@@ -344,7 +633,7 @@ class ChatTable:
                     return self.insert_shared_chat_by_chat_id(chat_id)
 
                 shared_chat.title = chat.title
-                shared_chat.chat = chat.chat
+                shared_chat.chat = self._to_chat_model(db, chat).chat
                 shared_chat.meta = chat.meta
                 shared_chat.pinned = chat.pinned
                 shared_chat.folder_id = chat.folder_id
@@ -359,6 +648,11 @@ class ChatTable:
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == f"shared-{chat_id}")
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -375,7 +669,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -387,7 +681,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -399,7 +693,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -418,7 +712,7 @@ class ChatTable:
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
 
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id, archived=True)
@@ -446,8 +740,7 @@ class ChatTable:
             if limit:
                 query = query.limit(limit)
 
-            all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
 
     def get_chat_list_by_user_id(
         self,
@@ -456,7 +749,7 @@ class ChatTable:
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id)
             if not include_archived:
@@ -485,8 +778,7 @@ class ChatTable:
             if limit:
                 query = query.limit(limit)
 
-            all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -507,48 +799,40 @@ class ChatTable:
             if not include_archived:
                 query = query.filter_by(archived=False)
 
-            query = query.order_by(Chat.updated_at.desc()).with_entities(
-                Chat.id, Chat.title, Chat.updated_at, Chat.created_at
-            )
+            query = query.order_by(Chat.updated_at.desc())
 
             if skip:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
 
-            all_chats = query.all()
-
-            # result has to be destructured from sqlalchemy `row` and mapped to a dict since the `ChatModel`is not the returned dataclass.
-            return [
-                ChatTitleIdResponse.model_validate(
-                    {
-                        "id": chat[0],
-                        "title": chat[1],
-                        "updated_at": chat[2],
-                        "created_at": chat[3],
-                    }
-                )
-                for chat in all_chats
-            ]
+            return self._to_chat_title_id_list(query)
 
     def get_chat_list_by_chat_ids(
         self, chat_ids: list[str], skip: int = 0, limit: int = 50
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
-            all_chats = (
+            query = (
                 db.query(Chat)
                 .filter(Chat.id.in_(chat_ids))
                 .filter_by(archived=False)
                 .order_by(Chat.updated_at.desc())
-                .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
+
+    def _get_chat_by_id(self, db, id: str) -> Optional[ChatModel]:
+        return self._to_chat_model(db, db.get(Chat, id))
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
-                chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_by_id(db, id)
+        except Exception:
+            return None
+
+    async def get_chat_by_id_async(self, id: str) -> Optional[ChatModel]:
+        try:
+            return await run_db(self._get_chat_by_id, id)
         except Exception:
             return None
 
@@ -566,11 +850,24 @@ class ChatTable:
         except Exception:
             return None
 
+    def _get_chat_by_id_and_user_id(
+        self, db, id: str, user_id: str
+    ) -> Optional[ChatModel]:
+        chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
+        return self._to_chat_model(db, chat)
+
     def get_chat_by_id_and_user_id(self, id: str, user_id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
-                chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._get_chat_by_id_and_user_id(db, id, user_id)
+        except Exception:
+            return None
+
+    async def get_chat_by_id_and_user_id_async(
+        self, id: str, user_id: str
+    ) -> Optional[ChatModel]:
+        try:
+            return await run_db(self._get_chat_by_id_and_user_id, id, user_id)
         except Exception:
             return None
 
@@ -581,7 +878,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -590,16 +887,16 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
-    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
+    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatTitleIdResponse]:
         with get_db() as db:
-            all_chats = (
+            query = (
                 db.query(Chat)
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -608,7 +905,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -617,17 +914,16 @@ class ChatTable:
         include_archived: bool = False,
         skip: int = 0,
         limit: int = 60,
-    ) -> list[ChatModel]:
+    ) -> list[ChatSearchResponse]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Search the chats of a user with the full-text index in `chat_search`.
+        Every word has to prefix-match a word of the title or of a single
+        message; chats are ranked by their best match and come with a snippet
+        of it. The `tag:`, `folder:`, `pinned:`, `archived:` and `shared:`
+        filters are applied in the same query.
         """
         search_text = search_text.replace("\u0000", "").lower().strip()
 
-        if not search_text:
-            return self.get_chat_list_by_user_id(
-                user_id, include_archived, filter={}, skip=skip, limit=limit
-            )
-
         search_text_words = search_text.split(" ")
 
         # search_text might contain 'tag:tag_name' format so we need to extract the tag_name, split the search_text and remove the tags
@@ -678,10 +974,12 @@ class ChatTable:
             )
         ]
 
-        search_text = " ".join(search_text_words)
+        terms = re.findall(r"\w+", " ".join(search_text_words))
 
         with get_db() as db:
-            query = db.query(Chat).filter(Chat.user_id == user_id)
+            query = db.query(
+                Chat.id, Chat.title, Chat.updated_at, Chat.created_at
+            ).filter(Chat.user_id == user_id)
 
             if is_archived is not None:
                 query = query.filter(Chat.archived == is_archived)
@@ -700,26 +998,9 @@ class ChatTable:
             if folder_ids:
                 query = query.filter(Chat.folder_id.in_(folder_ids))
 
-            query = query.order_by(Chat.updated_at.desc())
-
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
             if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                sqlite_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_each(Chat.chat, '$.messages') AS message "
-                    "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
-                )
-                sqlite_content_clause = text(sqlite_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -750,23 +1031,38 @@ class ChatTable:
                         )
                     )
 
-            elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                postgres_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_array_elements(Chat.chat->'messages') AS message "
-                    "    WHERE LOWER(message->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
-                )
-                postgres_content_clause = text(postgres_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")),
-                        postgres_content_clause,
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
+                if terms:
+                    # Prefix query of all the terms. bm25 and snippet only work in
+                    # the full-text query itself, which is kept from being merged
+                    # into the aggregate; chats take the snippet of their best
+                    # (lowest) scored row from min().
+                    chat_search_fts = table("chat_search_fts", column("rowid"))
+                    matches = (
+                        select(
+                            chat_search_fts.c.rowid,
+                            literal_column("bm25(chat_search_fts)").label("rank"),
+                            literal_column(
+                                "snippet(chat_search_fts, 0, '', '', '...', 16)"
+                            ).label("snippet"),
+                        )
+                        .where(
+                            text("chat_search_fts MATCH :search_query").bindparams(
+                                search_query=" ".join(f'"{term}"*' for term in terms)
+                            )
+                        )
+                        .cte("chat_search_matches")
+                        .prefix_with("MATERIALIZED")
+                    )
+                    rank = func.min(matches.c.rank)
+                    query = (
+                        query.add_columns(rank.label("rank"), matches.c.snippet)
+                        .join(ChatSearch, ChatSearch.chat_id == Chat.id)
+                        .join(matches, matches.c.rowid == ChatSearch.id)
+                        .group_by(Chat.id)
+                        .order_by(rank, Chat.updated_at.desc())
+                    )
 
+            elif dialect_name == "postgresql":
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -796,22 +1092,73 @@ class ChatTable:
                             ]
                         )
                     )
+
+                if terms:
+                    tsquery = func.to_tsquery(
+                        "simple", " & ".join(f"'{term}':*" for term in terms)
+                    )
+                    content_tsv = literal_column("chat_search.content_tsv")
+                    rank = func.max(func.ts_rank(content_tsv, tsquery))
+                    query = (
+                        query.add_columns(rank.label("rank"))
+                        .join(ChatSearch, ChatSearch.chat_id == Chat.id)
+                        .filter(content_tsv.op("@@")(tsquery))
+                        .group_by(Chat.id)
+                        .order_by(rank.desc(), Chat.updated_at.desc())
+                    )
             else:
                 raise NotImplementedError(
                     f"Unsupported dialect: {db.bind.dialect.name}"
                 )
 
-            # Perform pagination at the SQL level
-            all_chats = query.offset(skip).limit(limit).all()
+            if not terms:
+                query = query.order_by(Chat.updated_at.desc())
 
-            log.info(f"The number of chats: {len(all_chats)}")
+            # Perform pagination at the SQL level
+            results = query.offset(skip).limit(limit).all()
+
+            log.info(f"The number of chats: {len(results)}")
+
+            snippets = {}
+            if terms and dialect_name == "sqlite":
+                snippets = {result[0]: result[5] for result in results}
+            elif terms and dialect_name == "postgresql" and results:
+                # Headlines are costly, so only build them for the returned page
+                snippets = dict(
+                    db.query(
+                        ChatSearch.chat_id,
+                        func.ts_headline(
+                            "simple",
+                            ChatSearch.content,
+                            tsquery,
+                            'StartSel="", StopSel="", MaxWords=24, MinWords=8',
+                        ),
+                    )
+                    .filter(
+                        ChatSearch.chat_id.in_([result[0] for result in results]),
+                        content_tsv.op("@@")(tsquery),
+                    )
+                    .distinct(ChatSearch.chat_id)
+                    .order_by(
+                        ChatSearch.chat_id, func.ts_rank(content_tsv, tsquery).desc()
+                    )
+                    .all()
+                )
 
-            # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatSearchResponse(
+                    id=result[0],
+                    title=result[1],
+                    updated_at=result[2],
+                    created_at=result[3],
+                    snippet=snippets.get(result[0]),
+                )
+                for result in results
+            ]
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(folder_id=folder_id, user_id=user_id)
             query = query.filter(or_(Chat.pinned == False, Chat.pinned == None))
@@ -819,8 +1166,7 @@ class ChatTable:
 
             query = query.order_by(Chat.updated_at.desc())
 
-            all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -835,7 +1181,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -848,7 +1194,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -860,7 +1206,7 @@ class ChatTable:
 
     def get_chat_list_by_user_id_and_tag_name(
         self, user_id: str, tag_name: str, skip: int = 0, limit: int = 50
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id)
             tag_id = tag_name.replace(" ", "_").lower()
@@ -885,9 +1231,7 @@ class ChatTable:
                     f"Unsupported dialect: {db.bind.dialect.name}"
                 )
 
-            all_chats = query.all()
-            log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_title_id_list(query)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -908,7 +1252,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -994,6 +1338,8 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
+                db.query(ChatSearch).filter_by(chat_id=id).delete()
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -1004,6 +1350,16 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.id == id, Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
+                db.query(ChatSearch).filter(
+                    ChatSearch.chat_id.in_(
+                        select(Chat.id).where(Chat.id == id, Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
@@ -1016,6 +1372,16 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
+                db.query(ChatSearch).filter(
+                    ChatSearch.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -1028,6 +1394,20 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(
+                            Chat.user_id == user_id, Chat.folder_id == folder_id
+                        )
+                    )
+                ).delete(synchronize_session=False)
+                db.query(ChatSearch).filter(
+                    ChatSearch.chat_id.in_(
+                        select(Chat.id).where(
+                            Chat.user_id == user_id, Chat.folder_id == folder_id
+                        )
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -1041,6 +1421,11 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id.in_(shared_chat_ids))
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
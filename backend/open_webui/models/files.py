@@ -2,7 +2,7 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import Base, JSONField, get_db, run_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
@@ -122,14 +122,23 @@ class FilesTable:
                 log.exception(f"Error inserting a new file: {e}")
                 return None
 
+    def _get_file_by_id(self, db, id: str) -> Optional[FileModel]:
+        file = db.get(File, id)
+        return FileModel.model_validate(file)
+
     def get_file_by_id(self, id: str) -> Optional[FileModel]:
         with get_db() as db:
             try:
-                file = db.get(File, id)
-                return FileModel.model_validate(file)
+                return self._get_file_by_id(db, id)
             except Exception:
                 return None
 
+    async def get_file_by_id_async(self, id: str) -> Optional[FileModel]:
+        try:
+            return await run_db(self._get_file_by_id, id)
+        except Exception:
+            return None
+
     def get_file_by_id_and_user_id(self, id: str, user_id: str) -> Optional[FileModel]:
         with get_db() as db:
             try:
@@ -141,19 +150,30 @@ class FilesTable:
             except Exception:
                 return None
 
+    def _get_file_metadata_by_id(self, db, id: str) -> Optional[FileMetadataResponse]:
+        file = db.get(File, id)
+        return FileMetadataResponse(
+            id=file.id,
+            meta=file.meta,
+            created_at=file.created_at,
+            updated_at=file.updated_at,
+        )
+
     def get_file_metadata_by_id(self, id: str) -> Optional[FileMetadataResponse]:
         with get_db() as db:
             try:
-                file = db.get(File, id)
-                return FileMetadataResponse(
-                    id=file.id,
-                    meta=file.meta,
-                    created_at=file.created_at,
-                    updated_at=file.updated_at,
-                )
+                return self._get_file_metadata_by_id(db, id)
             except Exception:
                 return None
 
+    async def get_file_metadata_by_id_async(
+        self, id: str
+    ) -> Optional[FileMetadataResponse]:
+        try:
+            return await run_db(self._get_file_metadata_by_id, id)
+        except Exception:
+            return None
+
     def get_files(self) -> list[FileModel]:
         with get_db() as db:
             return [FileModel.model_validate(file) for file in db.query(File).all()]
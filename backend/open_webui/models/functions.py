@@ -100,6 +100,13 @@ class FunctionValves(BaseModel):
 
 
 class FunctionsTable:
+    # Bumped whenever function code or valves change in this process, so that
+    # prepared filter pipelines know to reload them
+    valves_version = 0
+    # Bumped whenever a function is added, changed or removed in this
+    # process, so that the model registry knows to rebuild the model list
+    version = 0
+
     def insert_new_function(
         self, user_id: str, type: str, form_data: FunctionForm
     ) -> Optional[FunctionModel]:
@@ -119,6 +126,7 @@ class FunctionsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                self.version += 1
                 if result:
                     return FunctionModel.model_validate(result)
                 else:
@@ -166,6 +174,7 @@ class FunctionsTable:
                         db.delete(func)
 
                 db.commit()
+                self.version += 1
 
                 return [
                     FunctionModel.model_validate(func)
@@ -257,6 +266,7 @@ class FunctionsTable:
                 function.updated_at = int(time.time())
                 db.commit()
                 db.refresh(function)
+                self.valves_version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -277,6 +287,7 @@ class FunctionsTable:
                     function.updated_at = int(time.time())
                     db.commit()
                     db.refresh(function)
+                    self.version += 1
                     return self.get_function_by_id(id)
                 else:
                     return None
@@ -319,6 +330,7 @@ class FunctionsTable:
 
             # Update the user settings in the database
             Users.update_user_by_id(user_id, {"settings": user_settings})
+            self.valves_version += 1
 
             return user_settings["functions"]["valves"][id]
         except Exception as e:
@@ -337,6 +349,8 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
+                self.valves_version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -351,6 +365,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
                 return True
             except Exception:
                 return None
@@ -360,6 +375,7 @@ class FunctionsTable:
             try:
                 db.query(Function).filter_by(id=id).delete()
                 db.commit()
+                self.version += 1
 
                 return True
             except Exception:
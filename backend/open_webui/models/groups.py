@@ -4,14 +4,14 @@ import time
 from typing import Optional
 import uuid
 
-from open_webui.internal.db import Base, get_db
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.internal.db import Base, get_db, run_db
+from open_webui.env import GROUPS_CACHE_TTL, SRC_LOG_LEVELS
 
 from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,18 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    # Mirrors `Group.user_ids` for lookups by member
+    group_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (Index("group_member_user_id_idx", "user_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -92,6 +104,86 @@ class GroupUpdateForm(GroupForm, UserIdsForm):
 
 
 class GroupTable:
+    def __init__(self):
+        # user id -> (expires at, group ids, group permissions), dropped on any
+        # group change in this process and refreshed after GROUPS_CACHE_TTL
+        self._members_cache = {}
+        self._members_cache_generation = 0
+
+    def _invalidate_members_cache(self):
+        self._members_cache_generation += 1
+        self._members_cache.clear()
+
+    def _sync_group_members(self, db, id: str, user_ids: list[str]):
+        """Make the `group_member` rows of a group match its `user_ids`."""
+        member_ids = {
+            user_id
+            for (user_id,) in db.query(GroupMember.user_id).filter_by(group_id=id)
+        }
+        user_ids = set(user_ids or [])
+
+        if member_ids - user_ids:
+            db.query(GroupMember).filter(
+                GroupMember.group_id == id,
+                GroupMember.user_id.in_(list(member_ids - user_ids)),
+            ).delete(synchronize_session=False)
+
+        now = int(time.time())
+        for user_id in user_ids - member_ids:
+            db.add(GroupMember(group_id=id, user_id=user_id, created_at=now))
+
+    def _query_member_groups(self, db, user_id: str) -> list:
+        return (
+            db.query(Group.id, Group.permissions)
+            .join(GroupMember, GroupMember.group_id == Group.id)
+            .filter(GroupMember.user_id == user_id)
+            .order_by(Group.updated_at.desc())
+            .all()
+        )
+
+    def _cache_member_groups(
+        self, user_id: str, generation: int, groups: list
+    ) -> tuple[frozenset, tuple]:
+        group_ids = frozenset(group_id for group_id, _ in groups)
+        permissions = tuple(permissions or {} for _, permissions in groups)
+
+        # Don't cache what was read before a concurrent change
+        if GROUPS_CACHE_TTL > 0 and generation == self._members_cache_generation:
+            self._members_cache[user_id] = (
+                time.time() + GROUPS_CACHE_TTL,
+                group_ids,
+                permissions,
+            )
+        return group_ids, permissions
+
+    def _get_member_groups(self, user_id: str) -> tuple[frozenset, tuple]:
+        entry = self._members_cache.get(user_id)
+        if entry is not None and entry[0] > time.time():
+            return entry[1], entry[2]
+
+        generation = self._members_cache_generation
+        with get_db() as db:
+            groups = self._query_member_groups(db, user_id)
+        return self._cache_member_groups(user_id, generation, groups)
+
+    async def _get_member_groups_async(self, user_id: str) -> tuple[frozenset, tuple]:
+        entry = self._members_cache.get(user_id)
+        if entry is not None and entry[0] > time.time():
+            return entry[1], entry[2]
+
+        generation = self._members_cache_generation
+        groups = await run_db(self._query_member_groups, user_id)
+        return self._cache_member_groups(user_id, generation, groups)
+
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        return set(self._get_member_groups(user_id)[0])
+
+    async def get_group_ids_by_member_id_async(self, user_id: str) -> set[str]:
+        return set((await self._get_member_groups_async(user_id))[0])
+
+    def get_group_permissions_by_member_id(self, user_id: str) -> list[dict]:
+        return list(self._get_member_groups(user_id)[1])
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -109,8 +201,10 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._sync_group_members(db, result.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
+                self._invalidate_members_cache()
                 if result:
                     return GroupModel.model_validate(result)
                 else:
@@ -131,12 +225,8 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
@@ -167,7 +257,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._sync_group_members(db, id, form_data.user_ids)
                 db.commit()
+                self._invalidate_members_cache()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -176,8 +269,10 @@ class GroupTable:
     def delete_group_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                self._invalidate_members_cache()
                 return True
         except Exception:
             return False
@@ -185,8 +280,10 @@ class GroupTable:
     def delete_all_groups(self) -> bool:
         with get_db() as db:
             try:
+                db.query(GroupMember).delete()
                 db.query(Group).delete()
                 db.commit()
+                self._invalidate_members_cache()
 
                 return True
             except Exception:
@@ -207,6 +304,10 @@ class GroupTable:
                     )
                     db.commit()
 
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+                self._invalidate_members_cache()
+
                 return True
             except Exception:
                 return False
@@ -261,6 +362,7 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._sync_group_members(db, group.id, group.user_ids)
 
                 # Add user to new groups
                 for group in groups:
@@ -272,8 +374,10 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._sync_group_members(db, group.id, group.user_ids)
 
                 db.commit()
+                self._invalidate_members_cache()
                 return True
             except Exception as e:
                 log.exception(e)
@@ -300,8 +404,10 @@ class GroupTable:
 
                 group.user_ids = group_user_ids
                 group.updated_at = int(time.time())
+                self._sync_group_members(db, id, group_user_ids)
                 db.commit()
                 db.refresh(group)
+                self._invalidate_members_cache()
                 return GroupModel.model_validate(group)
         except Exception as e:
             log.exception(e)
@@ -329,9 +435,11 @@ class GroupTable:
 
                 group.user_ids = group_user_ids
                 group.updated_at = int(time.time())
+                self._sync_group_members(db, id, group_user_ids)
 
                 db.commit()
                 db.refresh(group)
+                self._invalidate_members_cache()
                 return GroupModel.model_validate(group)
         except Exception as e:
             log.exception(e)
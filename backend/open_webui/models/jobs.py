@@ -0,0 +1,288 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Integer, JSON, Text, and_, func, or_
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Job DB Schema
+####################
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(Text, primary_key=True)
+    type = Column(Text, nullable=False)
+    # Jobs enqueued again with the same key reuse this record
+    key = Column(Text, nullable=True, unique=True)
+    item_id = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=True)
+
+    # queued, running, completed, failed or cancelled
+    status = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    error = Column(Text, nullable=True)
+
+    worker_id = Column(Text, nullable=True)
+    lease_expires_at = Column(BigInteger, nullable=True)
+    available_at = Column(BigInteger, nullable=False)
+
+    created_at = Column(BigInteger, nullable=False)
+    updated_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("idx_job_status_available_at", "status", "available_at"),
+        Index("idx_job_item_id", "item_id"),
+    )
+
+
+class JobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    type: str
+    key: Optional[str] = None
+    item_id: Optional[str] = None
+    payload: Optional[dict] = None
+
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[int] = None  # timestamp in epoch
+    available_at: int  # timestamp in epoch
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class JobsTable:
+    def enqueue_job(
+        self,
+        type: str,
+        payload: dict,
+        key: Optional[str] = None,
+        item_id: Optional[str] = None,
+        max_attempts: int = 1,
+    ) -> JobModel:
+        """
+        Queue a job. A job with the same `key` that is still queued or running
+        is returned as is, a finished one is queued again.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            job = db.query(Job).filter_by(key=key).first() if key else None
+            if job and job.status in ("queued", "running"):
+                return JobModel.model_validate(job)
+
+            values = {
+                "type": type,
+                "item_id": item_id,
+                "payload": payload,
+                "status": "queued",
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "error": None,
+                "worker_id": None,
+                "lease_expires_at": None,
+                "available_at": now,
+                "updated_at": now,
+            }
+
+            if job:
+                for field, value in values.items():
+                    setattr(job, field, value)
+            else:
+                job = Job(id=str(uuid.uuid4()), key=key, created_at=now, **values)
+                db.add(job)
+
+            try:
+                db.commit()
+            except IntegrityError:
+                # Enqueued concurrently by another worker
+                db.rollback()
+                job = db.query(Job).filter_by(key=key).first()
+
+            return JobModel.model_validate(job)
+
+    def claim_job(
+        self, worker_id: str, lease_timeout: int, types: list[str]
+    ) -> Optional[JobModel]:
+        """
+        Lease the next due job of one of `types` to `worker_id`, including
+        running jobs whose lease expired.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            candidates = (
+                db.query(Job.id, Job.status, Job.attempts, Job.max_attempts)
+                .filter(
+                    Job.type.in_(types),
+                    or_(
+                        and_(Job.status == "queued", Job.available_at <= now),
+                        and_(Job.status == "running", Job.lease_expires_at < now),
+                    ),
+                )
+                .order_by(Job.available_at)
+                .limit(10)
+                .all()
+            )
+
+            for id, status, attempts, max_attempts in candidates:
+                # Only one worker can move a job on from the state it read
+                query = db.query(Job).filter(
+                    Job.id == id, Job.status == status, Job.attempts == attempts
+                )
+
+                if attempts >= max_attempts:
+                    # The job kept taking its workers down with it
+                    query.update(
+                        {
+                            "status": "failed",
+                            "error": "Worker stopped responding",
+                            "worker_id": None,
+                            "lease_expires_at": None,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                    db.commit()
+                    continue
+
+                claimed = query.update(
+                    {
+                        "status": "running",
+                        "attempts": attempts + 1,
+                        "worker_id": worker_id,
+                        "lease_expires_at": now + lease_timeout,
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+
+                if claimed:
+                    return JobModel.model_validate(db.get(Job, id))
+
+            return None
+
+    def _update_leased_job(self, id: str, worker_id: str, values: dict) -> bool:
+        with get_db() as db:
+            updated = (
+                db.query(Job)
+                .filter_by(id=id, worker_id=worker_id, status="running")
+                .update(
+                    {**values, "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return updated == 1
+
+    def renew_lease(self, id: str, worker_id: str, lease_timeout: int) -> bool:
+        return self._update_leased_job(
+            id, worker_id, {"lease_expires_at": int(time.time()) + lease_timeout}
+        )
+
+    def complete_job(self, id: str, worker_id: str) -> bool:
+        return self._update_leased_job(
+            id,
+            worker_id,
+            {
+                "status": "completed",
+                "error": None,
+                "worker_id": None,
+                "lease_expires_at": None,
+            },
+        )
+
+    def fail_job(
+        self, id: str, worker_id: str, error: str, retry_at: Optional[int] = None
+    ) -> bool:
+        return self._update_leased_job(
+            id,
+            worker_id,
+            {
+                "status": "queued" if retry_at is not None else "failed",
+                "error": error,
+                "worker_id": None,
+                "lease_expires_at": None,
+                **({"available_at": retry_at} if retry_at is not None else {}),
+            },
+        )
+
+    def cancel_job(self, id: str, worker_id: str) -> bool:
+        return self._update_leased_job(
+            id,
+            worker_id,
+            {
+                "status": "cancelled",
+                "error": "Stopped",
+                "worker_id": None,
+                "lease_expires_at": None,
+            },
+        )
+
+    def get_job_stats(self, window: int = 3600) -> dict:
+        with get_db() as db:
+            now = int(time.time())
+            counts = {
+                status: count
+                for status, count in db.query(Job.status, func.count(Job.id))
+                .group_by(Job.status)
+                .all()
+            }
+            finished = {
+                status: count
+                for status, count in db.query(Job.status, func.count(Job.id))
+                .filter(
+                    Job.status.in_(["completed", "failed"]),
+                    Job.updated_at >= now - window,
+                )
+                .group_by(Job.status)
+                .all()
+            }
+            oldest_queued_at = (
+                db.query(func.min(Job.available_at))
+                .filter(Job.status == "queued", Job.available_at <= now)
+                .scalar()
+            )
+
+            return {
+                "queued": counts.get("queued", 0),
+                "running": counts.get("running", 0),
+                "completed": counts.get("completed", 0),
+                "failed": counts.get("failed", 0),
+                "cancelled": counts.get("cancelled", 0),
+                "oldest_queued_seconds": (
+                    now - oldest_queued_at if oldest_queued_at is not None else 0
+                ),
+                "completed_per_minute": finished.get("completed", 0) * 60 / window,
+                "failed_per_minute": finished.get("failed", 0) * 60 / window,
+            }
+
+    def delete_completed_jobs(self, before: int) -> int:
+        with get_db() as db:
+            deleted = (
+                db.query(Job)
+                .filter(Job.status == "completed", Job.updated_at < before)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+
+
+Jobs = JobsTable()
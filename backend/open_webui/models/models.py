@@ -5,6 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
+from open_webui.models.access_grants import AccessGrants
 from open_webui.models.groups import Groups
 from open_webui.models.users import Users, UserResponse
 
@@ -16,9 +17,6 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
-
-
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
@@ -144,6 +142,10 @@ class ModelForm(BaseModel):
 
 
 class ModelsTable:
+    # Bumped whenever a model changes in this process, so that the model
+    # registry knows to reload the custom models
+    version = 0
+
     def insert_new_model(
         self, form_data: ModelForm, user_id: str
     ) -> Optional[ModelModel]:
@@ -159,8 +161,12 @@ class ModelsTable:
             with get_db() as db:
                 result = Model(**model.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "model", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
+                self.version += 1
 
                 if result:
                     return ModelModel.model_validate(result)
@@ -174,27 +180,29 @@ class ModelsTable:
         with get_db() as db:
             return [ModelModel.model_validate(model) for model in db.query(Model).all()]
 
-    def get_models(self) -> list[ModelUserResponse]:
-        with get_db() as db:
-            all_models = db.query(Model).filter(Model.base_model_id != None).all()
-
-            user_ids = list(set(model.user_id for model in all_models))
+    def _to_model_user_responses(self, all_models) -> list[ModelUserResponse]:
+        user_ids = list(set(model.user_id for model in all_models))
 
-            users = Users.get_users_by_user_ids(user_ids) if user_ids else []
-            users_dict = {user.id: user for user in users}
+        users = Users.get_users_by_user_ids(user_ids) if user_ids else []
+        users_dict = {user.id: user for user in users}
 
-            models = []
-            for model in all_models:
-                user = users_dict.get(model.user_id)
-                models.append(
-                    ModelUserResponse.model_validate(
-                        {
-                            **ModelModel.model_validate(model).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
+        models = []
+        for model in all_models:
+            user = users_dict.get(model.user_id)
+            models.append(
+                ModelUserResponse.model_validate(
+                    {
+                        **ModelModel.model_validate(model).model_dump(),
+                        "user": user.model_dump() if user else None,
+                    }
                 )
-            return models
+            )
+        return models
+
+    def get_models(self) -> list[ModelUserResponse]:
+        with get_db() as db:
+            all_models = db.query(Model).filter(Model.base_model_id != None).all()
+            return self._to_model_user_responses(all_models)
 
     def get_base_models(self) -> list[ModelModel]:
         with get_db() as db:
@@ -204,16 +212,34 @@ class ModelsTable:
             ]
 
     def get_models_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
     ) -> list[ModelUserResponse]:
-        models = self.get_models()
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user_id)}
-        return [
-            model
-            for model in models
-            if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control, user_group_ids)
-        ]
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+        with get_db() as db:
+            query = (
+                db.query(Model)
+                .filter(Model.base_model_id != None)
+                .filter(
+                    or_(
+                        Model.user_id == user_id,
+                        AccessGrants.get_access_filter(
+                            "model", Model.id, user_id, user_group_ids, permission
+                        ),
+                    )
+                )
+                .order_by(Model.updated_at.desc())
+            )
+
+            if skip:
+                query = query.offset(skip)
+            if limit:
+                query = query.limit(limit)
+
+            return self._to_model_user_responses(query.all())
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
@@ -235,6 +261,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
 
                 return self.get_model_by_id(id)
             except Exception:
@@ -249,7 +276,9 @@ class ModelsTable:
                     .filter_by(id=id)
                     .update(model.model_dump(exclude={"id"}))
                 )
+                AccessGrants.set_access_grants(db, "model", id, model.access_control)
                 db.commit()
+                self.version += 1
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -262,7 +291,9 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "model", id)
                 db.commit()
+                self.version += 1
 
                 return True
         except Exception:
@@ -272,7 +303,9 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).delete()
+                AccessGrants.delete_access_grants(db, "model")
                 db.commit()
+                self.version += 1
 
                 return True
         except Exception:
@@ -308,12 +341,18 @@ class ModelsTable:
                         )
                         db.add(new_model)
 
+                    AccessGrants.set_access_grants(
+                        db, "model", model.id, model.access_control
+                    )
+
                 # Remove models that are no longer present
                 for model in existing_models:
                     if model.id not in new_model_ids:
                         db.delete(model)
+                        AccessGrants.delete_access_grants(db, "model", model.id)
 
                 db.commit()
+                self.version += 1
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
@@ -4,7 +4,7 @@ import uuid
 from typing import Optional
 from functools import lru_cache
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, run_db
 from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 from open_webui.models.users import Users, UserResponse
@@ -136,8 +136,7 @@ class NoteTable:
         limit: Optional[int] = None,
     ) -> list[NoteModel]:
         with get_db() as db:
-            user_groups = Groups.get_groups_by_member_id(user_id)
-            user_group_ids = {group.id for group in user_groups}
+            user_group_ids = Groups.get_group_ids_by_member_id(user_id)
 
             # Order newest-first. We stream to keep memory usage low.
             query = (
@@ -178,10 +177,16 @@ class NoteTable:
 
             return results
 
+    def _get_note_by_id(self, db, id: str) -> Optional[NoteModel]:
+        note = db.query(Note).filter(Note.id == id).first()
+        return NoteModel.model_validate(note) if note else None
+
     def get_note_by_id(self, id: str) -> Optional[NoteModel]:
         with get_db() as db:
-            note = db.query(Note).filter(Note.id == id).first()
-            return NoteModel.model_validate(note) if note else None
+            return self._get_note_by_id(db, id)
+
+    async def get_note_by_id_async(self, id: str) -> Optional[NoteModel]:
+        return await run_db(self._get_note_by_id, id)
 
     def update_note_by_id(
         self, id: str, form_data: NoteUpdateForm
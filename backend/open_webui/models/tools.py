@@ -3,14 +3,13 @@ import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.models.access_grants import AccessGrants
 from open_webui.models.users import Users, UserResponse
 from open_webui.models.groups import Groups
 
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
-
-from open_webui.utils.access_control import has_access
+from sqlalchemy import BigInteger, Column, String, Text, JSON, or_
 
 
 log = logging.getLogger(__name__)
@@ -111,6 +110,10 @@ class ToolValves(BaseModel):
 
 
 class ToolsTable:
+    # Bumped whenever a tool changes in this process, so that the tool
+    # registry knows to reload it
+    version = 0
+
     def insert_new_tool(
         self, user_id: str, form_data: ToolForm, specs: list[dict]
     ) -> Optional[ToolModel]:
@@ -128,8 +131,12 @@ class ToolsTable:
             try:
                 result = Tool(**tool.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "tool", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
+                self.version += 1
                 if result:
                     return ToolModel.model_validate(result)
                 else:
@@ -146,40 +153,67 @@ class ToolsTable:
         except Exception:
             return None
 
+    def get_tool_updated_at_by_ids(self, ids: list[str]) -> dict[str, int]:
+        with get_db() as db:
+            return {
+                id: updated_at
+                for id, updated_at in db.query(Tool.id, Tool.updated_at)
+                .filter(Tool.id.in_(ids))
+                .all()
+            }
+
+    def _to_tool_user_models(self, all_tools) -> list[ToolUserModel]:
+        user_ids = list(set(tool.user_id for tool in all_tools))
+
+        users = Users.get_users_by_user_ids(user_ids) if user_ids else []
+        users_dict = {user.id: user for user in users}
+
+        tools = []
+        for tool in all_tools:
+            user = users_dict.get(tool.user_id)
+            tools.append(
+                ToolUserModel.model_validate(
+                    {
+                        **ToolModel.model_validate(tool).model_dump(),
+                        "user": user.model_dump() if user else None,
+                    }
+                )
+            )
+        return tools
+
     def get_tools(self) -> list[ToolUserModel]:
         with get_db() as db:
             all_tools = db.query(Tool).order_by(Tool.updated_at.desc()).all()
+            return self._to_tool_user_models(all_tools)
 
-            user_ids = list(set(tool.user_id for tool in all_tools))
-
-            users = Users.get_users_by_user_ids(user_ids) if user_ids else []
-            users_dict = {user.id: user for user in users}
-
-            tools = []
-            for tool in all_tools:
-                user = users_dict.get(tool.user_id)
-                tools.append(
-                    ToolUserModel.model_validate(
-                        {
-                            **ToolModel.model_validate(tool).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
+    def get_tools_by_user_id(
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[ToolUserModel]:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+        with get_db() as db:
+            query = (
+                db.query(Tool)
+                .filter(
+                    or_(
+                        Tool.user_id == user_id,
+                        AccessGrants.get_access_filter(
+                            "tool", Tool.id, user_id, user_group_ids, permission
+                        ),
                     )
                 )
-            return tools
+                .order_by(Tool.updated_at.desc())
+            )
 
-    def get_tools_by_user_id(
-        self, user_id: str, permission: str = "write"
-    ) -> list[ToolUserModel]:
-        tools = self.get_tools()
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user_id)}
+            if skip:
+                query = query.offset(skip)
+            if limit:
+                query = query.limit(limit)
 
-        return [
-            tool
-            for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control, user_group_ids)
-        ]
+            return self._to_tool_user_models(query.all())
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
         try:
@@ -197,6 +231,7 @@ class ToolsTable:
                     {"valves": valves, "updated_at": int(time.time())}
                 )
                 db.commit()
+                self.version += 1
                 return self.get_tool_by_id(id)
         except Exception:
             return None
@@ -246,13 +281,31 @@ class ToolsTable:
             )
             return None
 
+    def update_tool_content_by_id(self, id: str, content: str) -> bool:
+        """
+        Store content rewritten on load (see `replace_imports`). It behaves the
+        same, so the tool is not marked as updated and caches stay valid.
+        """
+        try:
+            with get_db() as db:
+                db.query(Tool).filter_by(id=id).update({"content": content})
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def update_tool_by_id(self, id: str, updated: dict) -> Optional[ToolModel]:
         try:
             with get_db() as db:
                 db.query(Tool).filter_by(id=id).update(
                     {**updated, "updated_at": int(time.time())}
                 )
+                if "access_control" in updated:
+                    AccessGrants.set_access_grants(
+                        db, "tool", id, updated["access_control"]
+                    )
                 db.commit()
+                self.version += 1
 
                 tool = db.query(Tool).get(id)
                 db.refresh(tool)
@@ -264,7 +317,9 @@ class ToolsTable:
         try:
             with get_db() as db:
                 db.query(Tool).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "tool", id)
                 db.commit()
+                self.version += 1
 
                 return True
         except Exception:
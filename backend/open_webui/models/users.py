@@ -1,10 +1,11 @@
+import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import Base, JSONField, get_db, run_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL, SRC_LOG_LEVELS
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
 from open_webui.utils.misc import throttle
@@ -12,10 +13,13 @@ from open_webui.utils.misc import throttle
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, Date
-from sqlalchemy import or_
+from sqlalchemy import case, or_, update
 
 import datetime
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
 ####################
 # User DB Schema
 ####################
@@ -183,19 +187,37 @@ class UsersTable:
             else:
                 return None
 
+    def _get_user_by_id(self, db, id: str) -> Optional[UserModel]:
+        user = db.query(User).filter_by(id=id).first()
+        return UserModel.model_validate(user)
+
     def get_user_by_id(self, id: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
-                user = db.query(User).filter_by(id=id).first()
-                return UserModel.model_validate(user)
+                return self._get_user_by_id(db, id)
+        except Exception:
+            return None
+
+    async def get_user_by_id_async(self, id: str) -> Optional[UserModel]:
+        try:
+            return await run_db(self._get_user_by_id, id)
         except Exception:
             return None
 
+    def _get_user_by_api_key(self, db, api_key: str) -> Optional[UserModel]:
+        user = db.query(User).filter_by(api_key=api_key).first()
+        return UserModel.model_validate(user)
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
-                user = db.query(User).filter_by(api_key=api_key).first()
-                return UserModel.model_validate(user)
+                return self._get_user_by_api_key(db, api_key)
+        except Exception:
+            return None
+
+    async def get_user_by_api_key_async(self, api_key: str) -> Optional[UserModel]:
+        try:
+            return await run_db(self._get_user_by_api_key, api_key)
         except Exception:
             return None
 
@@ -306,19 +328,28 @@ class UsersTable:
         except Exception:
             return None
 
+    def _get_user_webhook_url_by_id(self, db, id: str) -> Optional[str]:
+        user = db.query(User).filter_by(id=id).first()
+
+        if user.settings is None:
+            return None
+        else:
+            return (
+                user.settings.get("ui", {})
+                .get("notifications", {})
+                .get("webhook_url", None)
+            )
+
     def get_user_webhook_url_by_id(self, id: str) -> Optional[str]:
         try:
             with get_db() as db:
-                user = db.query(User).filter_by(id=id).first()
+                return self._get_user_webhook_url_by_id(db, id)
+        except Exception:
+            return None
 
-                if user.settings is None:
-                    return None
-                else:
-                    return (
-                        user.settings.get("ui", {})
-                        .get("notifications", {})
-                        .get("webhook_url", None)
-                    )
+    async def get_user_webhook_url_by_id_async(self, id: str) -> Optional[str]:
+        try:
+            return await run_db(self._get_user_webhook_url_by_id, id)
         except Exception:
             return None
 
@@ -361,6 +392,30 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active_by_ids(
+        self, last_active: dict[str, int]
+    ) -> Optional[int]:
+        """
+        Set last_active_at for many users with a single UPDATE statement.
+        Returns the number of updated rows, or None if the update failed.
+        """
+        if not last_active:
+            return 0
+
+        try:
+            with get_db() as db:
+                result = db.execute(
+                    update(User)
+                    .where(User.id.in_(list(last_active.keys())))
+                    .values(last_active_at=case(last_active, value=User.id))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                return result.rowcount
+        except Exception:
+            log.exception("Error updating last active timestamps")
+            return None
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
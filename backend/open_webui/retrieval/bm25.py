@@ -0,0 +1,326 @@
+import heapq
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.config import RAG_BM25_INDEX_CACHE_SIZE
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.bm25 import BM25IndexLogs
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.utils import stringify_metadata
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class BM25Index:
+    """
+    Incrementally maintained Okapi BM25 index over the chunks of one collection.
+
+    Scoring matches `rank_bm25.BM25Okapi` (used by langchain's BM25Retriever)
+    with whitespace tokenization, but documents can be added and removed
+    without re-tokenizing the corpus, and a query only touches the postings
+    of its own terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.documents = {}  # id -> (text, metadata)
+        self.doc_len = {}  # id -> number of tokens
+        self.postings = {}  # term -> {id: term frequency}
+        self.total_len = 0
+
+        self._average_idf = None
+
+    def __len__(self):
+        return len(self.documents)
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return text.split()
+
+    def add(self, ids: list[str], texts: list[str], metadatas: list[dict]):
+        self.remove([id for id in ids if id in self.documents])
+
+        for id, text, metadata in zip(ids, texts, metadatas):
+            tokens = self.tokenize(text)
+            frequencies = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+
+            for term, frequency in frequencies.items():
+                self.postings.setdefault(term, {})[id] = frequency
+
+            self.documents[id] = (text, metadata)
+            self.doc_len[id] = len(tokens)
+            self.total_len += len(tokens)
+
+        self._average_idf = None
+
+    def remove(self, ids: list[str]):
+        for id in ids:
+            if id not in self.documents:
+                continue
+
+            text, _ = self.documents.pop(id)
+            for term in set(self.tokenize(text)):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(id, None)
+                    if not postings:
+                        del self.postings[term]
+
+            self.total_len -= self.doc_len.pop(id)
+
+        self._average_idf = None
+
+    def get_ids(self, filter: dict) -> list[str]:
+        return [
+            id
+            for id, (_, metadata) in self.documents.items()
+            if all(metadata.get(key) == value for key, value in filter.items())
+        ]
+
+    def _idf(self, term: str) -> float:
+        n = len(self.postings.get(term, {}))
+        return math.log(len(self.documents) - n + 0.5) - math.log(n + 0.5)
+
+    def search(self, query: str, k: int) -> list[tuple[float, str, dict]]:
+        """Return the top `k` (score, text, metadata) matches for `query`."""
+        if not self.documents:
+            return []
+
+        if self._average_idf is None:
+            self._average_idf = sum(self._idf(term) for term in self.postings) / max(
+                len(self.postings), 1
+            )
+
+        average_len = self.total_len / len(self.documents)
+        scores = {}
+        for term in self.tokenize(query):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = self._idf(term)
+            if idf < 0:
+                idf = self.epsilon * self._average_idf
+
+            for id, frequency in postings.items():
+                scores[id] = scores.get(id, 0.0) + idf * (
+                    frequency
+                    * (self.k1 + 1)
+                    / (
+                        frequency
+                        + self.k1
+                        * (1 - self.b + self.b * self.doc_len[id] / average_len)
+                    )
+                )
+
+        return [
+            (score, *self.documents[id])
+            for id, score in heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+        ]
+
+
+class LoadedBM25Index:
+    """An index loaded up to a `version` of its log."""
+
+    def __init__(self):
+        self.index = BM25Index()
+        self.version = 0
+        self.entries = 0  # log entries replayed since the last snapshot
+        self.lock = threading.Lock()
+
+
+class BM25IndexManager:
+    """
+    Keeps the BM25Index of each collection in sync with its log in the
+    database (see `open_webui.models.bm25`), and the most recently used ones
+    in memory.
+
+    Updates append add/remove entries to the log, so they only carry the
+    changed chunks. Before every use a loaded index replays the entries that
+    any worker or replica appended since, and a snapshot entry (written when
+    a collection is deleted, rebuilt or compacted) replaces the index. A
+    collection without a log (e.g. created before this index existed) is
+    built once from the vector database.
+    """
+
+    def __init__(self, max_collections: int = 32, max_log_entries: int = 64):
+        self.max_collections = max(max_collections, 1)
+        self.max_log_entries = max_log_entries
+
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()  # collection_name -> LoadedBM25Index
+
+    @staticmethod
+    def _get_data(index: BM25Index) -> dict:
+        ids = list(index.documents.keys())
+        return {
+            "ids": ids,
+            "texts": [index.documents[id][0] for id in ids],
+            "metadatas": [index.documents[id][1] for id in ids],
+        }
+
+    def _get_entry(self, collection_name: str) -> "LoadedBM25Index":
+        with self._lock:
+            entry = self._indexes.pop(collection_name, None)
+            if entry is None:
+                entry = LoadedBM25Index()
+            self._indexes[collection_name] = entry
+
+            while len(self._indexes) > self.max_collections:
+                self._indexes.popitem(last=False)
+            return entry
+
+    def rebuild(self, collection_name: str):
+        """Replace the index of a collection with the chunks in the vector database."""
+        try:
+            version = BM25IndexLogs.get_version(collection_name) or 0
+            result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+
+            has_items = result is not None and result.ids and result.ids[0]
+            snapshot_version = BM25IndexLogs.append_entry(
+                collection_name,
+                "snapshot",
+                {
+                    "ids": result.ids[0] if has_items else [],
+                    "texts": result.documents[0] if has_items else [],
+                    "metadatas": result.metadatas[0] if has_items else [],
+                },
+            )
+
+            # Updates logged while the chunks were fetched may be missing from
+            # the snapshot; adds and removes are idempotent, so apply them again.
+            for log_entry in BM25IndexLogs.get_entries(collection_name, version):
+                if log_entry.version < snapshot_version and log_entry.op != "snapshot":
+                    BM25IndexLogs.append_entry(
+                        collection_name, log_entry.op, log_entry.data
+                    )
+
+            log.info(
+                f"Built BM25 index for {collection_name} with "
+                f"{len(result.ids[0]) if has_items else 0} chunks"
+            )
+        except Exception as e:
+            log.exception(f"Error building BM25 index for {collection_name}: {e}")
+
+    def _sync(self, collection_name: str, entry: "LoadedBM25Index"):
+        """Replay the log entries appended since the index was last synced."""
+        index, version, entries = entry.index, entry.version, entry.entries
+        if version == 0 and BM25IndexLogs.get_version(collection_name) is None:
+            self.rebuild(collection_name)
+
+        for log_entry in BM25IndexLogs.get_entries(collection_name, version):
+            data = log_entry.data
+            if log_entry.op == "snapshot":
+                index = BM25Index()
+                index.add(data["ids"], data["texts"], data["metadatas"])
+                entries = 0
+            elif log_entry.op == "add":
+                index.add(data["ids"], data["texts"], data["metadatas"])
+                entries += 1
+            elif log_entry.op == "remove":
+                index.remove(data["ids"])
+                entries += 1
+            version = log_entry.version
+
+        # Fold long logs into a snapshot so that loading stays one entry
+        if entries > self.max_log_entries:
+            BM25IndexLogs.compact(collection_name, version, self._get_data(index))
+            entries = 0
+
+        entry.index, entry.version, entry.entries = index, version, entries
+
+    def get(self, collection_name: str) -> BM25Index:
+        entry = self._get_entry(collection_name)
+        with entry.lock:
+            self._sync(collection_name, entry)
+            return entry.index
+
+    def add(self, collection_name: str, items: list[dict]):
+        if not items:
+            return
+
+        try:
+            # Load first so a missing log is built from the vector database
+            # (which already contains these items) instead of only them.
+            self.get(collection_name)
+            BM25IndexLogs.append_entry(
+                collection_name,
+                "add",
+                {
+                    "ids": [item["id"] for item in items],
+                    "texts": [item["text"] for item in items],
+                    # Stored as JSON, like the vector databases store metadata
+                    "metadatas": [
+                        stringify_metadata(dict(item["metadata"])) for item in items
+                    ],
+                },
+            )
+        except Exception as e:
+            log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+            self.rebuild(collection_name)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        try:
+            if BM25IndexLogs.get_version(collection_name) is None:
+                return
+
+            if ids is None and filter is None:
+                self.delete_collection(collection_name)
+                return
+
+            if filter is not None:
+                entry = self._get_entry(collection_name)
+                with entry.lock:
+                    self._sync(collection_name, entry)
+                    ids = [
+                        id
+                        for id in entry.index.get_ids(filter)
+                        if ids is None or id in ids
+                    ]
+
+            if ids:
+                BM25IndexLogs.append_entry(collection_name, "remove", {"ids": ids})
+        except Exception as e:
+            log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+            self.rebuild(collection_name)
+
+    def delete_collection(self, collection_name: str):
+        try:
+            if BM25IndexLogs.get_version(collection_name) is not None:
+                BM25IndexLogs.append_entry(
+                    collection_name,
+                    "snapshot",
+                    {"ids": [], "texts": [], "metadatas": []},
+                )
+        except Exception as e:
+            log.exception(f"Error deleting BM25 index for {collection_name}: {e}")
+
+    def reset(self):
+        for collection_name in BM25IndexLogs.get_collection_names():
+            self.delete_collection(collection_name)
+
+    def search(
+        self, collection_name: str, query: str, k: int
+    ) -> list[tuple[float, str, dict]]:
+        # Only searches of the same collection wait for each other
+        entry = self._get_entry(collection_name)
+        with entry.lock:
+            self._sync(collection_name, entry)
+            return entry.index.search(query, k)
+
+
+BM25_INDEXES = BM25IndexManager(max_collections=RAG_BM25_INDEX_CACHE_SIZE)
@@ -0,0 +1,230 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_EMBEDDING_CACHE_MAX_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors.
+
+    Entries are keyed by a hash of (model, prefix, text) and stored in a SQLite
+    file, so re-indexing unchanged chunks or repeating a query does not call
+    the embedding backend again. The least recently used entries are evicted
+    once the cache holds more than `max_entries` vectors or `max_size` bytes.
+
+    Hits are recorded in memory and their access times written in batches,
+    with the next write, eviction, or once `touch_interval` seconds have
+    passed, so that reads do not write to the file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 0,
+        max_size: int = 0,
+        touch_interval: float = 60,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.touch_interval = touch_interval
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._entries = 0
+        self._size = 0
+
+        self._touched = {}  # key -> last access time not yet written
+        self._touched_at = time.monotonic()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_accessed_at ON embedding (accessed_at)"
+            )
+            self._conn.commit()
+            self._refresh_usage()
+        return self._conn
+
+    def _refresh_usage(self):
+        self._entries, self._size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embedding"
+        ).fetchone()
+
+    @staticmethod
+    def get_key(model: str, prefix: Optional[str], text: str) -> str:
+        return hashlib.sha256(
+            "\x00".join([model, prefix or "", text]).encode("utf-8")
+        ).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors for `keys`, recording the hits for LRU."""
+        if not keys:
+            return {}
+
+        results = {}
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                unique_keys = list(dict.fromkeys(keys))
+                for idx in range(0, len(unique_keys), 500):
+                    batch = unique_keys[idx : idx + 500]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embedding WHERE key IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+                    for key, vector in rows:
+                        results[key] = array("d", vector).tolist()
+
+                now = time.time()
+                for key in results:
+                    self._touched[key] = now
+
+                if (
+                    self._touched
+                    and time.monotonic() - self._touched_at >= self.touch_interval
+                ):
+                    self._write_touched()
+                    conn.commit()
+        except Exception as e:
+            log.exception(f"Error reading from embedding cache: {e}")
+
+        hits = sum(1 for key in keys if key in results)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return results
+
+    def set_many(self, items: dict[str, list[float]]):
+        if not items:
+            return
+
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                now = time.time()
+                rows = []
+                for key, vector in items.items():
+                    blob = array("d", vector).tobytes()
+                    rows.append((key, blob, len(blob), now))
+
+                self._write_touched()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding (key, vector, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+
+                self._entries += len(rows)
+                self._size += sum(row[2] for row in rows)
+                if (self.max_entries and self._entries > self.max_entries) or (
+                    self.max_size and self._size > self.max_size
+                ):
+                    self._evict()
+        except Exception as e:
+            log.exception(f"Error writing to embedding cache: {e}")
+
+    def _write_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embedding SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def _evict(self):
+        # Other workers share the file, so start from the actual usage
+        self._refresh_usage()
+
+        # Evict down to 90% of the limits so that eviction does not run on every write
+        target_entries = int(self.max_entries * 0.9) if self.max_entries else None
+        target_size = int(self.max_size * 0.9) if self.max_size else None
+
+        evict_entries = (
+            max(self._entries - target_entries, 0) if target_entries is not None else 0
+        )
+        if target_size is not None and self._size > target_size:
+            excess = self._size - target_size
+            rows = self._conn.execute(
+                "SELECT size FROM embedding ORDER BY accessed_at LIMIT ?",
+                (self._entries,),
+            )
+            count = 0
+            for (size,) in rows:
+                if excess <= 0:
+                    break
+                excess -= size
+                count += 1
+            evict_entries = max(evict_entries, count)
+
+        if evict_entries:
+            self._conn.execute(
+                "DELETE FROM embedding WHERE key IN (SELECT key FROM embedding ORDER BY accessed_at LIMIT ?)",
+                (evict_entries,),
+            )
+            self._conn.commit()
+            self._refresh_usage()
+            log.debug(f"Evicted {evict_entries} entries from the embedding cache")
+
+    def clear(self):
+        with self._lock:
+            conn = self._get_conn()
+            self._touched = {}
+            conn.execute("DELETE FROM embedding")
+            conn.commit()
+            self._refresh_usage()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            if self._conn is not None:
+                self._refresh_usage()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": self._entries,
+            "size": self._size,
+        }
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(
+        CACHE_DIR / "embeddings" / "embeddings.db",
+        max_entries=RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+        max_size=RAG_EMBEDDING_CACHE_MAX_SIZE,
+    )
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
@@ -224,6 +224,23 @@ class DoclingLoader:
             raise Exception(f"Error calling Docling: {error_msg}")
 
 
+# Loaders that parse documents in-process, as opposed to plain text and the
+# remote extraction engines
+CPU_BOUND_LOADERS = (
+    PyPDFLoader,
+    CSVLoader,
+    BSHTMLLoader,
+    Docx2txtLoader,
+    OutlookMessageLoader,
+    UnstructuredEPubLoader,
+    UnstructuredExcelLoader,
+    UnstructuredODTLoader,
+    UnstructuredPowerPointLoader,
+    UnstructuredRSTLoader,
+    UnstructuredXMLLoader,
+)
+
+
 class Loader:
     def __init__(self, engine: str = "", **kwargs):
         self.engine = engine
@@ -242,6 +259,15 @@ class Loader:
             for doc in docs
         ]
 
+    def is_cpu_bound(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> bool:
+        """Whether the file is parsed locally by a CPU heavy loader (PDF, Office, ...)."""
+        return isinstance(
+            self._get_loader(filename, file_content_type, file_path),
+            CPU_BOUND_LOADERS,
+        )
+
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
             file_content_type
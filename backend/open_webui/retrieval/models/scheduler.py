@@ -0,0 +1,169 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Tuple
+
+import numpy as np
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.misc import calculate_sha256_string
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class RerankScheduler:
+    """
+    Shares one local cross-encoder between concurrent requests.
+
+    (query, passage) pairs submitted from any thread are queued and scored by
+    a single worker in batches: a batch is run once it holds `max_batch_size`
+    pairs or its oldest request has waited `max_latency` seconds, and each
+    caller gets its own slice of the scores back through a future. Scores of
+    recently seen (query, passage) pairs are served from an LRU cache.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 64,
+        max_latency: float = 0.01,
+        cache_size: int = 10000,
+        idle_timeout: float = 60,
+    ):
+        self.model = model
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_latency = max_latency
+        self.cache_size = cache_size
+        self.idle_timeout = idle_timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._cache = OrderedDict()
+
+        self.queue_depth = 0
+        self.batches = 0
+        self.batched_pairs = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def submit(self, sentences: List[Tuple[str, str]]) -> Future:
+        future = Future()
+        self._queue.put((sentences, future))
+
+        with self._lock:
+            self.queue_depth += len(sentences)
+            if self._worker is None:
+                # The worker exits when idle so a replaced model can be released
+                self._worker = threading.Thread(
+                    target=self._run, name="rerank-scheduler", daemon=True
+                )
+                self._worker.start()
+
+        return future
+
+    def predict(self, sentences: List[Tuple[str, str]]) -> np.ndarray:
+        query_hashes = {}
+        keys = []
+        for query, passage in sentences:
+            if query not in query_hashes:
+                query_hashes[query] = calculate_sha256_string(query)
+            keys.append((query_hashes[query], calculate_sha256_string(passage)))
+
+        scores = np.empty(len(sentences), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for idx, key in enumerate(keys):
+                score = self._cache.get(key)
+                if score is None:
+                    missing.append(idx)
+                else:
+                    self._cache.move_to_end(key)
+                    scores[idx] = score
+
+            self.cache_hits += len(sentences) - len(missing)
+            self.cache_misses += len(missing)
+
+        if missing:
+            scores[missing] = self.submit([sentences[idx] for idx in missing]).result()
+
+            if self.cache_size > 0:
+                with self._lock:
+                    for idx in missing:
+                        self._cache[keys[idx]] = float(scores[idx])
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        return scores
+
+    def _run(self):
+        while True:
+            try:
+                requests = [self._queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.max_latency
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            self._run_batch(requests, size)
+
+    def _run_batch(self, requests: list, size: int):
+        with self._lock:
+            self.queue_depth -= size
+            self.batches += 1
+            self.batched_pairs += size
+            queue_depth = self.queue_depth
+
+        log.debug(
+            f"Reranking {size} pairs from {len(requests)} requests "
+            f"(batch fill {size / self.max_batch_size:.0%}, queue depth {queue_depth})"
+        )
+
+        try:
+            scores = np.asarray(
+                self.model.predict(
+                    [pair for sentences, _ in requests for pair in sentences]
+                )
+            ).reshape(-1)
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for sentences, future in requests:
+            future.set_result(scores[offset : offset + len(sentences)])
+            offset += len(sentences)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "batches": self.batches,
+                "batch_fill_ratio": (
+                    self.batched_pairs / (self.batches * self.max_batch_size)
+                    if self.batches
+                    else 0.0
+                ),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
@@ -1,20 +1,25 @@
+import asyncio
 import logging
 import os
+import random
+import threading
 from typing import Optional, Union
 
-import requests
-import hashlib
+import aiohttp
+import numpy as np
 from concurrent.futures import ThreadPoolExecutor
-import time
 
 from urllib.parse import quote
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
+from open_webui.retrieval.cache import EMBEDDING_CACHE
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.models.scheduler import RerankScheduler
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
@@ -25,18 +30,24 @@ from open_webui.models.notes import Notes
 
 from open_webui.retrieval.vector.main import GetResult
 from open_webui.utils.access_control import has_access
-from open_webui.utils.misc import get_message_list
+from open_webui.utils.misc import get_message_list, calculate_sha256_string
 
 
 from open_webui.env import (
     SRC_LOG_LEVELS,
     OFFLINE_MODE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    AIOHTTP_CLIENT_TIMEOUT,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_MAX_RETRIES,
+    RAG_RERANKING_MAX_BATCH_SIZE,
+    RAG_RERANKING_MAX_LATENCY,
+    RAG_RERANKING_SCORE_CACHE_SIZE,
 )
 
 log = logging.getLogger(__name__)
@@ -81,6 +92,24 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25SearchRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return [
+            Document(metadata=metadata, page_content=text)
+            for _, text, metadata in BM25_INDEXES.search(
+                self.collection_name, query, self.top_k
+            )
+        ]
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -117,7 +146,6 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
     query: str,
     embedding_function,
     k: int,
@@ -127,23 +155,16 @@ def query_doc_with_hybrid_search(
     hybrid_bm25_weight: float,
 ) -> dict:
     try:
-        if (
-            not collection_result
-            or not hasattr(collection_result, "documents")
-            or not collection_result.documents
-            or len(collection_result.documents) == 0
-            or not collection_result.documents[0]
-        ):
+        if len(BM25_INDEXES.get(collection_name)) == 0:
             log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
             return {"documents": [], "metadatas": [], "distances": []}
 
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
+        bm25_retriever = BM25SearchRetriever(
+            collection_name=collection_name,
+            top_k=k,
         )
-        bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -227,44 +248,103 @@ def merge_get_results(get_results: list[dict]) -> dict:
     return result
 
 
-def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
-    # Initialize lists to store combined data
-    combined = dict()  # To store documents with unique document hashes
-
-    for data in query_results:
-        distances = data["distances"][0]
-        documents = data["documents"][0]
-        metadatas = data["metadatas"][0]
-
-        for distance, document, metadata in zip(distances, documents, metadatas):
-            if isinstance(document, str):
-                doc_hash = hashlib.sha256(
-                    document.encode()
-                ).hexdigest()  # Compute a hash for uniqueness
-
-                if doc_hash not in combined.keys():
-                    combined[doc_hash] = (distance, document, metadata)
-                    continue  # if doc is new, no further comparison is needed
-
-                # if doc is alredy in, but new distance is better, update
-                if distance > combined[doc_hash][0]:
-                    combined[doc_hash] = (distance, document, metadata)
-
-    combined = list(combined.values())
-    # Sort the list based on distances
-    combined.sort(key=lambda x: x[0], reverse=True)
-
-    # Slice to keep only the top k elements
-    sorted_distances, sorted_documents, sorted_metadatas = (
-        zip(*combined[:k]) if combined else ([], [], [])
-    )
+class RetrievalResult:
+    """
+    Columnar view over query results: distances are kept in a NumPy array and
+    documents/metadatas are only gathered by index once the final rows are
+    known, so selecting the top-k never sorts or copies per-row Python objects.
+    """
+
+    def __init__(self, distances: np.ndarray, documents: list, metadatas: list):
+        self.distances = distances
+        self.documents = documents
+        self.metadatas = metadatas
+
+    def __len__(self):
+        return len(self.distances)
+
+    @classmethod
+    def from_query_results(cls, query_results: list[dict]) -> "RetrievalResult":
+        distances, documents, metadatas = [], [], []
+        for data in query_results:
+            rows = (data["distances"][0], data["documents"][0], data["metadatas"][0])
+            if not all(isinstance(document, str) for document in rows[1]):
+                rows = tuple(
+                    zip(*[row for row in zip(*rows) if isinstance(row[1], str)])
+                ) or ([], [], [])
+
+            distances.append(np.asarray(rows[0], dtype=np.float64))
+            documents.extend(rows[1])
+            metadatas.extend(rows[2])
+
+        return cls(
+            np.concatenate(distances) if distances else np.empty(0),
+            documents,
+            metadatas,
+        )
 
-    # Create and return the output dictionary
-    return {
-        "distances": [list(sorted_distances)],
-        "documents": [list(sorted_documents)],
-        "metadatas": [list(sorted_metadatas)],
-    }
+    def get_hash(self, idx: int) -> str:
+        metadata = self.metadatas[idx]
+        # Chunks ingested before chunk hashes were stored are hashed here
+        return (metadata.get("chunk_hash") if metadata else None) or (
+            calculate_sha256_string(self.documents[idx])
+        )
+
+    def top_k_indices(self, k: int, deduplicate: bool = True) -> np.ndarray:
+        """
+        Indices of the `k` highest scoring rows in descending order, keeping
+        only the best scoring row per chunk hash when `deduplicate` is set.
+        """
+        n = len(self)
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Only the best candidates are sorted (and hashed); the pool grows
+        # if duplicates leave fewer than k unique rows in it.
+        candidates = min(n, k * 2 if deduplicate else k)
+        while True:
+            indices = (
+                np.argpartition(-self.distances, candidates - 1)[:candidates]
+                if candidates < n
+                else np.arange(n)
+            )
+            indices = indices[np.argsort(-self.distances[indices], kind="stable")]
+
+            if not deduplicate:
+                return indices[:k]
+
+            seen = set()
+            selected = []
+            for idx in indices:
+                doc_hash = self.get_hash(idx)
+                if doc_hash not in seen:
+                    seen.add(doc_hash)
+                    selected.append(idx)
+                    if len(selected) == k:
+                        break
+
+            if len(selected) == k or candidates == n:
+                return np.asarray(selected, dtype=np.intp)
+            candidates = min(n, candidates * 4)
+
+    def take(self, indices: np.ndarray) -> "RetrievalResult":
+        return RetrievalResult(
+            self.distances[indices],
+            [self.documents[idx] for idx in indices],
+            [self.metadatas[idx] for idx in indices],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "distances": [self.distances.tolist()],
+            "documents": [self.documents],
+            "metadatas": [self.metadatas],
+        }
+
+
+def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
+    result = RetrievalResult.from_query_results(query_results)
+    return result.take(result.top_k_indices(k)).to_dict()
 
 
 def get_all_items_from_collections(collection_names: list[str]) -> dict:
@@ -290,47 +370,34 @@ def query_collection(
     embedding_function,
     k: int,
 ) -> dict:
-    results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
-
     # Generate all query embeddings (in one call)
     query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
+    # Search all collections with all queries in as few round trips as the
+    # vector database allows
+    results = []
+    try:
+        result = VECTOR_DB_CLIENT.search_many(
+            collection_names=[name for name in collection_names if name],
+            vectors=query_embeddings,
+            limit=k,
+        )
+        if result is not None:
+            results = [
+                {
+                    "distances": [distances],
+                    "documents": [documents],
+                    "metadatas": [metadatas],
+                }
+                for distances, documents, metadatas in zip(
+                    result.distances, result.documents, result.metadatas
                 )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
-
-    if error and not results:
+            ]
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
         log.warning("All collection queries failed. No results returned.")
 
     return merge_and_sort_query_results(results, k=k)
@@ -348,19 +415,17 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
+    # Load the BM25 index of each collection once, sequentially, so that
+    # the query threads below only search already loaded indexes
     collection_results = {}
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
-            )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+                f"query_collection_with_hybrid_search:BM25_INDEXES.get:collection {collection_name}"
             )
+            collection_results[collection_name] = BM25_INDEXES.get(collection_name)
         except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
+            log.exception(f"Failed to load collection {collection_name}: {e}")
             collection_results[collection_name] = None
 
     log.info(
@@ -371,7 +436,6 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -422,11 +486,11 @@ def get_embedding_function(
     azure_api_version=None,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
+        func = lambda query, prefix=None, user=None: embedding_function.encode(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        async_func = lambda query, prefix=None, user=None: agenerate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -437,28 +501,75 @@ def get_embedding_function(
             azure_api_version=azure_api_version,
         )
 
-        def generate_multiple(query, prefix, user, func):
+        async def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    batch_embeddings = func(
-                        query[i : i + embedding_batch_size],
-                        prefix=prefix,
-                        user=user,
-                    )
+                # Batches are dispatched concurrently, bounded by the client
+                batch_results = await asyncio.gather(
+                    *[
+                        func(
+                            query[i : i + embedding_batch_size],
+                            prefix=prefix,
+                            user=user,
+                        )
+                        for i in range(0, len(query), embedding_batch_size)
+                    ]
+                )
 
+                embeddings = []
+                for batch_embeddings in batch_results:
                     if isinstance(batch_embeddings, list):
                         embeddings.extend(batch_embeddings)
                 return embeddings
             else:
-                return func(query, prefix, user)
+                return await func(query, prefix, user)
 
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
+        func = lambda query, prefix=None, user=None: EMBEDDING_CLIENT.run(
+            generate_multiple(query, prefix, user, async_func)
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if EMBEDDING_CACHE is None:
+        return func
+
+    model = f"{embedding_engine or 'sentence_transformers'}:{embedding_model}"
+    return lambda query, prefix=None, user=None: generate_cached_embeddings(
+        func, model, query, prefix, user
+    )
+
+
+def generate_cached_embeddings(func, model: str, query, prefix=None, user=None):
+    """Embed `query` through `func`, serving unchanged texts from the embedding cache."""
+    texts = query if isinstance(query, list) else [query]
+    keys = [EMBEDDING_CACHE.get_key(model, prefix, text) for text in texts]
+    cached = EMBEDDING_CACHE.get_many(keys)
+
+    missing = list(dict.fromkeys(key for key in keys if key not in cached))
+    if missing:
+        missing_texts = {key: text for key, text in zip(keys, texts)}
+        embeddings = func(
+            [missing_texts[key] for key in missing], prefix=prefix, user=user
+        )
+
+        # A failed batch yields fewer embeddings than texts, so they can no
+        # longer be matched back to their keys; skip the cache for this call.
+        if not isinstance(embeddings, list) or len(embeddings) != len(missing):
+            if cached:
+                return func(query, prefix=prefix, user=user)
+            return embeddings if isinstance(query, list) else None
+
+        computed = dict(zip(missing, embeddings))
+        EMBEDDING_CACHE.set_many(computed)
+        cached.update(computed)
+
+    log.debug(
+        f"Embedding cache: {len(keys) - len(missing)} hits, {len(missing)} misses "
+        f"(total {EMBEDDING_CACHE.hits} hits, {EMBEDDING_CACHE.misses} misses)"
+    )
+
+    embeddings = [cached[key] for key in keys]
+    return embeddings if isinstance(query, list) else embeddings[0]
+
 
 def get_reranking_function(reranking_engine, reranking_model, reranking_function):
     if reranking_function is None:
@@ -468,6 +579,15 @@ def get_reranking_function(reranking_engine, reranking_model, reranking_function
             sentences, user=user
         )
     else:
+        if not isinstance(reranking_function, BaseReranker):
+            # Cross-encoders score each pair independently, so pairs from
+            # concurrent requests can share batches
+            reranking_function = RerankScheduler(
+                reranking_function,
+                max_batch_size=RAG_RERANKING_MAX_BATCH_SIZE,
+                max_latency=RAG_RERANKING_MAX_LATENCY,
+                cache_size=RAG_RERANKING_SCORE_CACHE_SIZE,
+            )
         return lambda sentences, user=None: reranking_function.predict(sentences)
 
 
@@ -781,7 +901,115 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
-def generate_openai_batch_embeddings(
+class EmbeddingClient:
+    """
+    HTTP client shared by the embedding backends.
+
+    Requests go through one pooled aiohttp session that lives on a dedicated
+    event loop thread, so synchronous callers can dispatch several batches at
+    once (see `run`). At most `max_concurrency` requests are in flight, and
+    429/5xx responses are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = RAG_EMBEDDING_CONCURRENT_REQUESTS,
+        max_retries: int = RAG_EMBEDDING_MAX_RETRIES,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max(max_retries, 0)
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="embedding-client",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+                trust_env=True,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _get_retry_delay(self, response: aiohttp.ClientResponse, attempt: int):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return min(2**attempt, 30) + random.uniform(0, 1)
+
+    async def _post(self, url: str, headers: dict, json_data: dict) -> dict:
+        session = self._get_session()
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                async with session.post(url, headers=headers, json=json_data) as r:
+                    if (r.status == 429 or r.status >= 500) and (
+                        attempt < self.max_retries
+                    ):
+                        delay = self._get_retry_delay(r, attempt)
+                        log.warning(
+                            f"Embedding request failed with status {r.status}, "
+                            f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                    r.raise_for_status()
+                    return await r.json()
+
+    async def post(self, url: str, headers: dict, json_data: dict) -> dict:
+        """Send a request from any event loop through the shared session."""
+        loop = self._get_loop()
+        coroutine = self._post(url, headers, json_data)
+
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coroutine
+        except RuntimeError:
+            pass
+
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, loop)
+        )
+
+    def run(self, coroutine):
+        """Synchronous facade: run a coroutine on the client loop and wait for it."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+
+EMBEDDING_CLIENT = EmbeddingClient()
+
+
+def get_user_info_headers(user: UserModel = None) -> dict:
+    return (
+        {
+            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+            "X-OpenWebUI-User-Id": user.id,
+            "X-OpenWebUI-User-Email": user.email,
+            "X-OpenWebUI-User-Role": user.role,
+        }
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user
+        else {}
+    )
+
+
+async def generate_openai_batch_embeddings(
     model: str,
     texts: list[str],
     url: str = "https://api.openai.com/v1",
@@ -797,36 +1025,25 @@ def generate_openai_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        data = await EMBEDDING_CLIENT.post(
             f"{url}/embeddings",
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
+                **get_user_info_headers(user),
             },
-            json=json_data,
+            json_data=json_data,
         )
-        r.raise_for_status()
-        data = r.json()
         if "data" in data:
             return [elem["embedding"] for elem in data["data"]]
         else:
-            raise "Something went wrong :/"
+            raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
 
 
-def generate_azure_openai_batch_embeddings(
+async def generate_azure_openai_batch_embeddings(
     model: str,
     texts: list[str],
     url: str,
@@ -845,42 +1062,25 @@ def generate_azure_openai_batch_embeddings(
 
         url = f"{url}/openai/deployments/{model}/embeddings?api-version={version}"
 
-        for _ in range(5):
-            r = requests.post(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    "api-key": key,
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=json_data,
-            )
-            if r.status_code == 429:
-                retry = float(r.headers.get("Retry-After", "1"))
-                time.sleep(retry)
-                continue
-            r.raise_for_status()
-            data = r.json()
-            if "data" in data:
-                return [elem["embedding"] for elem in data["data"]]
-            else:
-                raise Exception("Something went wrong :/")
-        return None
+        data = await EMBEDDING_CLIENT.post(
+            url,
+            headers={
+                "Content-Type": "application/json",
+                "api-key": key,
+                **get_user_info_headers(user),
+            },
+            json_data=json_data,
+        )
+        if "data" in data:
+            return [elem["embedding"] for elem in data["data"]]
+        else:
+            raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
 
 
-def generate_ollama_batch_embeddings(
+async def generate_ollama_batch_embeddings(
     model: str,
     texts: list[str],
     url: str,
@@ -896,37 +1096,26 @@ def generate_ollama_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        data = await EMBEDDING_CLIENT.post(
             f"{url}/api/embed",
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
+                **get_user_info_headers(user),
             },
-            json=json_data,
+            json_data=json_data,
         )
-        r.raise_for_status()
-        data = r.json()
 
         if "embeddings" in data:
             return data["embeddings"]
         else:
-            raise "Something went wrong :/"
+            raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
 
 
-def generate_embeddings(
+async def agenerate_embeddings(
     engine: str,
     model: str,
     text: Union[str, list[str]],
@@ -944,7 +1133,7 @@ def generate_embeddings(
             text = f"{prefix}{text}"
 
     if engine == "ollama":
-        embeddings = generate_ollama_batch_embeddings(
+        embeddings = await generate_ollama_batch_embeddings(
             **{
                 "model": model,
                 "texts": text if isinstance(text, list) else [text],
@@ -956,13 +1145,13 @@ def generate_embeddings(
         )
         return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "openai":
-        embeddings = generate_openai_batch_embeddings(
+        embeddings = await generate_openai_batch_embeddings(
             model, text if isinstance(text, list) else [text], url, key, prefix, user
         )
         return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "azure_openai":
         azure_api_version = kwargs.get("azure_api_version", "")
-        embeddings = generate_azure_openai_batch_embeddings(
+        embeddings = await generate_azure_openai_batch_embeddings(
             model,
             text if isinstance(text, list) else [text],
             url,
@@ -974,7 +1163,18 @@ def generate_embeddings(
         return embeddings[0] if isinstance(text, str) else embeddings
 
 
-import operator
+def generate_embeddings(
+    engine: str,
+    model: str,
+    text: Union[str, list[str]],
+    prefix: Union[str, None] = None,
+    **kwargs,
+):
+    return EMBEDDING_CLIENT.run(
+        agenerate_embeddings(engine, model, text, prefix, **kwargs)
+    )
+
+
 from typing import Optional, Sequence
 
 from langchain_core.callbacks import Callbacks
@@ -1014,26 +1214,25 @@ class RerankCompressor(BaseDocumentCompressor):
             scores = util.cos_sim(query_embedding, document_embedding)[0]
 
         if scores is not None:
-            docs_with_scores = list(
-                zip(
-                    documents,
-                    scores.tolist() if not isinstance(scores, list) else scores,
-                )
-            )
+            # Scores stay in their array form (no copy for NumPy arrays or CPU tensors)
+            scores = np.asarray(scores).reshape(-1)
+
+            indices = np.arange(len(scores))
             if self.r_score:
-                docs_with_scores = [
-                    (d, s) for d, s in docs_with_scores if s >= self.r_score
+                indices = indices[scores >= self.r_score]
+
+            if self.top_n <= 0:
+                indices = indices[:0]
+            elif len(indices) > self.top_n:
+                indices = indices[
+                    np.argpartition(-scores[indices], self.top_n - 1)[: self.top_n]
                 ]
+            indices = indices[np.argsort(-scores[indices], kind="stable")]
 
-            result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
             final_results = []
-            for doc, doc_score in result[: self.top_n]:
-                metadata = doc.metadata
-                metadata["score"] = doc_score
-                doc = Document(
-                    page_content=doc.page_content,
-                    metadata=metadata,
-                )
+            for idx in indices:
+                doc = documents[idx]
+                doc.metadata["score"] = float(scores[idx])
                 final_results.append(doc)
             return final_results
         else:
@@ -10,6 +10,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.retrieval.vector.utils import stringify_metadata
 
@@ -100,6 +101,42 @@ class ChromaClient(VectorDBBase):
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        # Chroma cannot query across collections, but each collection is
+        # queried with all vectors at once.
+        rows = [[] for _ in vectors]
+        for collection_name in collection_names:
+            try:
+                collection = self.client.get_collection(name=collection_name)
+                result = collection.query(
+                    query_embeddings=vectors,
+                    n_results=limit,
+                )
+            except Exception as e:
+                continue
+
+            for idx in range(len(vectors)):
+                rows[idx].append(
+                    SearchResult(
+                        ids=[result["ids"][idx]],
+                        # Re-order cosine distance 2 (worst) -> 0 (best) to 0 -> 1
+                        distances=[
+                            [(2 - dist) / 2 for dist in result["distances"][idx]]
+                        ],
+                        documents=[result["documents"][idx]],
+                        metadatas=[result["metadatas"][idx]],
+                    )
+                )
+
+        if not any(rows):
+            return None
+        return merge_search_results(rows)
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -8,6 +8,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.config import (
     OPENSEARCH_URI,
@@ -145,6 +146,60 @@ class OpenSearchClient(VectorDBBase):
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        # One multi-search request with a query per index and vector, so that
+        # every collection contributes its own `limit` matches; indices that
+        # do not exist are skipped.
+        if not collection_names or not vectors:
+            return None
+
+        searches = [
+            (idx, self._get_index_name(collection_name), vector)
+            for collection_name in collection_names
+            for idx, vector in enumerate(vectors)
+        ]
+        body = []
+        for _, index, vector in searches:
+            body.append({"index": index, "ignore_unavailable": True})
+            body.append(
+                {
+                    "size": limit,
+                    "_source": ["text", "metadata"],
+                    "query": {
+                        "script_score": {
+                            "query": {"match_all": {}},
+                            "script": {
+                                "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                                "params": {"field": "vector", "query_value": vector},
+                            },
+                        }
+                    },
+                }
+            )
+
+        try:
+            result = self.client.msearch(body=body)
+        except Exception as e:
+            return None
+
+        rows = [[] for _ in vectors]
+        for (idx, _, _), response in zip(searches, result["responses"]):
+            hits = response.get("hits", {}).get("hits", [])
+            rows[idx].append(
+                SearchResult(
+                    ids=[[hit["_id"] for hit in hits]],
+                    distances=[[hit["_score"] for hit in hits]],
+                    documents=[[hit["_source"].get("text") for hit in hits]],
+                    metadatas=[[hit["_source"].get("metadata") for hit in hits]],
+                )
+            )
+        return merge_search_results(rows)
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
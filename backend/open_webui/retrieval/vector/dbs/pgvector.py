@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any
 import logging
 import json
+import time
 from sqlalchemy import (
     func,
     literal,
@@ -44,6 +45,7 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_INSERT_BATCH_SIZE,
 )
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -223,56 +225,89 @@ class PgvectorClient(VectorDBBase):
             vector = vector[:VECTOR_LENGTH]
         return vector
 
-    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    # Use raw SQL for BYTEA/pgcrypto
-                    # Ensure metadata is converted to its JSON text representation
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO NOTHING
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & inserted {len(items)} into '{collection_name}'")
+    def _bulk_insert(
+        self, collection_name: str, items: List[VectorItem], overwrite: bool
+    ) -> None:
+        """
+        Insert the items in batches of PGVECTOR_INSERT_BATCH_SIZE rows.
 
-            else:
-                new_items = []
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=stringify_metadata(item["metadata"]),
+        Each batch is sent as one set-based INSERT ... SELECT over unnest()ed
+        arrays, so encryption with pgcrypto also happens in a single statement
+        and the key is only bound once per batch.
+        """
+        if PGVECTOR_PGCRYPTO:
+            text_expr = "pgp_sym_encrypt(t.text, :key)"
+            vmetadata_expr = "pgp_sym_encrypt(t.vmetadata, :key)"
+        else:
+            text_expr = "t.text"
+            vmetadata_expr = "t.vmetadata::jsonb"
+
+        if overwrite:
+            conflict = """
+                ON CONFLICT (id) DO UPDATE SET
+                  vector = EXCLUDED.vector,
+                  collection_name = EXCLUDED.collection_name,
+                  text = EXCLUDED.text,
+                  vmetadata = EXCLUDED.vmetadata
+            """
+        else:
+            conflict = "ON CONFLICT (id) DO NOTHING"
+
+        stmt = text(
+            f"""
+            INSERT INTO document_chunk (id, vector, collection_name, text, vmetadata)
+            SELECT t.id, t.vector::vector, :collection_name, {text_expr}, {vmetadata_expr}
+            FROM unnest(
+                CAST(:ids AS text[]),
+                CAST(:vectors AS text[]),
+                CAST(:texts AS text[]),
+                CAST(:vmetadatas AS text[])
+            ) AS t(id, vector, text, vmetadata)
+            {conflict}
+            """
+        )
+
+        if overwrite:
+            # A single statement cannot update the same row twice, keep the last
+            items = list({item["id"]: item for item in items}.values())
+
+        start = time.perf_counter()
+        for idx in range(0, len(items), PGVECTOR_INSERT_BATCH_SIZE):
+            batch = items[idx : idx + PGVECTOR_INSERT_BATCH_SIZE]
+            params = {
+                "collection_name": collection_name,
+                "ids": [item["id"] for item in batch],
+                "vectors": [
+                    "["
+                    + ",".join(map(str, self.adjust_vector_length(item["vector"])))
+                    + "]"
+                    for item in batch
+                ],
+                "texts": [item["text"] for item in batch],
+                "vmetadatas": [
+                    json.dumps(
+                        item["metadata"]
+                        if PGVECTOR_PGCRYPTO
+                        else stringify_metadata(item["metadata"])
                     )
-                    new_items.append(new_chunk)
-                self.session.bulk_save_objects(new_items)
-                self.session.commit()
-                log.info(
-                    f"Inserted {len(new_items)} items into collection '{collection_name}'."
-                )
+                    for item in batch
+                ],
+            }
+            if PGVECTOR_PGCRYPTO:
+                params["key"] = PGVECTOR_PGCRYPTO_KEY
+
+            self.session.execute(stmt, params)
+            self.session.commit()
+
+        elapsed = time.perf_counter() - start
+        log.info(
+            f"{'Upserted' if overwrite else 'Inserted'} {len(items)} items into collection "
+            f"'{collection_name}' in {elapsed:.2f}s ({len(items) / max(elapsed, 1e-6):.0f} rows/s)"
+        )
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self._bulk_insert(collection_name, items, overwrite=False)
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during insert: {e}")
@@ -280,66 +315,7 @@ class PgvectorClient(VectorDBBase):
 
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO UPDATE SET
-                              vector = EXCLUDED.vector,
-                              collection_name = EXCLUDED.collection_name,
-                              text = EXCLUDED.text,
-                              vmetadata = EXCLUDED.vmetadata
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & upserted {len(items)} into '{collection_name}'")
-            else:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    existing = (
-                        self.session.query(DocumentChunk)
-                        .filter(DocumentChunk.id == item["id"])
-                        .first()
-                    )
-                    if existing:
-                        existing.vector = vector
-                        existing.text = item["text"]
-                        existing.vmetadata = stringify_metadata(item["metadata"])
-                        existing.collection_name = (
-                            collection_name  # Update collection_name if necessary
-                        )
-                    else:
-                        new_chunk = DocumentChunk(
-                            id=item["id"],
-                            vector=vector,
-                            collection_name=collection_name,
-                            text=item["text"],
-                            vmetadata=stringify_metadata(item["metadata"]),
-                        )
-                        self.session.add(new_chunk)
-                self.session.commit()
-                log.info(
-                    f"Upserted {len(items)} items into collection '{collection_name}'."
-                )
+            self._bulk_insert(collection_name, items, overwrite=True)
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during upsert: {e}")
@@ -351,8 +327,18 @@ class PgvectorClient(VectorDBBase):
         vectors: List[List[float]],
         limit: Optional[int] = None,
     ) -> Optional[SearchResult]:
+        return self.search_many([collection_name], vectors, limit)
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+    ) -> Optional[SearchResult]:
+        # All query vectors and collections are searched in a single statement,
+        # with the best `limit` matches of each collection
         try:
-            if not vectors:
+            if not vectors or not collection_names:
                 return None
 
             # Adjust query vectors to VECTOR_LENGTH
@@ -372,6 +358,12 @@ class PgvectorClient(VectorDBBase):
                 )
                 .alias("query_vectors")
             )
+            collection_col = column("collection_name", Text)
+            collections = (
+                values(collection_col)
+                .data([(collection_name,) for collection_name in collection_names])
+                .alias("collections")
+            )
 
             result_fields = [
                 DocumentChunk.id,
@@ -396,10 +388,10 @@ class PgvectorClient(VectorDBBase):
                 )
             )
 
-            # Build the lateral subquery for each query vector
+            # Build the lateral subquery for each query vector and collection
             subq = (
                 select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
+                .where(DocumentChunk.collection_name == collections.c.collection_name)
                 .order_by(
                     (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
                 )
@@ -418,6 +410,7 @@ class PgvectorClient(VectorDBBase):
                     subq.c.distance,
                 )
                 .select_from(query_vectors)
+                .join(collections, true())
                 .join(subq, true())
                 .order_by(query_vectors.c.qid, subq.c.distance)
             )
@@ -11,6 +11,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.config import (
     QDRANT_URI,
@@ -167,6 +168,49 @@ class QdrantClient(VectorDBBase):
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        # Each collection is searched with all vectors in one batch request
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        rows = [[] for _ in vectors]
+        for collection_name in collection_names:
+            try:
+                responses = self.client.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=[
+                        models.QueryRequest(
+                            query=vector, limit=limit, with_payload=True
+                        )
+                        for vector in vectors
+                    ],
+                )
+            except Exception as e:
+                log.debug(f"Error searching collection {collection_name}: {e}")
+                continue
+
+            for idx, response in enumerate(responses):
+                get_result = self._result_to_get_result(response.points)
+                rows[idx].append(
+                    SearchResult(
+                        ids=get_result.ids,
+                        documents=get_result.documents,
+                        metadatas=get_result.metadatas,
+                        distances=[
+                            [(point.score + 1.0) / 2.0 for point in response.points]
+                        ],
+                    )
+                )
+
+        if not any(rows):
+            return None
+        return merge_search_results(rows)
+
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
         if not self.has_collection(collection_name):
@@ -19,6 +19,7 @@ from open_webui.retrieval.vector.main import (
     SearchResult,
     VectorDBBase,
     VectorItem,
+    merge_search_results,
 )
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.exceptions import UnexpectedResponse
@@ -276,6 +277,67 @@ class QdrantClient(VectorDBBase):
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """
+        Search several collections with one batch request per multi-tenant
+        collection, holding a request per tenant and vector so that every
+        collection contributes its own `limit` matches.
+        """
+        if not self.client or not vectors:
+            return None
+
+        tenants = {}
+        for collection_name in collection_names:
+            mt_collection, tenant_id = self._get_collection_and_tenant_id(
+                collection_name
+            )
+            tenants.setdefault(mt_collection, []).append(tenant_id)
+
+        rows = [[] for _ in vectors]
+        for mt_collection, tenant_ids in tenants.items():
+            if not self.client.collection_exists(collection_name=mt_collection):
+                log.debug(f"Collection {mt_collection} doesn't exist, skipping search")
+                continue
+
+            requests = [
+                (idx, tenant_id, vector)
+                for tenant_id in tenant_ids
+                for idx, vector in enumerate(vectors)
+            ]
+            responses = self.client.query_batch_points(
+                collection_name=mt_collection,
+                requests=[
+                    models.QueryRequest(
+                        query=vector,
+                        limit=limit,
+                        filter=models.Filter(must=[_tenant_filter(tenant_id)]),
+                        with_payload=True,
+                    )
+                    for _, tenant_id, vector in requests
+                ],
+            )
+            for (idx, _, _), response in zip(requests, responses):
+                get_result = self._result_to_get_result(response.points)
+                rows[idx].append(
+                    SearchResult(
+                        ids=get_result.ids,
+                        documents=get_result.documents,
+                        metadatas=get_result.metadatas,
+                        distances=[
+                            [(point.score + 1.0) / 2.0 for point in response.points]
+                        ],
+                    )
+                )
+
+        if not any(rows):
+            return None
+        return merge_search_results(rows)
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ):
@@ -1,7 +1,14 @@
+import logging
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Union
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
 
 class VectorItem(BaseModel):
     id: str
@@ -20,6 +27,40 @@ class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
 
 
+def merge_search_results(rows: List[List[SearchResult]]) -> SearchResult:
+    """
+    Merge per-collection results into a single SearchResult.
+
+    `rows[i]` holds the results of query vector `i`; the matches of each
+    result's first row are combined and sorted by descending score. Nothing
+    is dropped: the same chunk can be stored in several collections, so the
+    caller removes duplicates before keeping its top k.
+    """
+    merged = SearchResult(ids=[], distances=[], documents=[], metadatas=[])
+    for results in rows:
+        matches = sorted(
+            (
+                match
+                for result in results
+                if result.ids
+                for match in zip(
+                    result.distances[0],
+                    result.ids[0],
+                    result.documents[0],
+                    result.metadatas[0],
+                )
+            ),
+            key=lambda match: match[0],
+            reverse=True,
+        )
+
+        merged.distances.append([match[0] for match in matches])
+        merged.ids.append([match[1] for match in matches])
+        merged.documents.append([match[2] for match in matches])
+        merged.metadatas.append([match[3] for match in matches])
+    return merged
+
+
 class VectorDBBase(ABC):
     """
     Abstract base class for all vector database backends.
@@ -58,6 +99,48 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Optional[SearchResult]:
+        """
+        Search for similar vectors across several collections.
+
+        Returns one row per query vector with the best `limit` matches of each
+        collection, sorted by descending score. Backends that can search
+        several collections in a single request override this; the default
+        runs one search per collection and vector concurrently.
+        """
+        tasks = [
+            (idx, collection_name, vector)
+            for idx, vector in enumerate(vectors)
+            for collection_name in collection_names
+        ]
+        if not tasks:
+            return None
+
+        def search(task):
+            _, collection_name, vector = task
+            try:
+                return self.search(collection_name, [vector], limit)
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                return None
+
+        with ThreadPoolExecutor() as executor:
+            results = list(executor.map(search, tasks))
+
+        rows = [[] for _ in vectors]
+        for (idx, _, _), result in zip(tasks, results):
+            if result is not None:
+                rows[idx].append(result)
+
+        if not any(rows):
+            return None
+        return merge_search_results(rows)
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -10,6 +10,7 @@ from open_webui.models.chats import (
     ChatResponse,
     Chats,
     ChatTitleIdResponse,
+    ChatSearchResponse,
 )
 from open_webui.models.tags import TagModel, Tags
 from open_webui.models.folders import Folders
@@ -169,7 +170,7 @@ async def import_chat(form_data: ChatImportForm, user=Depends(get_verified_user)
 ############################
 
 
-@router.get("/search", response_model=list[ChatTitleIdResponse])
+@router.get("/search", response_model=list[ChatSearchResponse])
 def search_user_chats(
     text: str, page: Optional[int] = None, user=Depends(get_verified_user)
 ):
@@ -179,12 +180,9 @@ def search_user_chats(
     limit = 60
     skip = (page - 1) * limit
 
-    chat_list = [
-        ChatTitleIdResponse(**chat.model_dump())
-        for chat in Chats.get_chats_by_user_id_and_search_text(
-            user.id, text, skip=skip, limit=limit
-        )
-    ]
+    chat_list = Chats.get_chats_by_user_id_and_search_text(
+        user.id, text, skip=skip, limit=limit
+    )
 
     # Delete tag if no chat is found
     words = text.strip().split(" ")
@@ -456,13 +454,14 @@ async def update_chat_message_by_id(
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
 
-    chat = Chats.upsert_message_to_chat_by_id_and_message_id(
+    Chats.upsert_message_to_chat_by_id_and_message_id(
         id,
         message_id,
         {
             "content": form_data.content,
         },
     )
+    chat = Chats.get_chat_by_id(id)
 
     event_emitter = get_event_emitter(
         {
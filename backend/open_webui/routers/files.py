@@ -6,6 +6,7 @@ from fnmatch import fnmatch
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
+from concurrent.futures import Future
 import asyncio
 
 from fastapi import (
@@ -25,6 +26,7 @@ from fastapi.responses import FileResponse, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
 
 from open_webui.models.users import Users
 from open_webui.models.files import (
@@ -33,6 +35,7 @@ from open_webui.models.files import (
     FileModelResponse,
     Files,
 )
+from open_webui.models.jobs import JobModel
 from open_webui.models.knowledge import Knowledges
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
@@ -40,6 +43,8 @@ from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_PIPELINE
+from open_webui.utils.jobs import JOB_QUEUE
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -85,41 +90,49 @@ def has_access_to_file(
 ############################
 
 
-def process_uploaded_file(request, file, file_path, file_item, file_metadata, user):
-    try:
-        if file.content_type:
-            stt_supported_content_types = getattr(
-                request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
-            )
+def submit_uploaded_file(
+    request, content_type, file_path, file_item, file_metadata, user
+) -> Optional[Future]:
+    if content_type:
+        stt_supported_content_types = getattr(
+            request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
+        )
 
-            if any(
-                fnmatch(file.content_type, content_type)
-                for content_type in (
-                    stt_supported_content_types
-                    if stt_supported_content_types
-                    and any(t.strip() for t in stt_supported_content_types)
-                    else ["audio/*", "video/webm"]
-                )
-            ):
-                file_path = Storage.get_file(file_path)
-                result = transcribe(request, file_path, file_metadata)
+        if any(
+            fnmatch(content_type, stt_content_type)
+            for stt_content_type in (
+                stt_supported_content_types
+                if stt_supported_content_types
+                and any(t.strip() for t in stt_supported_content_types)
+                else ["audio/*", "video/webm"]
+            )
+        ):
+            file_path = Storage.get_file(file_path)
+            result = transcribe(request, file_path, file_metadata)
 
-                process_file(
-                    request,
-                    ProcessFileForm(
-                        file_id=file_item.id, content=result.get("text", "")
-                    ),
-                    user=user,
-                )
-            elif (not file.content_type.startswith(("image/", "video/"))) or (
-                request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-            ):
-                process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
-        else:
-            log.info(
-                f"File type {file.content_type} is not provided, but trying to process anyway"
+            return INGESTION_PIPELINE.submit(
+                request, file_item, user, content=result.get("text", "")
             )
-            process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
+            return INGESTION_PIPELINE.submit(request, file_item, user)
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        return INGESTION_PIPELINE.submit(request, file_item, user)
+
+    return None
+
+
+def process_uploaded_file(request, file, file_path, file_item, file_metadata, user):
+    try:
+        future = submit_uploaded_file(
+            request, file.content_type, file_path, file_item, file_metadata, user
+        )
+        if future is not None:
+            future.result()
     except Exception as e:
         log.error(f"Error processing file: {file_item.id}")
         Files.update_file_data_by_id(
@@ -131,6 +144,47 @@ def process_uploaded_file(request, file, file_path, file_item, file_metadata, us
         )
 
 
+async def process_uploaded_file_job(request: Request, job: JobModel):
+    file_item = Files.get_file_by_id(job.payload["file_id"])
+    if not file_item or (file_item.data or {}).get("status") == "completed":
+        # Deleted meanwhile, or processed before the job was marked completed
+        return
+
+    if job.attempts > 1:
+        # Resuming: start over from what a previous attempt may have stored
+        collection_name = f"file-{file_item.id}"
+        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+            VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+        BM25_INDEXES.delete_collection(collection_name=collection_name)
+        Files.update_file_data_by_id(file_item.id, {"status": "pending"})
+
+    try:
+        future = await asyncio.to_thread(
+            submit_uploaded_file,
+            request,
+            file_item.meta.get("content_type"),
+            file_item.path,
+            file_item,
+            file_item.meta.get("data", {}),
+            Users.get_user_by_id(file_item.user_id),
+        )
+        if future is not None:
+            await asyncio.wrap_future(future)
+    except Exception as e:
+        if job.attempts >= job.max_attempts:
+            Files.update_file_data_by_id(
+                file_item.id,
+                {
+                    "status": "failed",
+                    "error": str(e.detail) if hasattr(e, "detail") else str(e),
+                },
+            )
+        raise
+
+
+JOB_QUEUE.register("process_uploaded_file", process_uploaded_file_job)
+
+
 @router.post("/", response_model=FileModelResponse)
 def upload_file(
     request: Request,
@@ -231,14 +285,12 @@ def upload_file_handler(
 
         if process:
             if background_tasks and process_in_background:
-                background_tasks.add_task(
-                    process_uploaded_file,
-                    request,
-                    file,
-                    file_path,
-                    file_item,
-                    file_metadata,
-                    user,
+                # Processed by any replica, and resumed if it is restarted
+                JOB_QUEUE.enqueue(
+                    "process_uploaded_file",
+                    {"file_id": file_item.id},
+                    key=f"process_uploaded_file:{file_item.id}",
+                    item_id=file_item.id,
                 )
                 return {"status": True, **file_item.model_dump()}
             else:
@@ -342,6 +394,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
         try:
             Storage.delete_all_files()
             VECTOR_DB_CLIENT.reset()
+            BM25_INDEXES.reset()
         except Exception as e:
             log.exception(e)
             log.error("Error deleting files")
@@ -364,7 +417,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
 
 @router.get("/{id}", response_model=Optional[FileModel])
 async def get_file_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
 
     if not file:
         raise HTTPException(
@@ -389,7 +442,7 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
 async def get_file_process_status(
     id: str, stream: bool = Query(False), user=Depends(get_verified_user)
 ):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
 
     if not file:
         raise HTTPException(
@@ -408,7 +461,7 @@ async def get_file_process_status(
             async def event_stream(file_item):
                 if file_item:
                     for _ in range(MAX_FILE_PROCESSING_DURATION):
-                        file_item = Files.get_file_by_id(file_item.id)
+                        file_item = await Files.get_file_by_id_async(file_item.id)
                         if file_item:
                             data = file_item.model_dump().get("data", {})
                             status = data.get("status")
@@ -417,6 +470,8 @@ async def get_file_process_status(
                                 event = {"status": status}
                                 if status == "failed":
                                     event["error"] = data.get("error")
+                                elif data.get("progress"):
+                                    event["progress"] = data.get("progress")
 
                                 yield f"data: {json.dumps(event)}\n\n"
                                 if status in ("completed", "failed"):
@@ -434,7 +489,14 @@ async def get_file_process_status(
                 media_type="text/event-stream",
             )
         else:
-            return {"status": file.data.get("status", "pending")}
+            return {
+                "status": file.data.get("status", "pending"),
+                **(
+                    {"progress": file.data["progress"]}
+                    if file.data.get("progress")
+                    else {}
+                ),
+            }
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -722,6 +784,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
             try:
                 Storage.delete_file(file.path)
                 VECTOR_DB_CLIENT.delete(collection_name=f"file-{id}")
+                BM25_INDEXES.delete_collection(collection_name=f"file-{id}")
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
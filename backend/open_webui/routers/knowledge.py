@@ -1,6 +1,7 @@
 from typing import List, Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+import asyncio
 import logging
 
 from open_webui.models.knowledge import (
@@ -10,17 +11,22 @@ from open_webui.models.knowledge import (
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.models.jobs import JobModel
+from open_webui.models.users import Users
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
-    process_files_batch,
-    BatchProcessFilesForm,
+    BatchProcessFilesResponse,
+    BatchProcessFilesResult,
 )
 from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
+from open_webui.utils.ingestion import INGESTION_PIPELINE
+from open_webui.utils.jobs import JOB_QUEUE
 from open_webui.utils.access_control import has_access, has_permission
 
 
@@ -39,43 +45,57 @@ router = APIRouter()
 ############################
 
 
-@router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
-    knowledge_bases = []
+def get_knowledge_bases_with_files(
+    knowledge_bases: list, include_files: bool = True
+) -> list[KnowledgeUserResponse]:
+    """
+    Attach the file metadata of knowledge bases, loaded for all of them in
+    batched queries. File ids of deleted files are dropped from the response
+    and removed from the knowledge base by a background job.
+    """
+    if not include_files:
+        return [
+            KnowledgeUserResponse(**knowledge_base.model_dump())
+            for knowledge_base in knowledge_bases
+        ]
+
+    file_ids = list(
+        {
+            file_id
+            for knowledge_base in knowledge_bases
+            if knowledge_base.data
+            for file_id in knowledge_base.data.get("file_ids", [])
+        }
+    )
 
-    if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
-        knowledge_bases = Knowledges.get_knowledge_bases()
-    else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
+    # Chunked to stay below the bound parameter limit of the database
+    files_by_id = {}
+    for idx in range(0, len(file_ids), 500):
+        for file in Files.get_file_metadatas_by_ids(file_ids[idx : idx + 500]):
+            files_by_id[file.id] = file
 
-    # Get files for each knowledge base
     knowledge_with_files = []
     for knowledge_base in knowledge_bases:
         files = []
         if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
+            knowledge_file_ids = knowledge_base.data.get("file_ids", [])
+            files = sorted(
+                {
+                    file_id: files_by_id[file_id]
+                    for file_id in knowledge_file_ids
+                    if file_id in files_by_id
+                }.values(),
+                key=lambda file: file.updated_at,
+                reverse=True,
             )
 
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
+            if len(files) != len(set(knowledge_file_ids)):
+                JOB_QUEUE.enqueue(
+                    "remove_missing_knowledge_files",
+                    {"knowledge_id": knowledge_base.id},
+                    key=f"remove_missing_knowledge_files:{knowledge_base.id}",
+                    item_id=knowledge_base.id,
                 )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
-
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
-
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
-
-                    files = Files.get_file_metadatas_by_ids(file_ids)
 
         knowledge_with_files.append(
             KnowledgeUserResponse(
@@ -87,51 +107,74 @@ async def get_knowledge(user=Depends(get_verified_user)):
     return knowledge_with_files
 
 
-@router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
-    knowledge_bases = []
+def remove_missing_knowledge_files(knowledge_id: str):
+    knowledge = Knowledges.get_knowledge_by_id(id=knowledge_id)
+    if not knowledge or not knowledge.data:
+        return
 
-    if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
-        knowledge_bases = Knowledges.get_knowledge_bases()
-    else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
+    file_ids = knowledge.data.get("file_ids", [])
+    existing_file_ids = {file.id for file in Files.get_file_metadatas_by_ids(file_ids)}
 
-    # Get files for each knowledge base
-    knowledge_with_files = []
-    for knowledge_base in knowledge_bases:
-        files = []
-        if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
+    if len(existing_file_ids) != len(set(file_ids)):
+        log.info(f"Removing missing files from knowledge base {knowledge_id}")
+        Knowledges.update_knowledge_data_by_id(
+            id=knowledge_id,
+            data={
+                **knowledge.data,
+                "file_ids": [
+                    file_id for file_id in file_ids if file_id in existing_file_ids
+                ],
+            },
+        )
 
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
 
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
+async def remove_missing_knowledge_files_job(request: Request, job: JobModel):
+    await asyncio.to_thread(remove_missing_knowledge_files, job.payload["knowledge_id"])
 
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
 
-                    files = Files.get_file_metadatas_by_ids(file_ids)
+JOB_QUEUE.register("remove_missing_knowledge_files", remove_missing_knowledge_files_job)
 
-        knowledge_with_files.append(
-            KnowledgeUserResponse(
-                **knowledge_base.model_dump(),
-                files=files,
-            )
+
+@router.get("/", response_model=list[KnowledgeUserResponse])
+async def get_knowledge(
+    page: Optional[int] = Query(None, ge=1),
+    include_files: bool = True,
+    user=Depends(get_verified_user),
+):
+    skip, limit = None, None
+    if page is not None:
+        limit = 60
+        skip = (page - 1) * limit
+
+    if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
+        knowledge_bases = Knowledges.get_knowledge_bases(skip=skip, limit=limit)
+    else:
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "read", skip=skip, limit=limit
         )
-    return knowledge_with_files
+
+    return get_knowledge_bases_with_files(knowledge_bases, include_files)
+
+
+@router.get("/list", response_model=list[KnowledgeUserResponse])
+async def get_knowledge_list(
+    page: Optional[int] = Query(None, ge=1),
+    include_files: bool = True,
+    user=Depends(get_verified_user),
+):
+    skip, limit = None, None
+    if page is not None:
+        limit = 60
+        skip = (page - 1) * limit
+
+    if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
+        knowledge_bases = Knowledges.get_knowledge_bases(skip=skip, limit=limit)
+    else:
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "write", skip=skip, limit=limit
+        )
+
+    return get_knowledge_bases_with_files(knowledge_bases, include_files)
 
 
 ############################
@@ -192,6 +235,7 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
     log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
 
     deleted_knowledge_bases = []
+    queued_files = 0
 
     for knowledge_base in knowledge_bases:
         # -- Robust error handling for missing or invalid data
@@ -216,45 +260,61 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                    BM25_INDEXES.delete_collection(collection_name=knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
 
-            failed_files = []
+            # Files are reindexed by the job workers of all replicas
             for file in files:
-                try:
-                    process_file(
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
-                    )
-                except Exception as e:
-                    log.error(
-                        f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
-                    )
-                    failed_files.append({"file_id": file.id, "error": str(e)})
-                    continue
+                JOB_QUEUE.enqueue(
+                    "reindex_knowledge_file",
+                    {
+                        "knowledge_id": knowledge_base.id,
+                        "file_id": file.id,
+                        "user_id": user.id,
+                    },
+                    key=f"reindex_knowledge_file:{knowledge_base.id}:{file.id}:{file.hash}",
+                    item_id=file.id,
+                )
+                queued_files += 1
 
         except Exception as e:
             log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
             # Don't raise, just continue
             continue
 
-        if failed_files:
-            log.warning(
-                f"Failed to process {len(failed_files)} files in knowledge base {knowledge_base.id}"
-            )
-            for failed in failed_files:
-                log.warning(f"File ID: {failed['file_id']}, Error: {failed['error']}")
-
     log.info(
-        f"Reindexing completed. Deleted {len(deleted_knowledge_bases)} invalid knowledge bases: {deleted_knowledge_bases}"
+        f"Reindexing queued for {queued_files} files. Deleted {len(deleted_knowledge_bases)} invalid knowledge bases: {deleted_knowledge_bases}"
     )
     return True
 
 
+async def reindex_knowledge_file_job(request: Request, job: JobModel):
+    knowledge_id = job.payload["knowledge_id"]
+    file = Files.get_file_by_id(job.payload["file_id"])
+    user = Users.get_user_by_id(job.payload["user_id"])
+    if not file or not user or not Knowledges.get_knowledge_by_id(id=knowledge_id):
+        return
+
+    # Remove chunks a previous attempt may have stored before adding the file again
+    if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_id):
+        VECTOR_DB_CLIENT.delete(
+            collection_name=knowledge_id, filter={"file_id": file.id}
+        )
+        BM25_INDEXES.delete(knowledge_id, filter={"file_id": file.id})
+
+    await asyncio.to_thread(
+        process_file,
+        request,
+        ProcessFileForm(file_id=file.id, collection_name=knowledge_id),
+        user=user,
+    )
+
+
+JOB_QUEUE.register("reindex_knowledge_file", reindex_knowledge_file_job)
+
+
 ############################
 # GetKnowledgeById
 ############################
@@ -477,6 +537,9 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    BM25_INDEXES.delete(
+        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+    )
 
     # Add content to the vector database
     try:
@@ -549,6 +612,9 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEXES.delete(
+            collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+        )
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -560,6 +626,7 @@ def remove_file_from_knowledge_by_id(
             file_collection = f"file-{form_data.file_id}"
             if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
                 VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+                BM25_INDEXES.delete_collection(collection_name=file_collection)
         except Exception as e:
             log.debug("This was most likely caused by bypassing embedding processing")
             log.debug(e)
@@ -658,6 +725,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEXES.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -691,6 +759,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEXES.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -744,18 +813,33 @@ def add_files_to_knowledge_batch(
             )
         files.append(file)
 
-    # Process files
-    try:
-        result = process_files_batch(
-            request=request,
-            form_data=BatchProcessFilesForm(files=files, collection_name=id),
-            user=user,
-        )
-    except Exception as e:
-        log.error(
-            f"add_files_to_knowledge_batch: Exception occurred: {e}", exc_info=True
-        )
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Process files, embedding chunks of several files together
+    futures = [
+        (
+            file.id,
+            INGESTION_PIPELINE.submit(
+                request,
+                file,
+                user,
+                collection_name=id,
+                content=file.data.get("content", ""),
+            ),
+        )
+        for file in files
+    ]
+
+    result = BatchProcessFilesResponse(results=[], errors=[])
+    for file_id, future in futures:
+        try:
+            future.result()
+            result.results.append(
+                BatchProcessFilesResult(file_id=file_id, status="completed")
+            )
+        except Exception as e:
+            log.error(f"add_files_to_knowledge_batch: Error processing {file_id}: {e}")
+            result.errors.append(
+                BatchProcessFilesResult(file_id=file_id, status="failed", error=str(e))
+            )
 
     # Add successful files to knowledge base
     data = knowledge.data or {}
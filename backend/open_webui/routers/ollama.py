@@ -50,6 +50,7 @@ from open_webui.utils.payload import (
     apply_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.session_pool import CLIENT_SESSION_POOL
 from open_webui.utils.access_control import has_access
 
 
@@ -81,40 +82,38 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = CLIENT_SESSION_POOL.get_session(url)
+        async with session.get(
+            url,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
-async def cleanup_response(
-    response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
-):
+async def cleanup_response(response: Optional[aiohttp.ClientResponse]):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Returns the connection to the pool, or closes it if the body was not
+        # fully read
+        response.release()
 
 
 async def send_post_request(
@@ -129,11 +128,7 @@ async def send_post_request(
 
     r = None
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
-        r = await session.post(
+        r = await CLIENT_SESSION_POOL.get_session(url).post(
             url,
             data=payload,
             headers={
@@ -156,12 +151,13 @@ async def send_post_request(
                 ),
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -184,9 +180,7 @@ async def send_post_request(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             res = await r.json()
@@ -203,7 +197,7 @@ async def send_post_request(
         )
     finally:
         if not stream:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
 
 
 def get_api_key(idx, url, configs):
@@ -316,6 +310,9 @@ async def update_config(
         if key in keys
     }
 
+    # Fetch the base models from the updated connections on the next request
+    request.app.state.BASE_MODELS = []
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
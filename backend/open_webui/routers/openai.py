@@ -48,6 +48,7 @@ from open_webui.utils.misc import (
 )
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.session_pool import CLIENT_SESSION_POOL
 from open_webui.utils.access_control import has_access
 
 
@@ -65,39 +66,37 @@ log.setLevel(SRC_LOG_LEVELS["OPENAI"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = CLIENT_SESSION_POOL.get_session(url)
+        async with session.get(
+            url,
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
-async def cleanup_response(
-    response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
-):
+async def cleanup_response(response: Optional[aiohttp.ClientResponse]):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Returns the connection to the pool, or closes it if the body was not
+        # fully read
+        response.release()
 
 
 def openai_reasoning_model_handler(payload):
@@ -270,6 +269,9 @@ async def update_config(
         if key in keys
     }
 
+    # Fetch the base models from the updated connections on the next request
+    request.app.state.BASE_MODELS = []
+
     return {
         "ENABLE_OPENAI_API": request.app.state.config.ENABLE_OPENAI_API,
         "OPENAI_API_BASE_URLS": request.app.state.config.OPENAI_API_BASE_URLS,
@@ -922,22 +924,18 @@ async def generate_chat_completion(
     payload = json.dumps(payload)
 
     r = None
-    session = None
     streaming = False
     response = None
 
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
-        r = await session.request(
+        r = await CLIENT_SESSION_POOL.get_session(request_url).request(
             method="POST",
             url=request_url,
             data=payload,
             headers=headers,
             cookies=cookies,
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
 
         # Check if response is SSE
@@ -947,9 +945,7 @@ async def generate_chat_completion(
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -974,7 +970,7 @@ async def generate_chat_completion(
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
 
 
 async def embeddings(request: Request, form_data: dict, user):
@@ -1007,15 +1003,13 @@ async def embeddings(request: Request, form_data: dict, user):
     )
 
     r = None
-    session = None
     streaming = False
 
     headers, cookies = await get_headers_and_cookies(
         request, url, key, api_config, user=user
     )
     try:
-        session = aiohttp.ClientSession(trust_env=True)
-        r = await session.request(
+        r = await CLIENT_SESSION_POOL.get_session(url).request(
             method="POST",
             url=f"{url}/embeddings",
             data=body,
@@ -1029,9 +1023,7 @@ async def embeddings(request: Request, form_data: dict, user):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1056,7 +1048,7 @@ async def embeddings(request: Request, form_data: dict, user):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
 
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
@@ -1078,7 +1070,6 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
     )
 
     r = None
-    session = None
     streaming = False
 
     try:
@@ -1104,8 +1095,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         else:
             request_url = f"{url}/{path}"
 
-        session = aiohttp.ClientSession(trust_env=True)
-        r = await session.request(
+        r = await CLIENT_SESSION_POOL.get_session(request_url).request(
             method=request.method,
             url=request_url,
             data=body,
@@ -1121,9 +1111,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1149,4 +1137,4 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
@@ -8,7 +8,7 @@ import asyncio
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -37,6 +37,7 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -1200,6 +1201,144 @@ async def update_rag_config(
 ####################################
 
 
+def split_documents(request: Request, docs: list[Document]) -> list[Document]:
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        docs = text_splitter.split_documents(docs)
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        docs = text_splitter.split_documents(docs)
+    elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
+        log.info("Using markdown header text splitter")
+
+        # Define headers to split on - covering most common markdown header levels
+        headers_to_split_on = [
+            ("#", "Header 1"),
+            ("##", "Header 2"),
+            ("###", "Header 3"),
+            ("####", "Header 4"),
+            ("#####", "Header 5"),
+            ("######", "Header 6"),
+        ]
+
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=headers_to_split_on,
+            strip_headers=False,  # Keep headers in content for context
+        )
+
+        md_split_docs = []
+        for doc in docs:
+            md_header_splits = markdown_splitter.split_text(doc.page_content)
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=request.app.state.config.CHUNK_SIZE,
+                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                add_start_index=True,
+            )
+            md_header_splits = text_splitter.split_documents(md_header_splits)
+
+            # Convert back to Document objects, preserving original metadata
+            for split_chunk in md_header_splits:
+                headings_list = []
+                # Extract header values in order based on headers_to_split_on
+                for _, header_meta_key_name in headers_to_split_on:
+                    if header_meta_key_name in split_chunk.metadata:
+                        headings_list.append(split_chunk.metadata[header_meta_key_name])
+
+                md_split_docs.append(
+                    Document(
+                        page_content=split_chunk.page_content,
+                        metadata={**doc.metadata, "headings": headings_list},
+                    )
+                )
+
+        docs = md_split_docs
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+    return docs
+
+
+def check_duplicate_content(collection_name: str, hash: str):
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name,
+        filter={"hash": hash},
+    )
+
+    if result is not None and result.ids[0]:
+        log.info(f"Document with hash {hash} already exists")
+        raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+
+def get_chunks(
+    request: Request,
+    docs: list[Document],
+    metadata: Optional[dict] = None,
+    split: bool = True,
+) -> tuple[list[str], list[dict]]:
+    """Split `docs` into the texts and metadata of the chunks to embed."""
+    if split:
+        docs = split_documents(request, docs)
+
+    if len(docs) == 0:
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+    texts = [doc.page_content for doc in docs]
+    metadatas = [
+        {
+            **doc.metadata,
+            **(metadata if metadata else {}),
+            "embedding_config": {
+                "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+                "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+            },
+            "chunk_hash": calculate_sha256_string(doc.page_content),
+        }
+        for doc in docs
+    ]
+    return texts, metadatas
+
+
+def insert_chunks(
+    collection_name: str,
+    texts: list[str],
+    embeddings: list[list[float]],
+    metadatas: list[dict],
+) -> list[dict]:
+    items = [
+        {
+            "id": str(uuid.uuid4()),
+            "text": text,
+            "vector": vector,
+            "metadata": metadata,
+        }
+        for text, vector, metadata in zip(texts, embeddings, metadatas)
+    ]
+
+    log.info(f"adding to collection {collection_name}")
+    VECTOR_DB_CLIENT.insert(
+        collection_name=collection_name,
+        items=items,
+    )
+    BM25_INDEXES.add(collection_name, items)
+
+    log.info(f"added {len(items)} items to collection {collection_name}")
+    return items
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -1232,102 +1371,9 @@ def save_docs_to_vector_db(
 
     # Check if entries with the same hash (metadata.hash) already exist
     if metadata and "hash" in metadata:
-        result = VECTOR_DB_CLIENT.query(
-            collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
-        )
-
-        if result is not None:
-            existing_doc_ids = result.ids[0]
-            if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
-
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
-            log.info("Using markdown header text splitter")
-
-            # Define headers to split on - covering most common markdown header levels
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-                ("####", "Header 4"),
-                ("#####", "Header 5"),
-                ("######", "Header 6"),
-            ]
-
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on,
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            md_split_docs = []
-            for doc in docs:
-                md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
-                md_header_splits = text_splitter.split_documents(md_header_splits)
-
-                # Convert back to Document objects, preserving original metadata
-                for split_chunk in md_header_splits:
-                    headings_list = []
-                    # Extract header values in order based on headers_to_split_on
-                    for _, header_meta_key_name in headers_to_split_on:
-                        if header_meta_key_name in split_chunk.metadata:
-                            headings_list.append(
-                                split_chunk.metadata[header_meta_key_name]
-                            )
-
-                    md_split_docs.append(
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata, "headings": headings_list},
-                        )
-                    )
+        check_duplicate_content(collection_name, metadata["hash"])
 
-            docs = md_split_docs
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
-
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": {
-                "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-            },
-        }
-        for doc in docs
-    ]
+    texts, metadatas = get_chunks(request, docs, metadata, split=split)
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -1335,6 +1381,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEXES.delete_collection(collection_name=collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1380,29 +1427,107 @@ def save_docs_to_vector_db(
         )
         log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
-
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
-
-        log.info(f"added {len(items)} items to collection {collection_name}")
+        insert_chunks(collection_name, texts, embeddings, metadatas)
         return True
     except Exception as e:
         log.exception(e)
         raise e
 
 
+def get_loader(request: Request) -> Loader:
+    return Loader(
+        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
+        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
+        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
+        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
+        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
+        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
+        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
+        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
+        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
+        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
+        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
+        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
+        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
+        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
+        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
+        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
+        DOCLING_PARAMS={
+            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
+            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
+            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
+            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
+            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
+            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
+            "pipeline": request.app.state.config.DOCLING_PIPELINE,
+            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
+            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
+            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
+            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
+        },
+        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
+        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
+        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
+    )
+
+
+def get_file_docs(
+    request: Request,
+    file: FileModel,
+    content: Optional[str] = None,
+    load: Optional[Callable[[str, Optional[str], str], list[Document]]] = None,
+) -> list[Document]:
+    """
+    Documents of `file`: the given `content`, the stored file extracted with
+    `load` (the configured loader by default) or the content extracted before.
+    """
+    metadata = {
+        "name": file.filename,
+        "created_by": file.user_id,
+        "file_id": file.id,
+        "source": file.filename,
+    }
+
+    if content is not None:
+        return [
+            Document(
+                page_content=content.replace("<br/>", "\n"),
+                metadata={**file.meta, **metadata},
+            )
+        ]
+
+    if not file.path:
+        return [
+            Document(
+                page_content=file.data.get("content", ""),
+                metadata={**file.meta, **metadata},
+            )
+        ]
+
+    if load is None:
+        load = get_loader(request).load
+
+    docs = load(
+        file.filename, file.meta.get("content_type"), Storage.get_file(file.path)
+    )
+    return [
+        Document(page_content=doc.page_content, metadata={**doc.metadata, **metadata})
+        for doc in docs
+    ]
+
+
+def save_file_content(file: FileModel, text_content: str) -> str:
+    """Store the extracted content of `file` and return its hash."""
+    Files.update_file_data_by_id(
+        file.id,
+        {"content": text_content},
+    )
+    hash = calculate_sha256_string(text_content)
+    Files.update_file_hash_by_id(file.id, hash)
+    return hash
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1437,23 +1562,12 @@ def process_file(
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=f"file-{file.id}"
                     )
+                    BM25_INDEXES.delete_collection(collection_name=f"file-{file.id}")
                 except:
                     # Audio file upload pipeline
                     pass
 
-                docs = [
-                    Document(
-                        page_content=form_data.content.replace("<br/>", "\n"),
-                        metadata={
-                            **file.meta,
-                            "name": file.filename,
-                            "created_by": file.user_id,
-                            "file_id": file.id,
-                            "source": file.filename,
-                        },
-                    )
-                ]
-
+                docs = get_file_docs(request, file, form_data.content)
                 text_content = form_data.content
             elif form_data.collection_name:
                 # Check if the file has already been processed and save the content
@@ -1472,100 +1586,17 @@ def process_file(
                         for idx, id in enumerate(result.ids[0])
                     ]
                 else:
-                    docs = [
-                        Document(
-                            page_content=file.data.get("content", ""),
-                            metadata={
-                                **file.meta,
-                                "name": file.filename,
-                                "created_by": file.user_id,
-                                "file_id": file.id,
-                                "source": file.filename,
-                            },
-                        )
-                    ]
+                    docs = get_file_docs(request, file, file.data.get("content", ""))
 
                 text_content = file.data.get("content", "")
             else:
                 # Process the file and save the content
                 # Usage: /files/
-                file_path = file.path
-                if file_path:
-                    file_path = Storage.get_file(file_path)
-                    loader = Loader(
-                        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
-                        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
-                        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
-                        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
-                        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
-                        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
-                        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
-                        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
-                        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
-                        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
-                        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
-                        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
-                        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
-                        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
-                        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
-                        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
-                        DOCLING_PARAMS={
-                            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
-                            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
-                            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
-                            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
-                            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
-                            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
-                            "pipeline": request.app.state.config.DOCLING_PIPELINE,
-                            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
-                            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
-                            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
-                            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
-                        },
-                        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
-                        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
-                        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
-                        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
-                    )
-                    docs = loader.load(
-                        file.filename, file.meta.get("content_type"), file_path
-                    )
-
-                    docs = [
-                        Document(
-                            page_content=doc.page_content,
-                            metadata={
-                                **doc.metadata,
-                                "name": file.filename,
-                                "created_by": file.user_id,
-                                "file_id": file.id,
-                                "source": file.filename,
-                            },
-                        )
-                        for doc in docs
-                    ]
-                else:
-                    docs = [
-                        Document(
-                            page_content=file.data.get("content", ""),
-                            metadata={
-                                **file.meta,
-                                "name": file.filename,
-                                "created_by": file.user_id,
-                                "file_id": file.id,
-                                "source": file.filename,
-                            },
-                        )
-                    ]
+                docs = get_file_docs(request, file)
                 text_content = " ".join([doc.page_content for doc in docs])
 
             log.debug(f"text_content: {text_content}")
-            Files.update_file_data_by_id(
-                file.id,
-                {"content": text_content},
-            )
-            hash = calculate_sha256_string(text_content)
-            Files.update_file_hash_by_id(file.id, hash)
+            hash = save_file_content(file, text_content)
 
             if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
                 Files.update_file_data_by_id(file.id, {"status": "completed"})
@@ -2184,13 +2215,8 @@ def query_doc_handler(
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH and (
             form_data.hybrid is None or form_data.hybrid
         ):
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2326,6 +2352,9 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEXES.delete(
+                collection_name=form_data.collection_name, filter={"hash": hash}
+            )
             return {"status": True}
         else:
             return {"status": False}
@@ -2337,6 +2366,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEXES.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -1,17 +1,14 @@
 import asyncio
-import random
 
 import socketio
 import logging
 import sys
-import time
 from typing import Dict, Set
 from redis import asyncio as aioredis
 import pycrdt as Y
 
 from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
-from open_webui.models.chats import Chats
 from open_webui.models.notes import Notes, NoteUpdateForm
 from open_webui.utils.redis import (
     get_sentinels_from_env,
@@ -23,13 +20,20 @@ from open_webui.env import (
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
     WEBSOCKET_REDIS_CLUSTER,
-    WEBSOCKET_REDIS_LOCK_TIMEOUT,
+    WEBSOCKET_SESSION_TTL,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
     REDIS_KEY_PREFIX,
+    CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL,
+    CHAT_MESSAGE_BUFFER_MAX_SIZE,
+    YDOC_COMPACTION_THRESHOLD,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.socket.utils import (
+    SocketPool,
+    YdocManager,
+    ChatMessageBuffer,
+)
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
@@ -47,6 +51,7 @@ log.setLevel(SRC_LOG_LEVELS["SOCKET"])
 
 
 REDIS = None
+YDOC_REDIS = None
 
 if WEBSOCKET_MANAGER == "redis":
     if WEBSOCKET_SENTINEL_HOSTS:
@@ -78,7 +83,7 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
-# Dictionary to maintain the user pool
+# Socket sessions, users and models in use are tracked in SOCKET_POOL
 
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
@@ -90,103 +95,57 @@ if WEBSOCKET_MANAGER == "redis":
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
         async_mode=True,
     )
-
-    redis_sentinels = get_sentinels_from_env(
-        WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
-    )
-    SESSION_POOL = RedisDict(
-        f"{REDIS_KEY_PREFIX}:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
-    )
-    USER_POOL = RedisDict(
-        f"{REDIS_KEY_PREFIX}:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
-    )
-    USAGE_POOL = RedisDict(
-        f"{REDIS_KEY_PREFIX}:usage_pool",
+    # Yjs updates are stored as raw bytes
+    YDOC_REDIS = get_redis_connection(
         redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
+        redis_sentinels=get_sentinels_from_env(
+            WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+        ),
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+        async_mode=True,
+        decode_responses=False,
     )
 
-    clean_up_lock = RedisLock(
-        redis_url=WEBSOCKET_REDIS_URL,
-        lock_name=f"{REDIS_KEY_PREFIX}:usage_cleanup_lock",
-        timeout_secs=WEBSOCKET_REDIS_LOCK_TIMEOUT,
-        redis_sentinels=redis_sentinels,
-        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
-    )
-    aquire_func = clean_up_lock.aquire_lock
-    renew_func = clean_up_lock.renew_lock
-    release_func = clean_up_lock.release_lock
-else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-
-    aquire_func = release_func = renew_func = lambda: True
 
+SOCKET_POOL = SocketPool(
+    redis=REDIS,
+    redis_key_prefix=f"{REDIS_KEY_PREFIX}:socket",
+    ttl=WEBSOCKET_SESSION_TTL,
+    usage_ttl=TIMEOUT_DURATION,
+)
 
 YDOC_MANAGER = YdocManager(
-    redis=REDIS,
+    redis=YDOC_REDIS,
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
+    compaction_threshold=YDOC_COMPACTION_THRESHOLD,
 )
 
+CHAT_MESSAGE_BUFFER = ChatMessageBuffer(
+    redis=REDIS,
+    redis_key_prefix=f"{REDIS_KEY_PREFIX}:chat:messages:buffer",
+    flush_interval=CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL,
+    max_size=CHAT_MESSAGE_BUFFER_MAX_SIZE,
+)
 
-async def periodic_usage_pool_cleanup():
-    max_retries = 2
-    retry_delay = random.uniform(
-        WEBSOCKET_REDIS_LOCK_TIMEOUT / 2, WEBSOCKET_REDIS_LOCK_TIMEOUT
-    )
-    for attempt in range(max_retries + 1):
-        if aquire_func():
-            break
-        else:
-            if attempt < max_retries:
-                log.debug(
-                    f"Cleanup lock already exists. Retry {attempt + 1} after {retry_delay}s..."
-                )
-                await asyncio.sleep(retry_delay)
-            else:
-                log.warning(
-                    "Failed to acquire cleanup lock after retries. Skipping cleanup."
-                )
-                return
 
-    log.debug("Running periodic_cleanup")
-    try:
-        while True:
-            if not renew_func():
-                log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
-                raise Exception("Unable to renew usage pool cleanup lock.")
-
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-            await asyncio.sleep(TIMEOUT_DURATION)
-    finally:
-        release_func()
+async def periodic_socket_pool_refresh():
+    log.debug("Running periodic_socket_pool_refresh")
+    while True:
+        await asyncio.sleep(WEBSOCKET_SESSION_TTL / 3)
+        try:
+            await SOCKET_POOL.refresh()
+        except Exception as e:
+            log.error(f"Error refreshing socket pool: {e}")
+
+
+async def periodic_chat_message_buffer_flush():
+    log.debug("Running periodic_chat_message_buffer_flush")
+    while True:
+        await asyncio.sleep(CHAT_MESSAGE_BUFFER_FLUSH_INTERVAL)
+        try:
+            await CHAT_MESSAGE_BUFFER.flush_expired()
+        except Exception as e:
+            log.error(f"Error flushing chat message buffer: {e}")
 
 
 app = socketio.ASGIApp(
@@ -195,24 +154,28 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await SOCKET_POOL.get_models_in_use()
 
 
-def get_active_user_ids():
+async def get_active_user_ids():
     """Get the list of active user IDs."""
-    return list(USER_POOL.keys())
+    return await SOCKET_POOL.get_active_user_ids()
 
 
-def get_user_active_status(user_id):
+def get_active_user_count():
+    """Get the number of active users as of the last socket pool refresh."""
+    return SOCKET_POOL.get_active_user_count()
+
+
+async def get_user_active_status(user_id):
     """Check if a user is currently active."""
-    return user_id in USER_POOL
+    return await SOCKET_POOL.is_user_active(user_id)
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SOCKET_POOL.get_session(sid)
     if user:
         return user["id"]
     return None
@@ -227,33 +190,29 @@ def get_session_ids_from_room(room):
     return [session_id[0] for session_id in active_session_ids]
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = get_session_ids_from_room(room)
 
     active_user_ids = list(
-        set([SESSION_POOL.get(session_id)["id"] for session_id in active_session_ids])
+        set(
+            [
+                user["id"]
+                for user in await SOCKET_POOL.get_sessions(active_session_ids)
+                if user
+            ]
+        )
     )
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await SOCKET_POOL.is_user_active(user_id)
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
-        model_id = data["model"]
-        # Record the timestamp for the last update
-        current_time = int(time.time())
-
-        # Store the new usage data and task
-        USAGE_POOL[model_id] = {
-            **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-            sid: {"updated_at": current_time},
-        }
+    if await SOCKET_POOL.get_session(sid):
+        await SOCKET_POOL.record_usage(data["model"])
 
 
 @sio.event
@@ -263,16 +222,12 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump(
-                exclude=["date_of_birth", "bio", "gender"]
+            await SOCKET_POOL.add_session(
+                sid, user.model_dump(exclude=["date_of_birth", "bio", "gender"])
             )
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
 
 
 @sio.on("user-join")
@@ -286,18 +241,16 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump(exclude=["date_of_birth", "bio", "gender"])
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await SOCKET_POOL.add_session(
+        sid, user.model_dump(exclude=["date_of_birth", "bio", "gender"])
+    )
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
+    channels = await Channels.get_channels_by_user_id_async(user.id)
     log.debug(f"{channels=}")
     for channel in channels:
         await sio.enter_room(sid, f"channel:{channel.id}")
@@ -314,12 +267,12 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
+    channels = await Channels.get_channels_by_user_id_async(user.id)
     log.debug(f"{channels=}")
     for channel in channels:
         await sio.enter_room(sid, f"channel:{channel.id}")
@@ -335,11 +288,11 @@ async def join_note(sid, data):
     if token_data is None or "id" not in token_data:
         return
 
-    user = Users.get_user_by_id(token_data["id"])
+    user = await Users.get_user_by_id_async(token_data["id"])
     if not user:
         return
 
-    note = Notes.get_note_by_id(data["note_id"])
+    note = await Notes.get_note_by_id_async(data["note_id"])
     if not note:
         log.error(f"Note {data['note_id']} not found for user {user.id}")
         return
@@ -378,7 +331,9 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(
+                    **(await SOCKET_POOL.get_session(sid))
+                ).model_dump(),
             },
             room=room,
         )
@@ -387,14 +342,14 @@ async def channel_events(sid, data):
 @sio.on("ydoc:document:join")
 async def ydoc_document_join(sid, data):
     """Handle user joining a document"""
-    user = SESSION_POOL.get(sid)
+    user = await SOCKET_POOL.get_session(sid)
 
     try:
         document_id = data["document_id"]
 
         if document_id.startswith("note:"):
             note_id = document_id.split(":")[1]
-            note = Notes.get_note_by_id(note_id)
+            note = await Notes.get_note_by_id_async(note_id)
             if not note:
                 log.error(f"Note {note_id} not found")
                 return
@@ -464,7 +419,7 @@ async def ydoc_document_join(sid, data):
 async def document_save_handler(document_id, data, user):
     if document_id.startswith("note:"):
         note_id = document_id.split(":")[1]
-        note = Notes.get_note_by_id(note_id)
+        note = await Notes.get_note_by_id_async(note_id)
         if not note:
             log.error(f"Note {note_id} not found")
             return
@@ -538,7 +493,7 @@ async def yjs_document_update(sid, data):
 
         await YDOC_MANAGER.append_to_updates(
             document_id=document_id,
-            update=update,  # Convert list of bytes to bytes
+            update=bytes(update),  # Convert list of bytes to bytes
         )
 
         # Broadcast update to all other users in the document
@@ -557,7 +512,7 @@ async def yjs_document_update(sid, data):
         async def debounced_save():
             await asyncio.sleep(0.5)
             await document_save_handler(
-                document_id, data.get("data", {}), SESSION_POOL.get(sid)
+                document_id, data.get("data", {}), await SOCKET_POOL.get_session(sid)
             )
 
         if data.get("data"):
@@ -589,12 +544,12 @@ async def yjs_document_leave(sid, data):
             room=f"doc_{document_id}",
         )
 
-        if (
-            await YDOC_MANAGER.document_exists(document_id)
-            and len(await YDOC_MANAGER.get_users(document_id)) == 0
-        ):
-            log.info(f"Cleaning up document {document_id} as no users are left")
-            await YDOC_MANAGER.clear_document(document_id)
+        if await YDOC_MANAGER.document_exists(document_id):
+            if len(await YDOC_MANAGER.get_users(document_id)) == 0:
+                log.info(f"Cleaning up document {document_id} as no users are left")
+                await YDOC_MANAGER.clear_document(document_id)
+            else:
+                await YDOC_MANAGER.compact(document_id)
 
     except Exception as e:
         log.error(f"Error in yjs_document_leave: {e}")
@@ -622,16 +577,7 @@ async def yjs_awareness_update(sid, data):
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
+    if await SOCKET_POOL.remove_session(sid):
         await YDOC_MANAGER.remove_user_from_all_documents(sid)
     else:
         pass
@@ -644,7 +590,7 @@ def get_event_emitter(request_info, update_db=True):
 
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await SOCKET_POOL.get_user_session_ids(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -669,78 +615,28 @@ def get_event_emitter(request_info, update_db=True):
         await asyncio.gather(*emit_tasks)
 
         if update_db:
-            if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
+            event_type = event_data.get("type")
 
-            if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
-            if "type" in event_data and event_data["type"] == "replace":
-                content = event_data.get("data", {}).get("content", "")
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "content": content,
-                    },
-                )
-
-            if "type" in event_data and event_data["type"] == "files":
-                message = Chats.get_message_by_id_and_message_id(
+            # Persisted message updates are buffered and written behind the stream
+            if event_type in ["status", "message", "replace", "files"] or (
+                event_type in ["source", "citation"]
+                and event_data.get("data", {}).get("type") == None
+            ):
+                await CHAT_MESSAGE_BUFFER.append(
                     request_info["chat_id"],
                     request_info["message_id"],
+                    event_data,
                 )
 
-                files = event_data.get("data", {}).get("files", [])
-                files.extend(message.get("files", []))
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "files": files,
-                    },
+            if event_type == "chat:tasks:cancel" or (
+                event_type == "chat:completion"
+                and event_data.get("data", {}).get("done")
+            ):
+                await CHAT_MESSAGE_BUFFER.flush(
+                    request_info.get("chat_id"),
+                    request_info.get("message_id"),
                 )
 
-            if event_data.get("type") in ["source", "citation"]:
-                data = event_data.get("data", {})
-                if data.get("type") == None:
-                    message = Chats.get_message_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                    )
-
-                    sources = message.get("sources", [])
-                    sources.append(data)
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "sources": sources,
-                        },
-                    )
-
     return __event_emitter__
 
 
@@ -1,152 +1,314 @@
+import asyncio
 import json
-import uuid
-from open_webui.utils.redis import get_redis_connection
-from open_webui.env import REDIS_KEY_PREFIX
+import logging
+import time
+from contextlib import asynccontextmanager
+from open_webui.models.chats import Chats
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
 
-class RedisLock:
-    def __init__(
-        self,
-        redis_url,
-        lock_name,
-        timeout_secs,
-        redis_sentinels=[],
-        redis_cluster=False,
-    ):
-
-        self.lock_name = lock_name
-        self.lock_id = str(uuid.uuid4())
-        self.timeout_secs = timeout_secs
-        self.lock_obtained = False
-        self.redis = get_redis_connection(
-            redis_url,
-            redis_sentinels,
-            redis_cluster=redis_cluster,
-            decode_responses=True,
-        )
-
-    def aquire_lock(self):
-        # nx=True will only set this key if it _hasn't_ already been set
-        self.lock_obtained = self.redis.set(
-            self.lock_name, self.lock_id, nx=True, ex=self.timeout_secs
-        )
-        return self.lock_obtained
-
-    def renew_lock(self):
-        # xx=True will only set this key if it _has_ already been set
-        return self.redis.set(
-            self.lock_name, self.lock_id, xx=True, ex=self.timeout_secs
-        )
 
-    def release_lock(self):
-        lock_value = self.redis.get(self.lock_name)
-        if lock_value and lock_value == self.lock_id:
-            self.redis.delete(self.lock_name)
+class SocketPool:
+    """
+    Tracks connected socket sessions, the sessions of each user and the
+    models in use.
 
+    With Redis, each session is stored under its own key and every user and
+    model keeps a sorted set of session IDs scored by expiry time, so joins
+    and leaves are single atomic ZADD/ZREM commands instead of rewriting a
+    JSON list. Entries expire after `ttl` seconds unless `refresh` (run
+    periodically by each node for the sessions it owns) extends them, so
+    sessions of a node that went away disappear on their own; models are in
+    use for `usage_ttl` seconds after their last usage event. Sessions
+    connected to this node are mirrored locally and looked up without Redis.
+    """
 
-class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[], redis_cluster=False):
-        self.name = name
-        self.redis = get_redis_connection(
-            redis_url,
-            redis_sentinels,
-            redis_cluster=redis_cluster,
-            decode_responses=True,
-        )
+    def __init__(
+        self,
+        redis=None,
+        redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:socket",
+        ttl: int = 60,
+        usage_ttl: int = 3,
+    ):
+        self._redis = redis
+        self._redis_key_prefix = redis_key_prefix
+        self.ttl = ttl
+        self.usage_ttl = usage_ttl
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+        # Sessions connected to this node: sid -> user
+        self._sessions = {}
+        # Without Redis, the other nodes' view is this node's view
+        self._user_sessions = {}  # user_id -> {sid, ...}
+        self._usage = {}  # model_id -> expires_at
+        # Number of active users across nodes as of the last refresh
+        self._active_user_count = 0
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+    def _key(self, *parts) -> str:
+        return ":".join([self._redis_key_prefix, *parts])
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+    async def add_session(self, sid: str, user: dict):
+        self._sessions[sid] = user
+        self._user_sessions.setdefault(user["id"], set()).add(sid)
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+        if self._redis:
+            expires_at = time.time() + self.ttl
+            async with self._redis.pipeline(transaction=False) as pipe:
+                await (
+                    pipe.set(self._key("session", sid), json.dumps(user), ex=self.ttl)
+                    .zadd(self._key("user", user["id"]), {sid: expires_at})
+                    .expire(self._key("user", user["id"]), self.ttl)
+                    .zadd(self._key("users"), {user["id"]: expires_at}, gt=True)
+                    .execute()
+                )
+
+    async def remove_session(self, sid: str) -> Optional[dict]:
+        user = self._sessions.pop(sid, None)
+        if user is None:
+            return None
+
+        sids = self._user_sessions.get(user["id"], set())
+        sids.discard(sid)
+        if not sids:
+            self._user_sessions.pop(user["id"], None)
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
+        if self._redis:
+            user_key = self._key("user", user["id"])
+            async with self._redis.pipeline(transaction=False) as pipe:
+                _, _, remaining = (
+                    await pipe.delete(self._key("session", sid))
+                    .zrem(user_key, sid)
+                    .zcount(user_key, time.time(), "+inf")
+                    .execute()
+                )
+            if remaining == 0:
+                await self._redis.zrem(self._key("users"), user["id"])
+
+        return user
+
+    async def get_session(self, sid: str) -> Optional[dict]:
+        if sid in self._sessions or not self._redis:
+            return self._sessions.get(sid)
+
+        user = await self._redis.get(self._key("session", sid))
+        return json.loads(user) if user else None
+
+    async def get_sessions(self, sids: List[str]) -> List[Optional[dict]]:
+        remote = [sid for sid in sids if sid not in self._sessions]
+        users = {}
+        if remote and self._redis:
+            values = await self._redis.mget(
+                [self._key("session", sid) for sid in remote]
+            )
+            users = {
+                sid: json.loads(value) for sid, value in zip(remote, values) if value
+            }
+        return [self._sessions.get(sid, users.get(sid)) for sid in sids]
+
+    async def get_user_session_ids(self, user_id: str) -> List[str]:
+        if self._redis:
+            return await self._redis.zrangebyscore(
+                self._key("user", user_id), time.time(), "+inf"
+            )
+        return list(self._user_sessions.get(user_id, []))
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+    async def is_user_active(self, user_id: str) -> bool:
+        if self._redis:
+            expires_at = await self._redis.zscore(self._key("users"), user_id)
+            return expires_at is not None and expires_at > time.time()
+        return user_id in self._user_sessions
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
+    async def get_active_user_ids(self) -> List[str]:
+        if self._redis:
+            return await self._redis.zrangebyscore(
+                self._key("users"), time.time(), "+inf"
+            )
+        return list(self._user_sessions.keys())
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+    async def record_usage(self, model_id: str):
+        expires_at = time.time() + self.usage_ttl
 
-    def get(self, key, default=None):
-        try:
-            return self[key]
-        except KeyError:
-            return default
+        if self._redis:
+            await self._redis.zadd(self._key("models"), {model_id: expires_at}, gt=True)
+        else:
+            self._usage[model_id] = max(self._usage.get(model_id, 0), expires_at)
 
-    def clear(self):
-        self.redis.delete(self.name)
+    async def get_models_in_use(self) -> List[str]:
+        now = time.time()
+        if self._redis:
+            return await self._redis.zrangebyscore(self._key("models"), now, "+inf")
+        return [
+            model_id for model_id, expires_at in self._usage.items() if expires_at > now
+        ]
+
+    async def refresh(self):
+        """Extend the sessions owned by this node and drop expired entries."""
+        now = time.time()
+
+        if not self._redis:
+            for model_id, expires_at in list(self._usage.items()):
+                if expires_at <= now:
+                    del self._usage[model_id]
+            return
+
+        expires_at = now + self.ttl
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for sid, user in list(self._sessions.items()):
+                pipe.expire(self._key("session", sid), self.ttl)
+                pipe.zadd(self._key("user", user["id"]), {sid: expires_at})
+                pipe.expire(self._key("user", user["id"]), self.ttl)
+                pipe.zadd(self._key("users"), {user["id"]: expires_at}, gt=True)
+            pipe.zremrangebyscore(self._key("users"), "-inf", now)
+            pipe.zremrangebyscore(self._key("models"), "-inf", now)
+            pipe.zcard(self._key("users"))
+            results = await pipe.execute()
+        self._active_user_count = results[-1]
+
+    def get_active_user_count(self) -> int:
+        """Number of active users, without a Redis round trip (for metrics)."""
+        if self._redis:
+            return self._active_user_count
+        return len(self._user_sessions)
 
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
 
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+class YdocManager:
+    """
+    Stores the Yjs update log of collaborative documents.
 
+    Updates are kept as raw bytes (the Redis connection must not decode
+    responses). Once a document has accumulated `compaction_threshold`
+    updates, or when a user leaves it, the log is merged into a single state
+    snapshot, so joining a document only loads the snapshot plus a short tail.
+    """
 
-class YdocManager:
     def __init__(
         self,
         redis=None,
         redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:ydoc:documents",
+        compaction_threshold: int = 200,
+        lock_timeout_secs: int = 30,
     ):
         self._updates = {}
+        self._snapshots = {}
         self._users = {}
         self._redis = redis
         self._redis_key_prefix = redis_key_prefix
+        self._compaction_threshold = compaction_threshold
+        self._lock_timeout_secs = lock_timeout_secs
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
 
     async def append_to_updates(self, document_id: str, update: bytes):
         document_id = document_id.replace(":", "_")
+        update = bytes(update)
+
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.rpush(redis_key, json.dumps(list(update)))
+            length = await self._redis.rpush(redis_key, update)
         else:
             if document_id not in self._updates:
                 self._updates[document_id] = []
             self._updates[document_id].append(update)
+            length = len(self._updates[document_id])
+
+        if self._compaction_threshold and length >= self._compaction_threshold:
+            await self.compact(document_id)
 
     async def get_updates(self, document_id: str) -> List[bytes]:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            updates = await self._redis.lrange(redis_key, 0, -1)
-            return [bytes(json.loads(update)) for update in updates]
+            async with self._redis.pipeline(transaction=False) as pipe:
+                snapshot, updates = (
+                    await pipe.get(f"{self._redis_key_prefix}:{document_id}:snapshot")
+                    .lrange(f"{self._redis_key_prefix}:{document_id}:updates", 0, -1)
+                    .execute()
+                )
+        else:
+            snapshot = self._snapshots.get(document_id)
+            updates = self._updates.get(document_id, [])
+
+        return [snapshot, *updates] if snapshot else list(updates)
+
+    async def compact(self, document_id: str):
+        """Merge the snapshot and the current update log into a new snapshot."""
+        document_id = document_id.replace(":", "_")
+
+        if self._redis:
+            lock_key = f"{self._redis_key_prefix}:{document_id}:compaction_lock"
+            snapshot_key = f"{self._redis_key_prefix}:{document_id}:snapshot"
+            updates_key = f"{self._redis_key_prefix}:{document_id}:updates"
+
+            # Only one worker may compact a document; the others keep appending
+            if not await self._redis.set(
+                lock_key, 1, nx=True, ex=self._lock_timeout_secs
+            ):
+                return
+
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    snapshot, updates = (
+                        await pipe.get(snapshot_key)
+                        .lrange(updates_key, 0, -1)
+                        .execute()
+                    )
+                if not updates:
+                    return
+
+                state = self._merge([snapshot, *updates] if snapshot else updates)
+
+                # Updates appended meanwhile are past len(updates) and are kept.
+                # Readers may briefly see both the snapshot and the merged
+                # updates, which is harmless as Yjs updates are idempotent.
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    await pipe.set(snapshot_key, state).ltrim(
+                        updates_key, len(updates), -1
+                    ).execute()
+            except Exception as e:
+                log.exception(f"Error compacting document {document_id}: {e}")
+            finally:
+                await self._redis.delete(lock_key)
         else:
-            return self._updates.get(document_id, [])
+            updates = self._updates.get(document_id)
+            if not updates:
+                return
+
+            snapshot = self._snapshots.get(document_id)
+            self._snapshots[document_id] = self._merge(
+                [snapshot, *updates] if snapshot else updates
+            )
+            self._updates[document_id] = []
+
+        log.debug(f"Compacted {len(updates)} updates of document {document_id}")
+
+    @staticmethod
+    def _merge(updates: List[bytes]) -> bytes:
+        ydoc = Y.Doc()
+        for update in updates:
+            ydoc.apply_update(bytes(update))
+        return ydoc.get_update()
 
     async def document_exists(self, document_id: str) -> bool:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            return await self._redis.exists(redis_key) > 0
+            return (
+                await self._redis.exists(
+                    f"{self._redis_key_prefix}:{document_id}:updates"
+                )
+                > 0
+                or await self._redis.exists(
+                    f"{self._redis_key_prefix}:{document_id}:snapshot"
+                )
+                > 0
+            )
         else:
-            return document_id in self._updates
+            return document_id in self._updates or document_id in self._snapshots
 
     async def get_users(self, document_id: str) -> List[str]:
         document_id = document_id.replace(":", "_")
@@ -154,7 +316,7 @@ class YdocManager:
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:users"
             users = await self._redis.smembers(redis_key)
-            return list(users)
+            return [self._decode(user) for user in users]
         else:
             return self._users.get(document_id, [])
 
@@ -183,6 +345,7 @@ class YdocManager:
         if self._redis:
             keys = await self._redis.keys(f"{self._redis_key_prefix}:*")
             for key in keys:
+                key = self._decode(key)
                 if key.endswith(":users"):
                     await self._redis.srem(key, user_id)
 
@@ -203,12 +366,179 @@ class YdocManager:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.delete(redis_key)
-            redis_users_key = f"{self._redis_key_prefix}:{document_id}:users"
-            await self._redis.delete(redis_users_key)
+            for suffix in ["updates", "snapshot", "users"]:
+                await self._redis.delete(
+                    f"{self._redis_key_prefix}:{document_id}:{suffix}"
+                )
         else:
             if document_id in self._updates:
                 del self._updates[document_id]
+            if document_id in self._snapshots:
+                del self._snapshots[document_id]
             if document_id in self._users:
                 del self._users[document_id]
+
+
+class ChatMessageBuffer:
+    """
+    Write-behind buffer for the message events emitted while a response is
+    being generated. Events are coalesced per message and written with a
+    single upsert once the buffer is older than `flush_interval` seconds,
+    holds more than `max_size` characters, or is flushed explicitly.
+
+    Flushes of the same message are serialized, and events are only dropped
+    from the buffer once they have been written.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:chat:messages:buffer",
+        flush_interval: float = 1.0,
+        max_size: int = 4096,
+        expire_secs: int = 3600,
+    ):
+        self._events = {}
+        self._pending = {}
+        self._locks = {}
+        self._redis = redis
+        self._redis_key_prefix = redis_key_prefix
+        self._flush_interval = flush_interval
+        self._max_size = max_size
+        self._expire_secs = expire_secs
+
+    @staticmethod
+    def get_message_update(message: dict, events: list[dict]) -> dict:
+        """Fold buffered events into the fields to upsert on the message."""
+        update = {}
+        for event in events:
+            event_type = event.get("type")
+            data = event.get("data", {})
+
+            if event_type == "status":
+                update["statusHistory"] = [
+                    *update.get("statusHistory", message.get("statusHistory", [])),
+                    data,
+                ]
+            elif event_type == "message":
+                update["content"] = update.get(
+                    "content", message.get("content", "")
+                ) + data.get("content", "")
+            elif event_type == "replace":
+                update["content"] = data.get("content", "")
+            elif event_type == "files":
+                update["files"] = [
+                    *data.get("files", []),
+                    *update.get("files", message.get("files", [])),
+                ]
+            elif event_type in ["source", "citation"]:
+                update["sources"] = [
+                    *update.get("sources", message.get("sources", [])),
+                    data,
+                ]
+
+        return update
+
+    async def append(self, chat_id: str, message_id: str, event: dict):
+        key = f"{chat_id}:{message_id}"
+
+        if self._redis:
+            redis_key = f"{self._redis_key_prefix}:{key}"
+            async with self._redis.pipeline(transaction=True) as pipe:
+                await pipe.rpush(redis_key, json.dumps(event)).expire(
+                    redis_key, self._expire_secs
+                ).execute()
+        else:
+            self._events.setdefault(key, []).append(event)
+
+        pending = self._pending.setdefault(
+            key,
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "size": 0,
+                "created_at": time.monotonic(),
+            },
+        )
+
+        content = event.get("data", {}).get("content")
+        pending["size"] += len(content) if isinstance(content, str) else 1
+
+        if pending["size"] >= self._max_size:
+            await self.flush(chat_id, message_id)
+
+    @asynccontextmanager
+    async def _flush_lock(self, key: str):
+        lock, users = self._locks.get(key, (asyncio.Lock(), 0))
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users > 1:
+                self._locks[key] = (lock, users - 1)
+            else:
+                del self._locks[key]
+
+    async def flush(self, chat_id: str, message_id: str):
+        key = f"{chat_id}:{message_id}"
+
+        # Only this node knows what it buffered, so there is nothing to do
+        # (and no round trip to make) for messages it has not seen. A flush
+        # that is still writing is waited for, so that callers can rely on
+        # the buffered events being written when this returns.
+        if key not in self._pending and key not in self._locks:
+            return
+
+        async with self._flush_lock(key):
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                # Flushed while waiting for the lock
+                return
+
+            if self._redis:
+                redis_key = f"{self._redis_key_prefix}:{key}"
+                events = [
+                    json.loads(event)
+                    for event in await self._redis.lrange(redis_key, 0, -1)
+                ]
+            else:
+                events = list(self._events.get(key, []))
+
+            if not events:
+                return
+
+            try:
+                message = await Chats.get_message_by_id_and_message_id_async(
+                    chat_id, message_id
+                )
+                if message is not None:
+                    update = self.get_message_update(message, events)
+                    if update:
+                        await Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                            chat_id, message_id, update
+                        )
+            except Exception as e:
+                log.exception(f"Error flushing events for message {key}: {e}")
+                # Keep the events for the next flush
+                self._pending.setdefault(key, pending)
+                return
+
+            # Events appended while writing stay in the buffer
+            if self._redis:
+                await self._redis.ltrim(redis_key, len(events), -1)
+            else:
+                del self._events[key][: len(events)]
+                if not self._events[key]:
+                    del self._events[key]
+
+    async def flush_expired(self):
+        now = time.monotonic()
+        for pending in list(self._pending.values()):
+            if now - pending["created_at"] >= self._flush_interval:
+                await self.flush(pending["chat_id"], pending["message_id"])
+
+    async def flush_all(self):
+        for pending in list(self._pending.values()):
+            await self.flush(pending["chat_id"], pending["message_id"])
@@ -0,0 +1,185 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from open_webui.internal.db import engine, get_db
+from open_webui.models.chats import (
+    Chat,
+    ChatForm,
+    ChatMessage,
+    ChatModel,
+    Chats,
+    ChatSearch,
+    ChatTitleIdResponse,
+)
+
+MIGRATION = (
+    Path(__file__).parents[4]
+    / "migrations"
+    / "versions"
+    / "023b9b31572b_add_chat_message_table.py"
+)
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("chat_message_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+
+def run_migration(connection, fn):
+    with Operations.context(MigrationContext.configure(connection)):
+        fn()
+
+
+def get_chat_document(messages: dict) -> dict:
+    return {
+        "title": "Chat",
+        "history": {"currentId": list(messages)[-1], "messages": messages},
+    }
+
+
+@pytest.fixture
+def chat_tables():
+    tables = [Chat.__table__, ChatMessage.__table__, ChatSearch.__table__]
+    for table in reversed(tables):
+        table.drop(engine, checkfirst=True)
+    for table in tables:
+        table.create(engine)
+
+
+def test_backfill_and_downgrade_migration():
+    migration = load_migration()
+    migration_engine = sa.create_engine("sqlite://")
+    chat_table = sa.Table(
+        "chat",
+        sa.MetaData(),
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String()),
+        sa.Column("chat", sa.JSON()),
+    )
+
+    with migration_engine.begin() as connection:
+        chat_table.create(connection)
+        connection.execute(
+            sa.insert(chat_table),
+            [
+                {
+                    "id": "chat",
+                    "user_id": "user",
+                    "chat": get_chat_document(
+                        {
+                            "1": {"id": "1", "content": "Hi"},
+                            "2": {"id": "2", "parentId": "1", "content": "Hello"},
+                        }
+                    ),
+                },
+                {
+                    "id": "shared",
+                    "user_id": "shared-chat",
+                    "chat": get_chat_document({"1": {"id": "1", "content": "Hi"}}),
+                },
+            ],
+        )
+
+        run_migration(connection, migration.upgrade)
+
+        rows = connection.execute(
+            sa.text("SELECT chat_id, id, parent_id FROM chat_message ORDER BY id")
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [("chat", "1", None), ("chat", "2", "1")]
+
+        # Messages written after the upgrade only exist as rows
+        connection.execute(
+            sa.text(
+                "UPDATE chat_message SET data = :data WHERE chat_id = 'chat' AND id = '2'"
+            ),
+            {"data": '{"id": "2", "parentId": "1", "content": "Hello there"}'},
+        )
+
+        run_migration(connection, migration.downgrade)
+
+        assert not sa.inspect(connection).has_table("chat_message")
+        chat = connection.execute(
+            sa.select(chat_table.c.chat).where(chat_table.c.id == "chat")
+        ).scalar()
+        assert chat["history"]["messages"]["2"]["content"] == "Hello there"
+        assert chat["history"]["messages"]["1"]["content"] == "Hi"
+        assert chat["history"]["currentId"] == "2"
+
+
+def test_message_rows_take_precedence_over_the_document(chat_tables):
+    chat = Chats.insert_new_chat(
+        "user",
+        ChatForm(chat=get_chat_document({"1": {"id": "1", "content": "Hi"}})),
+    )
+
+    Chats.upsert_message_to_chat_by_id_and_message_id(
+        chat.id, "1", {"content": "Hi there"}
+    )
+    Chats.upsert_message_to_chat_by_id_and_message_id(
+        chat.id, "2", {"id": "2", "parentId": "1", "content": "Hello"}
+    )
+
+    # The first update only changed the row, not the stored document
+    with get_db() as db:
+        document = db.get(Chat, chat.id).chat
+    assert document["history"]["messages"]["1"]["content"] == "Hi"
+
+    for full_chat in [
+        Chats.get_chat_by_id(chat.id),
+        Chats.get_chats_by_user_id("user")[0],
+    ]:
+        messages = full_chat.chat["history"]["messages"]
+        assert messages["1"]["content"] == "Hi there"
+        assert messages["2"] == {"id": "2", "parentId": "1", "content": "Hello"}
+        assert full_chat.chat["history"]["currentId"] == "2"
+
+
+def test_update_chat_replaces_message_rows(chat_tables):
+    chat = Chats.insert_new_chat(
+        "user",
+        ChatForm(
+            chat=get_chat_document(
+                {
+                    "1": {"id": "1", "content": "Hi"},
+                    "2": {"id": "2", "parentId": "1", "content": "Hello"},
+                }
+            )
+        ),
+    )
+
+    Chats.update_chat_by_id(
+        chat.id, get_chat_document({"1": {"id": "1", "content": "Edited"}})
+    )
+
+    with get_db() as db:
+        assert db.query(ChatMessage).filter_by(chat_id=chat.id).count() == 1
+    assert Chats.get_chat_by_id(chat.id).chat["history"]["messages"] == {
+        "1": {"id": "1", "content": "Edited"}
+    }
+
+
+def test_chat_lists_do_not_load_documents(chat_tables):
+    chat = Chats.insert_new_chat(
+        "user",
+        ChatForm(chat=get_chat_document({"1": {"id": "1", "content": "Hi"}})),
+    )
+    Chats.toggle_chat_pinned_by_id(chat.id)
+
+    for chat_list in [
+        Chats.get_chat_list_by_user_id("user"),
+        Chats.get_pinned_chats_by_user_id("user"),
+        Chats.get_chat_list_by_chat_ids([chat.id]),
+    ]:
+        assert len(chat_list) == 1
+        assert isinstance(chat_list[0], ChatTitleIdResponse)
+        assert chat_list[0].id == chat.id
+        assert chat_list[0].title == "Chat"
+
+    assert isinstance(Chats.get_chats_by_user_id("user")[0], ChatModel)
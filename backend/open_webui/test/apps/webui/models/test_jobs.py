@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from open_webui.internal.db import engine, get_db
+from open_webui.models.jobs import Job, Jobs
+
+
+@pytest.fixture(autouse=True)
+def job_table():
+    Job.__table__.create(engine, checkfirst=True)
+    with get_db() as db:
+        db.query(Job).delete()
+        db.commit()
+
+
+def test_enqueue_job_with_key_is_idempotent():
+    job = Jobs.enqueue_job("reindex", {"file_id": "1"}, key="reindex:1")
+    assert Jobs.enqueue_job("reindex", {"file_id": "1"}, key="reindex:1").id == job.id
+
+    claimed = Jobs.claim_job("worker-a", 60, ["reindex"])
+    assert Jobs.enqueue_job("reindex", {}, key="reindex:1").status == "running"
+
+    assert Jobs.complete_job(claimed.id, "worker-a")
+    requeued = Jobs.enqueue_job("reindex", {"file_id": "1"}, key="reindex:1")
+    assert requeued.id == job.id
+    assert requeued.status == "queued"
+    assert requeued.attempts == 0
+
+
+def test_claim_job_leases_a_job_to_one_worker():
+    job = Jobs.enqueue_job("reindex", {}, max_attempts=3)
+
+    claimed = Jobs.claim_job("worker-a", 60, ["reindex"])
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claimed.worker_id == "worker-a"
+    assert claimed.attempts == 1
+
+    assert Jobs.claim_job("worker-b", 60, ["reindex"]) is None
+    assert Jobs.claim_job("worker-b", 60, ["other"]) is None
+
+
+def test_expired_lease_is_reclaimed():
+    job = Jobs.enqueue_job("reindex", {}, max_attempts=3)
+    Jobs.claim_job("worker-a", -1, ["reindex"])
+
+    reclaimed = Jobs.claim_job("worker-b", 60, ["reindex"])
+    assert reclaimed.id == job.id
+    assert reclaimed.worker_id == "worker-b"
+    assert reclaimed.attempts == 2
+
+    # The first worker no longer owns the job
+    assert not Jobs.renew_lease(job.id, "worker-a", 60)
+    assert not Jobs.complete_job(job.id, "worker-a")
+    assert Jobs.renew_lease(job.id, "worker-b", 60)
+
+
+def test_expired_lease_fails_job_after_max_attempts():
+    job = Jobs.enqueue_job("reindex", {}, max_attempts=1)
+    Jobs.claim_job("worker-a", -1, ["reindex"])
+
+    assert Jobs.claim_job("worker-b", 60, ["reindex"]) is None
+    with get_db() as db:
+        failed = db.get(Job, job.id)
+        assert failed.status == "failed"
+        assert failed.error == "Worker stopped responding"
+
+
+def test_failed_job_is_retried_after_backoff():
+    job = Jobs.enqueue_job("reindex", {}, max_attempts=3)
+    Jobs.claim_job("worker-a", 60, ["reindex"])
+
+    assert Jobs.fail_job(job.id, "worker-a", "Timeout", int(time.time()) + 60)
+    assert Jobs.claim_job("worker-b", 60, ["reindex"]) is None
+
+    with get_db() as db:
+        db.query(Job).filter_by(id=job.id).update({"available_at": 0})
+        db.commit()
+
+    retried = Jobs.claim_job("worker-b", 60, ["reindex"])
+    assert retried.id == job.id
+    assert retried.attempts == 2
+    assert retried.error == "Timeout"
+
+
+def test_cancelled_job_is_not_retried():
+    job = Jobs.enqueue_job("reindex", {}, max_attempts=3)
+    Jobs.claim_job("worker-a", 60, ["reindex"])
+
+    assert Jobs.cancel_job(job.id, "worker-a")
+    assert Jobs.claim_job("worker-b", 60, ["reindex"]) is None
+    assert Jobs.get_job_stats()["cancelled"] == 1
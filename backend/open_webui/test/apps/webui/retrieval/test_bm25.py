@@ -0,0 +1,82 @@
+import pytest
+
+from open_webui.internal.db import engine, get_db
+from open_webui.models.bm25 import BM25IndexLog, BM25IndexLogs, BM25IndexVersion
+from open_webui.retrieval import bm25
+from open_webui.retrieval.bm25 import BM25IndexManager
+from open_webui.retrieval.vector.main import GetResult
+
+
+class StaticVectorDB:
+    def __init__(self, chunks: dict[str, str]):
+        self.chunks = chunks
+
+    def get(self, collection_name):
+        ids = list(self.chunks)
+        return GetResult(
+            ids=[ids],
+            documents=[[self.chunks[id] for id in ids]],
+            metadatas=[[{"file_id": id.split("-")[0]} for id in ids]],
+        )
+
+
+@pytest.fixture(autouse=True)
+def bm25_tables():
+    tables = [BM25IndexVersion.__table__, BM25IndexLog.__table__]
+    for table in tables:
+        table.create(engine, checkfirst=True)
+    with get_db() as db:
+        db.query(BM25IndexLog).delete()
+        db.query(BM25IndexVersion).delete()
+        db.commit()
+
+
+def item(id: str, text: str) -> dict:
+    return {"id": id, "text": text, "metadata": {"file_id": id.split("-")[0]}}
+
+
+def search_ids(manager: BM25IndexManager, query: str) -> list[str]:
+    return sorted(text for _, text, _ in manager.search("knowledge", query, 10))
+
+
+def test_index_is_built_once_from_the_vector_db(monkeypatch):
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", StaticVectorDB({"a-1": "red apple"}))
+    replica = BM25IndexManager()
+
+    assert search_ids(replica, "apple") == ["red apple"]
+    assert BM25IndexLogs.get_version("knowledge") == 1
+
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", StaticVectorDB({}))
+    assert search_ids(BM25IndexManager(), "apple") == ["red apple"]
+
+
+def test_replicas_see_each_others_updates(monkeypatch):
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", StaticVectorDB({}))
+    replica_a, replica_b = BM25IndexManager(), BM25IndexManager()
+    assert search_ids(replica_b, "apple") == []
+
+    replica_a.add("knowledge", [item("a-1", "red apple"), item("b-1", "green apple")])
+    assert search_ids(replica_b, "apple") == ["green apple", "red apple"]
+
+    replica_a.delete("knowledge", filter={"file_id": "a"})
+    assert search_ids(replica_b, "apple") == ["green apple"]
+
+    replica_b.delete_collection("knowledge")
+    assert search_ids(replica_a, "apple") == []
+
+
+def test_compaction_keeps_the_index(monkeypatch):
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", StaticVectorDB({}))
+    replica_a = BM25IndexManager(max_log_entries=4)
+    replica_b = BM25IndexManager(max_log_entries=4)
+    assert search_ids(replica_b, "apple") == []
+
+    for i in range(10):
+        replica_a.add("knowledge", [item(f"a-{i}", f"apple {i}")])
+        replica_a.delete("knowledge", ids=[f"a-{i - 1}"])
+        search_ids(replica_a, "apple")
+
+    # Compacted into a snapshot and the entries appended since
+    assert len(BM25IndexLogs.get_entries("knowledge")) <= 5
+    assert search_ids(replica_b, "apple") == ["apple 9"]
+    assert search_ids(BM25IndexManager(), "apple") == ["apple 9"]
@@ -0,0 +1,72 @@
+from open_webui.retrieval import utils
+from open_webui.retrieval.vector.main import SearchResult, VectorDBBase
+
+
+class InMemoryVectorDB(VectorDBBase):
+    """Returns the stored chunks of a collection in score order, ignoring the vector."""
+
+    def __init__(self, collections: dict[str, list[tuple[str, float]]]):
+        self.collections = collections
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def insert(self, collection_name, items):
+        pass
+
+    def upsert(self, collection_name, items):
+        pass
+
+    def search(self, collection_name, vectors, limit):
+        chunks = sorted(
+            self.collections.get(collection_name, []),
+            key=lambda chunk: chunk[1],
+            reverse=True,
+        )[:limit]
+        return SearchResult(
+            ids=[[f"{collection_name}-{text}" for text, _ in chunks]],
+            distances=[[score for _, score in chunks]],
+            documents=[[text for text, _ in chunks]],
+            metadatas=[[{"source": collection_name} for _ in chunks]],
+        )
+
+    def query(self, collection_name, filter, limit=None):
+        return None
+
+    def get(self, collection_name):
+        return None
+
+    def delete(self, collection_name, ids=None, filter=None):
+        pass
+
+    def reset(self):
+        pass
+
+
+def test_query_collection_returns_k_unique_chunks(monkeypatch):
+    # The knowledge collection holds the chunks of its files as well, so the
+    # best matches of both collections are the same chunks
+    file_chunks = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    monkeypatch.setattr(
+        utils,
+        "VECTOR_DB_CLIENT",
+        InMemoryVectorDB(
+            {
+                "knowledge": file_chunks + [("d", 0.6), ("e", 0.5)],
+                "file-1": file_chunks,
+            }
+        ),
+    )
+
+    result = utils.query_collection(
+        collection_names=["knowledge", "file-1"],
+        queries=["query"],
+        embedding_function=lambda queries, prefix=None: [[0.0] for _ in queries],
+        k=3,
+    )
+
+    assert result["documents"] == [["a", "b", "c"]]
+    assert result["distances"] == [[0.9, 0.8, 0.7]]
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from fakeredis import aioredis
+
+from open_webui.socket import utils
+from open_webui.socket.utils import ChatMessageBuffer
+
+
+class FakeChats:
+    def __init__(self):
+        self.message = {"content": ""}
+        self.read = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+        self.failures = 0
+
+    async def get_message_by_id_and_message_id_async(self, chat_id, message_id):
+        message = dict(self.message)
+        self.read.set()
+        await self.release.wait()
+        return message
+
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, chat_id, message_id, update
+    ):
+        if self.failures:
+            self.failures -= 1
+            raise Exception("database is locked")
+        self.message = {**self.message, **update}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def buffer(request):
+    if request.param == "redis":
+        return ChatMessageBuffer(redis=aioredis.FakeRedis(decode_responses=True))
+    return ChatMessageBuffer()
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    chats = FakeChats()
+    monkeypatch.setattr(utils, "Chats", chats)
+    return chats
+
+
+def chunk(content: str) -> dict:
+    return {"type": "message", "data": {"content": content}}
+
+
+@pytest.mark.asyncio
+async def test_overlapping_flushes_keep_all_chunks(buffer, chats):
+    await buffer.append("chat", "message", chunk("a"))
+
+    chats.release.clear()
+    periodic = asyncio.create_task(buffer.flush("chat", "message"))
+    await chats.read.wait()
+
+    # Appended while the periodic flush is writing
+    await buffer.append("chat", "message", chunk("b"))
+    final = asyncio.create_task(buffer.flush("chat", "message"))
+    await asyncio.sleep(0)
+
+    chats.release.set()
+    await asyncio.gather(periodic, final)
+
+    assert chats.message["content"] == "ab"
+    assert buffer._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_running_flush(buffer, chats):
+    await buffer.append("chat", "message", chunk("a"))
+
+    chats.release.clear()
+    periodic = asyncio.create_task(buffer.flush("chat", "message"))
+    await chats.read.wait()
+
+    # Nothing new to write, but the periodic flush has not finished yet
+    final = asyncio.create_task(buffer.flush("chat", "message"))
+    await asyncio.sleep(0)
+    assert not final.done()
+
+    chats.release.set()
+    await final
+    assert periodic.done()
+    assert chats.message["content"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_events(buffer, chats):
+    await buffer.append("chat", "message", chunk("a"))
+    chats.failures = 1
+
+    await buffer.flush("chat", "message")
+    assert chats.message["content"] == ""
+
+    await buffer.append("chat", "message", chunk("b"))
+    await buffer.flush("chat", "message")
+    assert chats.message["content"] == "ab"
+
+    # Nothing left to write
+    chats.message["content"] = ""
+    await buffer.flush_all()
+    assert chats.message["content"] == ""
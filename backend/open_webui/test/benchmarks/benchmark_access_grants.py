@@ -0,0 +1,140 @@
+"""
+Benchmark for listing the knowledge bases a user has access to.
+
+Creates 10k knowledge bases in an in-memory SQLite database, shared with a mix
+of users, groups and everyone, and compares evaluating `has_access` in Python
+on every row against filtering on the `access_grant` table in SQL.
+
+Usage: python -m open_webui.test.benchmarks.benchmark_access_grants
+"""
+
+import random
+import timeit
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.models.access_grants import AccessGrant, AccessGrants
+from open_webui.models.knowledge import Knowledge, KnowledgeModel
+from open_webui.utils.access_control import has_access
+
+RESOURCES = 10_000
+USERS = 1_000
+GROUPS = 200
+USER_GROUPS = 5
+REPEAT = 20
+
+
+def generate_access_control(rng: random.Random):
+    roll = rng.random()
+    if roll < 0.1:
+        return None  # public
+    if roll < 0.4:
+        return {}  # private
+
+    return {
+        permission: {
+            "group_ids": [f"group-{rng.randrange(GROUPS)}" for _ in range(2)],
+            "user_ids": [f"user-{rng.randrange(USERS)}" for _ in range(3)],
+        }
+        for permission in ("read", "write")
+    }
+
+
+def setup_database():
+    engine = create_engine("sqlite://")
+    Knowledge.__table__.create(engine)
+    AccessGrant.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    rng = random.Random(0)
+    with Session() as db:
+        for i in range(RESOURCES):
+            knowledge = Knowledge(
+                id=f"knowledge-{i}",
+                user_id=f"user-{rng.randrange(USERS)}",
+                name=f"Knowledge {i}",
+                description="",
+                data={},
+                meta={},
+                access_control=generate_access_control(rng),
+                created_at=i,
+                updated_at=i,
+            )
+            db.add(knowledge)
+            AccessGrants.set_access_grants(
+                db, "knowledge", knowledge.id, knowledge.access_control
+            )
+        db.commit()
+
+    return Session
+
+
+def list_in_python(Session, user_id: str, user_group_ids: set[str], permission: str):
+    with Session() as db:
+        return [
+            KnowledgeModel.model_validate(knowledge)
+            for knowledge in db.query(Knowledge)
+            .order_by(Knowledge.updated_at.desc())
+            .all()
+            if knowledge.user_id == user_id
+            or has_access(user_id, permission, knowledge.access_control, user_group_ids)
+        ]
+
+
+def list_in_sql(Session, user_id: str, user_group_ids: set[str], permission: str):
+    with Session() as db:
+        return [
+            KnowledgeModel.model_validate(knowledge)
+            for knowledge in db.query(Knowledge)
+            .filter(
+                or_(
+                    Knowledge.user_id == user_id,
+                    AccessGrants.get_access_filter(
+                        "knowledge", Knowledge.id, user_id, user_group_ids, permission
+                    ),
+                )
+            )
+            .order_by(Knowledge.updated_at.desc())
+            .all()
+        ]
+
+
+def main():
+    Session = setup_database()
+
+    user_id = "user-42"
+    user_group_ids = {f"group-{i}" for i in range(USER_GROUPS)}
+
+    for permission in ("read", "write"):
+        expected = [
+            knowledge.id
+            for knowledge in list_in_python(
+                Session, user_id, user_group_ids, permission
+            )
+        ]
+        actual = [
+            knowledge.id
+            for knowledge in list_in_sql(Session, user_id, user_group_ids, permission)
+        ]
+        assert expected == actual, f"Results differ for {permission}"
+
+        python_time = timeit.timeit(
+            lambda: list_in_python(Session, user_id, user_group_ids, permission),
+            number=REPEAT,
+        )
+        sql_time = timeit.timeit(
+            lambda: list_in_sql(Session, user_id, user_group_ids, permission),
+            number=REPEAT,
+        )
+
+        print(
+            f"{permission}: {len(actual)} of {RESOURCES} knowledge bases\n"
+            f"  has_access in Python: {python_time / REPEAT * 1000:.2f} ms\n"
+            f"  access_grant in SQL:  {sql_time / REPEAT * 1000:.2f} ms\n"
+            f"  speedup: {python_time / sql_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for merging query results across collections.
+
+Simulates 10 queries against 20 collections with k=50 (1000 result sets of
+50 chunks, with overlapping chunks across queries) and compares the NumPy
+backed merge against the previous pure Python implementation.
+
+Usage: python -m open_webui.test.benchmarks.benchmark_retrieval_merge
+"""
+
+import hashlib
+import random
+import timeit
+
+from open_webui.retrieval.utils import merge_and_sort_query_results
+from open_webui.utils.misc import calculate_sha256_string
+
+QUERIES = 10
+COLLECTIONS = 20
+K = 50
+CHUNKS_PER_COLLECTION = 200
+REPEAT = 20
+
+
+def merge_and_sort_query_results_legacy(query_results: list[dict], k: int) -> dict:
+    combined = dict()
+
+    for data in query_results:
+        distances = data["distances"][0]
+        documents = data["documents"][0]
+        metadatas = data["metadatas"][0]
+
+        for distance, document, metadata in zip(distances, documents, metadatas):
+            if isinstance(document, str):
+                doc_hash = hashlib.sha256(document.encode()).hexdigest()
+
+                if doc_hash not in combined.keys():
+                    combined[doc_hash] = (distance, document, metadata)
+                    continue
+
+                if distance > combined[doc_hash][0]:
+                    combined[doc_hash] = (distance, document, metadata)
+
+    combined = list(combined.values())
+    combined.sort(key=lambda x: x[0], reverse=True)
+
+    sorted_distances, sorted_documents, sorted_metadatas = (
+        zip(*combined[:k]) if combined else ([], [], [])
+    )
+
+    return {
+        "distances": [list(sorted_distances)],
+        "documents": [list(sorted_documents)],
+        "metadatas": [list(sorted_metadatas)],
+    }
+
+
+def generate_query_results() -> list[dict]:
+    random.seed(0)
+
+    collections = []
+    for c in range(COLLECTIONS):
+        chunks = []
+        for i in range(CHUNKS_PER_COLLECTION):
+            text = f"collection {c} chunk {i} " + "lorem ipsum dolor sit amet " * 30
+            chunks.append(
+                (
+                    text,
+                    {
+                        "file_id": f"file-{c}",
+                        "start_index": i,
+                        "chunk_hash": calculate_sha256_string(text),
+                    },
+                )
+            )
+        collections.append(chunks)
+
+    results = []
+    for _ in range(QUERIES):
+        for chunks in collections:
+            sample = random.sample(chunks, K)
+            distances = sorted((random.random() for _ in sample), reverse=True)
+            results.append(
+                {
+                    "distances": [distances],
+                    "documents": [[text for text, _ in sample]],
+                    "metadatas": [[metadata for _, metadata in sample]],
+                }
+            )
+    return results
+
+
+def main():
+    query_results = generate_query_results()
+
+    legacy = merge_and_sort_query_results_legacy(query_results, k=K)
+    current = merge_and_sort_query_results(query_results, k=K)
+    assert legacy["distances"] == current["distances"]
+    assert legacy["documents"] == current["documents"]
+
+    print(
+        f"{QUERIES} queries x {COLLECTIONS} collections x k={K} "
+        f"({QUERIES * COLLECTIONS * K} rows), best of {REPEAT} runs:"
+    )
+    for name, func in [
+        ("legacy", merge_and_sort_query_results_legacy),
+        ("numpy", merge_and_sort_query_results),
+    ]:
+        seconds = min(
+            timeit.repeat(lambda: func(query_results, k=K), number=1, repeat=REPEAT)
+        )
+        print(f"  {name:<8} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from open_webui.models.files import FileModel
+from open_webui.routers import retrieval
+from open_webui.utils import ingestion
+from open_webui.utils.ingestion import IngestionPipeline
+
+
+class FakeFiles:
+    def __init__(self):
+        self.data = {}
+        self.meta = {}
+        self.hashes = {}
+
+    def update_file_data_by_id(self, id, data):
+        self.data.setdefault(id, {}).update(data)
+
+    def update_file_metadata_by_id(self, id, meta):
+        self.meta.setdefault(id, {}).update(meta)
+
+    def update_file_hash_by_id(self, id, hash):
+        self.hashes[id] = hash
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collections = {}
+
+    def query(self, collection_name, filter, limit=None):
+        return None
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def insert(self, collection_name, items):
+        self.collections.setdefault(collection_name, []).extend(items)
+
+
+class FakeBM25Indexes:
+    def add(self, collection_name, items):
+        pass
+
+
+def get_request(embedded: list):
+    def embedding_function(texts, prefix=None, user=None):
+        embedded.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    config = SimpleNamespace(
+        TEXT_SPLITTER="character",
+        CHUNK_SIZE=30,
+        CHUNK_OVERLAP=0,
+        BYPASS_EMBEDDING_AND_RETRIEVAL=False,
+        RAG_EMBEDDING_ENGINE="",
+        RAG_EMBEDDING_MODEL="test-model",
+    )
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(config=config, EMBEDDING_FUNCTION=embedding_function)
+        )
+    )
+
+
+def test_pipeline_processes_file_content(monkeypatch):
+    files, vector_db = FakeFiles(), FakeVectorDB()
+    for module in (ingestion, retrieval):
+        monkeypatch.setattr(module, "Files", files)
+        monkeypatch.setattr(module, "VECTOR_DB_CLIENT", vector_db)
+    monkeypatch.setattr(retrieval, "BM25_INDEXES", FakeBM25Indexes())
+
+    embedded = []
+    file = FileModel(
+        id="file-id",
+        user_id="user-id",
+        filename="notes.txt",
+        meta={"content_type": "text/plain"},
+        data={},
+        created_at=0,
+        updated_at=0,
+    )
+    user = SimpleNamespace(id="user-id")
+    content = "The first paragraph.\n\nThe second paragraph."
+
+    pipeline = IngestionPipeline(extract_workers=0)
+    result = pipeline.submit(get_request(embedded), file, user, content=content)
+
+    assert result.result(timeout=10) == {
+        "status": True,
+        "collection_name": "file-file-id",
+        "filename": "notes.txt",
+        "content": content,
+    }
+    assert embedded == [["The first paragraph.", "The second paragraph."]]
+
+    items = vector_db.collections["file-file-id"]
+    assert [item["text"] for item in items] == [
+        "The first paragraph.",
+        "The second paragraph.",
+    ]
+    assert items[0]["vector"] == [20.0]
+    assert items[0]["metadata"]["file_id"] == "file-id"
+    assert items[0]["metadata"]["hash"] == files.hashes["file-id"]
+    assert items[0]["metadata"]["embedding_config"]["model"] == "test-model"
+
+    assert files.data["file-id"]["content"] == content
+    assert files.data["file-id"]["status"] == "completed"
+    assert files.meta["file-id"] == {"collection_name": "file-file-id"}
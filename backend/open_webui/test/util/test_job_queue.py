@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from open_webui.internal.db import engine, get_db
+from open_webui.models.jobs import Job, Jobs
+from open_webui.utils.jobs import JobQueue
+
+
+@pytest.fixture(autouse=True)
+def job_table():
+    Job.__table__.create(engine, checkfirst=True)
+    with get_db() as db:
+        db.query(Job).delete()
+        db.commit()
+
+
+def get_job(id: str) -> Job:
+    with get_db() as db:
+        return db.get(Job, id)
+
+
+async def run_job(queue: JobQueue, handler) -> tuple[Job, asyncio.Task]:
+    queue.register("test", handler)
+    Jobs.enqueue_job("test", {}, max_attempts=queue.max_attempts)
+    job = Jobs.claim_job(queue.worker_id, queue.lease_timeout, ["test"])
+
+    task = asyncio.create_task(queue._run_job(None, job))
+    queue._running[job.id] = task
+    await asyncio.sleep(0.05)
+    return job, task
+
+
+async def wait_forever(request, job):
+    await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_stopped_job_is_cancelled():
+    job, task = await run_job(JobQueue(), wait_forever)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert get_job(job.id).status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_shutdown_requeues_running_jobs():
+    queue = JobQueue()
+    job, _ = await run_job(queue, wait_forever)
+
+    await queue.shutdown()
+
+    assert get_job(job.id).status == "queued"
+    assert get_job(job.id).worker_id is None
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_cancels_the_handler():
+    queue = JobQueue(lease_timeout=3)
+    job, task = await run_job(queue, wait_forever)
+
+    # Reclaimed by another worker
+    with get_db() as db:
+        db.query(Job).filter_by(id=job.id).update({"worker_id": "worker-b"})
+        db.commit()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, 3)
+
+    assert get_job(job.id).status == "running"
+    assert get_job(job.id).worker_id == "worker-b"
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_with_backoff():
+    async def fail(request, job):
+        raise Exception("Timeout")
+
+    queue = JobQueue(retry_delay=10)
+    job, task = await run_job(queue, fail)
+    await task
+
+    failed = get_job(job.id)
+    assert failed.status == "queued"
+    assert failed.error == "Timeout"
+    assert failed.available_at >= int(time.time()) + 9
+    assert queue.retried == 1
@@ -53,14 +53,14 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_group_permissions = Groups.get_group_permissions_by_member_id(user_id)
 
     # Deep copy default permissions to avoid modifying the original dict
     permissions = json.loads(json.dumps(default_permissions))
 
     # Combine permissions from all user groups
-    for group in user_groups:
-        permissions = combine_permissions(permissions, group.permissions or {})
+    for group_permissions in user_group_permissions:
+        permissions = combine_permissions(permissions, group_permissions)
 
     # Ensure all fields from default_permissions are present and filled in
     permissions = fill_missing_permissions(permissions, default_permissions)
@@ -92,10 +92,10 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_group_permissions = Groups.get_group_permissions_by_member_id(user_id)
 
-    for group in user_groups:
-        if get_permission(group.permissions or {}, permission_hierarchy):
+    for group_permissions in user_group_permissions:
+        if get_permission(group_permissions, permission_hierarchy):
             return True
 
     # Check default permissions afterward if the group permissions don't allow it
@@ -119,8 +119,7 @@ def has_access(
             return True
 
     if user_group_ids is None:
-        user_groups = Groups.get_groups_by_member_id(user_id)
-        user_group_ids = {group.id for group in user_groups}
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
 
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
@@ -1,4 +1,7 @@
+import asyncio
 import logging
+import threading
+import time
 import uuid
 import jwt
 import base64
@@ -34,6 +37,8 @@ from open_webui.env import (
     STATIC_DIR,
     SRC_LOG_LEVELS,
     WEBUI_AUTH_TRUSTED_EMAIL_HEADER,
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
@@ -54,6 +59,89 @@ ALGORITHM = "HS256"
 ##############
 
 
+class UserActivityTracker:
+    """
+    Collects the latest activity timestamp per user in memory and writes them
+    with one bulk UPDATE per flush. Activity is not recorded while the stored
+    last_active_at is less than `granularity` seconds old.
+    """
+
+    def __init__(self, granularity: Optional[float] = None):
+        self.granularity = max(granularity or 0, 1)
+
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        self.skipped = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.last_flush_size = 0
+        self.last_flush_latency = 0.0
+
+    def record(self, user):
+        now = int(time.time())
+        if user.last_active_at and now - user.last_active_at < self.granularity:
+            self.skipped += 1
+            return
+
+        with self._lock:
+            self._pending[user.id] = now
+
+    def flush(self) -> bool:
+        """
+        Write the pending timestamps. If the write fails, they are put back to
+        be retried with the next flush and False is returned.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return True
+
+        start = time.perf_counter()
+        rows = Users.update_users_last_active_by_ids(pending)
+        if rows is None:
+            with self._lock:
+                for user_id, last_active_at in pending.items():
+                    if last_active_at > self._pending.get(user_id, 0):
+                        self._pending[user_id] = last_active_at
+            return False
+
+        self.flushes += 1
+        self.flushed_rows += rows
+        self.last_flush_size = len(pending)
+        self.last_flush_latency = time.perf_counter() - start
+        log.debug(
+            f"Updated last_active_at of {rows}/{len(pending)} users "
+            f"in {self.last_flush_latency * 1000:.1f}ms"
+        )
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "skipped": self.skipped,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_latency": self.last_flush_latency,
+        }
+
+
+USER_ACTIVITY_TRACKER = UserActivityTracker(
+    granularity=DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+)
+
+
+async def periodic_user_activity_flush():
+    while True:
+        await asyncio.sleep(DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(USER_ACTIVITY_TRACKER.flush)
+        except Exception as e:
+            log.exception(f"Error flushing user activity: {e}")
+
+
 def verify_signature(payload: str, signature: str) -> bool:
     """
     Verifies the HMAC signature of the received payload.
@@ -206,7 +294,7 @@ def get_http_authorization_cred(auth_header: Optional[str]):
         return None
 
 
-def get_current_user(
+async def get_current_user(
     request: Request,
     response: Response,
     background_tasks: BackgroundTasks,
@@ -248,7 +336,7 @@ def get_current_user(
                     status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.API_KEY_NOT_ALLOWED
                 )
 
-        user = get_current_user_by_api_key(token)
+        user = await get_current_user_by_api_key(token)
 
         # Add user info to current span
         current_span = trace.get_current_span()
@@ -272,7 +360,7 @@ def get_current_user(
             )
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -297,12 +385,9 @@ def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(
-                        Users.update_user_last_active_by_id, user.id
-                    )
+                # Refresh the user's last active timestamp in the next bulk
+                # update to prevent writing on every request
+                USER_ACTIVITY_TRACKER.record(user)
             return user
         else:
             raise HTTPException(
@@ -324,8 +409,8 @@ def get_current_user(
         raise e
 
 
-def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+async def get_current_user_by_api_key(api_key: str):
+    user = await Users.get_user_by_api_key_async(api_key)
 
     if user is None:
         raise HTTPException(
@@ -341,7 +426,7 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        USER_ACTIVITY_TRACKER.record(user)
 
     return user
 
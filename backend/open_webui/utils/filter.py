@@ -1,5 +1,6 @@
 import inspect
 import logging
+import time
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
@@ -134,3 +135,118 @@ async def process_filter_functions(
             del form_data["files"]
 
     return form_data, {}
+
+
+class StreamFilterPipeline:
+    """
+    The "stream" handlers of a response's filters, prepared once.
+
+    Loading the modules and valves, resolving the handler signatures and
+    loading user valves happens when the pipeline is built, so filtering a
+    chunk only calls the handlers. The prepared state is rebuilt when valves
+    or function code change in this process, and at least every
+    `refresh_interval` seconds to pick up changes made by other workers.
+    """
+
+    def __init__(
+        self, request, filter_functions, extra_params, refresh_interval: float = 30
+    ):
+        self.request = request
+        self.filter_functions = filter_functions
+        self.extra_params = extra_params
+        self.refresh_interval = refresh_interval
+
+        self.handlers = []
+        self._version = None
+        self._prepared_at = 0.0
+
+    def prepare(self):
+        handlers = []
+        for function in self.filter_functions:
+            if not function:
+                continue
+
+            filter_id = function.id
+            function_module = get_function_module(
+                self.request, filter_id, load_from_db=False
+            )
+            handler = getattr(function_module, "stream", None)
+            if not handler:
+                continue
+
+            valves = None
+            if hasattr(function_module, "valves") and hasattr(
+                function_module, "Valves"
+            ):
+                valves = Functions.get_function_valves_by_id(filter_id)
+                valves = function_module.Valves(**(valves if valves else {}))
+
+            sig = inspect.signature(handler)
+            params = {
+                k: v
+                for k, v in {
+                    **self.extra_params,
+                    "__id__": filter_id,
+                }.items()
+                if k in sig.parameters
+            }
+
+            user_valves = None
+            if "__user__" in sig.parameters and hasattr(function_module, "UserValves"):
+                try:
+                    user_valves = function_module.UserValves(
+                        **Functions.get_user_valves_by_id_and_user_id(
+                            filter_id, params["__user__"]["id"]
+                        )
+                    )
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
+
+            handlers.append(
+                (
+                    filter_id,
+                    function_module,
+                    handler,
+                    inspect.iscoroutinefunction(handler),
+                    params,
+                    valves,
+                    user_valves,
+                )
+            )
+
+        self.handlers = handlers
+        self._version = Functions.valves_version
+        self._prepared_at = time.monotonic()
+
+    async def process(self, event):
+        if (
+            self._version != Functions.valves_version
+            or time.monotonic() - self._prepared_at > self.refresh_interval
+        ):
+            self.prepare()
+
+        for (
+            filter_id,
+            function_module,
+            handler,
+            is_coroutine,
+            params,
+            valves,
+            user_valves,
+        ) in self.handlers:
+            try:
+                # Modules are shared between requests, so re-apply our valves
+                if valves is not None:
+                    function_module.valves = valves
+                if user_valves is not None:
+                    params["__user__"]["valves"] = user_valves
+
+                if is_coroutine:
+                    event = await handler(event=event, **params)
+                else:
+                    event = handler(event=event, **params)
+            except Exception as e:
+                log.debug(f"Error in stream handler {filter_id}: {e}")
+                raise e
+
+        return event
@@ -0,0 +1,386 @@
+import functools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import Request
+
+from open_webui.config import (
+    FILE_PROCESSING_EMBEDDING_BATCH_SIZE,
+    FILE_PROCESSING_EXTRACT_WORKERS,
+    FILE_PROCESSING_MAX_CONCURRENT_PER_USER,
+    FILE_PROCESSING_QUEUE_SIZE,
+    RAG_EMBEDDING_CONTENT_PREFIX,
+)
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.files import FileModel, Files
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.routers.retrieval import (
+    check_duplicate_content,
+    get_chunks,
+    get_file_docs,
+    get_loader,
+    insert_chunks,
+    save_file_content,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class IngestionJob:
+    def __init__(
+        self,
+        request: Request,
+        file: FileModel,
+        user,
+        collection_name: Optional[str] = None,
+        content: Optional[str] = None,
+    ):
+        self.request = request
+        self.file = file
+        self.user = user
+        self.content = content
+
+        # Uploads get a collection of their own and are checked for duplicate
+        # content, files added to a knowledge base are appended to its collection
+        self.add = collection_name is not None
+        self.collection_name = collection_name or f"file-{file.id}"
+
+        self.docs = []
+        self.text_content = ""
+        self.hash = None
+        self.texts = []
+        self.metadatas = []
+        self.embeddings = []
+        self.future = Future()
+
+
+class IngestionPipeline:
+    """
+    Processes files through extract -> split -> embed -> store stages that run
+    concurrently, connected by bounded queues.
+
+    CPU heavy parsers (PDF, Office, ...) run in a process pool, while remote
+    extraction engines and plain text are loaded in threads. The embedding
+    stage waits up to `max_latency` seconds to fill a batch of
+    `embedding_batch_size` chunks across files, so extraction and the embedding
+    backend stay busy at the same time during bulk uploads. Each user has at
+    most `max_concurrent_per_user` files in the pipeline; their other files
+    wait and users are served round-robin.
+
+    Progress is written to `file.data["progress"]` and the outcome to
+    `file.data["status"]` as before.
+    """
+
+    def __init__(
+        self,
+        extract_workers: int = 4,
+        queue_size: int = 32,
+        embedding_batch_size: int = 256,
+        max_concurrent_per_user: int = 8,
+        max_latency: float = 0.05,
+    ):
+        self.extract_workers = extract_workers
+        self.embedding_batch_size = max(embedding_batch_size, 1)
+        self.max_concurrent_per_user = max(max_concurrent_per_user, 1)
+        self.max_latency = max_latency
+
+        self._lock = threading.Condition()
+        self._pending = OrderedDict()  # user_id -> deque of jobs not started yet
+        self._running = {}  # user_id -> number of jobs in the pipeline
+        self._split_queue = queue.Queue(maxsize=queue_size)
+        self._embed_queue = queue.Queue(maxsize=queue_size)
+        self._store_queue = queue.Queue(maxsize=queue_size)
+
+        self._pool = None
+        self._workers = []
+
+    def submit(
+        self,
+        request: Request,
+        file: FileModel,
+        user,
+        collection_name: Optional[str] = None,
+        content: Optional[str] = None,
+    ) -> Future:
+        """
+        Queue `file` for processing. Its content is extracted from the stored
+        file unless `content` is given. The returned future resolves to the
+        same result as `process_file`.
+        """
+        job = IngestionJob(request, file, user, collection_name, content)
+
+        with self._lock:
+            self._start()
+            self._pending.setdefault(user.id, deque()).append(job)
+            self._lock.notify_all()
+
+        return job.future
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _start(self):
+        if self._workers:
+            return
+
+        if self.extract_workers > 0:
+            # Forking would copy the threads and connections of the server process
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        for name, target, count in [
+            # Extra threads so remote and plain text loads do not wait on the pool
+            ("extract", self._extract_worker, max(2 * self.extract_workers, 4)),
+            ("split", self._split_worker, 2),
+            ("embed", self._embed_worker, 2),
+            ("store", self._store_worker, 1),
+        ]:
+            for idx in range(count):
+                worker = threading.Thread(
+                    target=target, name=f"ingestion-{name}-{idx}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _next_job(self) -> IngestionJob:
+        with self._lock:
+            while True:
+                for user_id, jobs in self._pending.items():
+                    if self._running.get(user_id, 0) < self.max_concurrent_per_user:
+                        job = jobs.popleft()
+                        if jobs:
+                            self._pending.move_to_end(user_id)
+                        else:
+                            del self._pending[user_id]
+                        self._running[user_id] = self._running.get(user_id, 0) + 1
+                        return job
+                self._lock.wait()
+
+    def _set_progress(self, job: IngestionJob, stage: str, **kwargs):
+        Files.update_file_data_by_id(
+            job.file.id, {"progress": {"stage": stage, **kwargs}}
+        )
+
+    def _finish(self, job: IngestionJob):
+        with self._lock:
+            self._running[job.user.id] -= 1
+            if not self._running[job.user.id]:
+                del self._running[job.user.id]
+            self._lock.notify_all()
+
+    def _complete(self, job: IngestionJob, collection_name: Optional[str]):
+        if collection_name:
+            Files.update_file_metadata_by_id(
+                job.file.id, {"collection_name": collection_name}
+            )
+        Files.update_file_data_by_id(
+            job.file.id, {"status": "completed", "progress": None}
+        )
+        self._finish(job)
+
+        job.future.set_result(
+            {
+                "status": True,
+                "collection_name": collection_name,
+                "filename": job.file.filename,
+                "content": job.text_content,
+            }
+        )
+
+    def _fail(self, job: IngestionJob, e: Exception):
+        log.error(f"Error processing file {job.file.id}: {e}")
+        Files.update_file_data_by_id(
+            job.file.id,
+            {
+                "status": "failed",
+                "error": (
+                    ERROR_MESSAGES.PANDOC_NOT_INSTALLED
+                    if "No pandoc was found" in str(e)
+                    else str(e)
+                ),
+                "progress": None,
+            },
+        )
+        self._finish(job)
+        job.future.set_exception(e)
+
+    def _load(
+        self,
+        request: Request,
+        filename: str,
+        content_type: Optional[str],
+        file_path: str,
+    ) -> list:
+        loader = get_loader(request)
+        if self._pool is not None and loader.is_cpu_bound(
+            filename, content_type, file_path
+        ):
+            return self._pool.submit(
+                loader.load, filename, content_type, file_path
+            ).result()
+        return loader.load(filename, content_type, file_path)
+
+    def _extract_worker(self):
+        while True:
+            job = self._next_job()
+            try:
+                if job.content is None and job.file.path:
+                    self._set_progress(job, "extracting")
+
+                job.docs = get_file_docs(
+                    job.request,
+                    job.file,
+                    job.content,
+                    load=functools.partial(self._load, job.request),
+                )
+                job.text_content = (
+                    job.content
+                    if job.content is not None
+                    else " ".join(doc.page_content for doc in job.docs)
+                )
+                job.hash = save_file_content(job.file, job.text_content)
+
+                if job.request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+                    self._complete(job, None)
+                    continue
+            except Exception as e:
+                self._fail(job, e)
+                continue
+
+            self._split_queue.put(job)
+
+    def _split_worker(self):
+        while True:
+            job = self._split_queue.get()
+            try:
+                if not job.add:
+                    check_duplicate_content(job.collection_name, job.hash)
+
+                    if VECTOR_DB_CLIENT.has_collection(
+                        collection_name=job.collection_name
+                    ):
+                        log.info(f"collection {job.collection_name} already exists")
+                        self._complete(job, job.collection_name)
+                        continue
+
+                job.texts, job.metadatas = get_chunks(
+                    job.request,
+                    job.docs,
+                    (
+                        {}
+                        if job.add
+                        else {
+                            "file_id": job.file.id,
+                            "name": job.file.filename,
+                            "hash": job.hash,
+                        }
+                    ),
+                )
+                job.docs = []
+            except Exception as e:
+                self._fail(job, e)
+                continue
+
+            self._set_progress(job, "embedding", chunks=len(job.texts))
+            self._embed_queue.put(job)
+
+    def _embed_worker(self):
+        while True:
+            jobs = [self._embed_queue.get()]
+            size = len(jobs[0].texts)
+            deadline = time.monotonic() + self.max_latency
+            while size < self.embedding_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._embed_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job.texts)
+
+            # Embeddings are requested on behalf of a user, so only files of
+            # the same user share a call
+            user_jobs = {}
+            for job in jobs:
+                user_jobs.setdefault(job.user.id, []).append(job)
+
+            for group in user_jobs.values():
+                self._embed(group)
+
+    def _embed(self, jobs: list[IngestionJob]):
+        texts = [text for job in jobs for text in job.texts]
+        try:
+            embeddings = jobs[0].request.app.state.EMBEDDING_FUNCTION(
+                [text.replace("\n", " ") for text in texts],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=jobs[0].user,
+            )
+            if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                raise Exception("Error generating embeddings")
+        except Exception as e:
+            for job in jobs:
+                self._fail(job, e)
+            return
+
+        log.info(f"embeddings generated for {len(texts)} items from {len(jobs)} files")
+
+        offset = 0
+        for job in jobs:
+            job.embeddings = embeddings[offset : offset + len(job.texts)]
+            offset += len(job.texts)
+            self._store_queue.put(job)
+
+    def _store_worker(self):
+        while True:
+            jobs = [self._store_queue.get()]
+            while True:
+                try:
+                    jobs.append(self._store_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            collection_jobs = {}
+            for job in jobs:
+                collection_jobs.setdefault(job.collection_name, []).append(job)
+
+            for collection_name, group in collection_jobs.items():
+                self._store(collection_name, group)
+
+    def _store(self, collection_name: str, jobs: list[IngestionJob]):
+        try:
+            insert_chunks(
+                collection_name,
+                [text for job in jobs for text in job.texts],
+                [vector for job in jobs for vector in job.embeddings],
+                [metadata for job in jobs for metadata in job.metadatas],
+            )
+        except Exception as e:
+            log.exception(e)
+            for job in jobs:
+                self._fail(job, e)
+            return
+
+        for job in jobs:
+            self._complete(job, collection_name)
+
+
+INGESTION_PIPELINE = IngestionPipeline(
+    extract_workers=FILE_PROCESSING_EXTRACT_WORKERS,
+    queue_size=FILE_PROCESSING_QUEUE_SIZE,
+    embedding_batch_size=FILE_PROCESSING_EMBEDDING_BATCH_SIZE,
+    max_concurrent_per_user=FILE_PROCESSING_MAX_CONCURRENT_PER_USER,
+)
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers
+
+from open_webui.env import (
+    JOB_QUEUE_CONCURRENCY,
+    JOB_QUEUE_LEASE_TIMEOUT,
+    JOB_QUEUE_MAX_ATTEMPTS,
+    SRC_LOG_LEVELS,
+)
+from open_webui.models.jobs import JobModel, Jobs
+from open_webui.tasks import create_task
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class JobQueue:
+    """
+    Durable queue of background jobs stored in the `job` table.
+
+    Every replica runs a worker that leases due jobs, renews the lease with
+    heartbeats while their handler runs, and completes them or retries them
+    with exponential backoff. A job whose lease expires, e.g. because its
+    worker was restarted, is picked up again by any replica, so handlers must
+    be safe to resume. Running jobs are registered as tasks (see
+    `open_webui.tasks`) under their item id; stopping such a task cancels
+    the job, while jobs interrupted by `shutdown` are queued again.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        lease_timeout: int = 60,
+        max_attempts: int = 3,
+        retry_delay: int = 10,
+        poll_interval: float = 2,
+    ):
+        self.concurrency = concurrency
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers = {}
+
+        self._running = {}  # job id -> asyncio.Task
+        self._stopping = False
+        self._loop = None
+        self._wakeup = None
+
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def register(
+        self, type: str, handler: Callable[[Request, JobModel], Awaitable[None]]
+    ):
+        self.handlers[type] = handler
+
+    def enqueue(
+        self,
+        type: str,
+        payload: dict,
+        key: Optional[str] = None,
+        item_id: Optional[str] = None,
+    ) -> JobModel:
+        job = Jobs.enqueue_job(
+            type, payload, key=key, item_id=item_id, max_attempts=self.max_attempts
+        )
+
+        # Enqueued from request threads as well as from the event loop
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return job
+
+    def get_stats(self) -> dict:
+        return {
+            **Jobs.get_job_stats(),
+            "worker": {
+                "id": self.worker_id,
+                "running": len(self._running),
+                "concurrency": self.concurrency,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retried": self.retried,
+            },
+        }
+
+    async def run(self, app):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        # Handlers get a request of their own, like the startup tasks in main.py
+        request = Request(
+            {
+                "type": "http",
+                "asgi.version": "3.0",
+                "asgi.spec_version": "2.0",
+                "method": "GET",
+                "path": "/internal",
+                "query_string": b"",
+                "headers": Headers({}).raw,
+                "client": ("127.0.0.1", 12345),
+                "server": ("127.0.0.1", 80),
+                "scheme": "http",
+                "app": app,
+            }
+        )
+
+        pruned_at = 0
+        while True:
+            self._wakeup.clear()
+            try:
+                while len(self._running) < self.concurrency:
+                    job = await asyncio.to_thread(
+                        Jobs.claim_job,
+                        self.worker_id,
+                        self.lease_timeout,
+                        list(self.handlers),
+                    )
+                    if job is None:
+                        break
+                    await self._start_job(app, request, job)
+
+                # Completed jobs are kept a day for the throughput statistics
+                if time.time() - pruned_at > 3600:
+                    pruned_at = time.time()
+                    await asyncio.to_thread(
+                        Jobs.delete_completed_jobs, int(pruned_at) - 24 * 3600
+                    )
+            except Exception as e:
+                log.exception(f"Error claiming jobs: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def shutdown(self):
+        """Interrupt the running jobs and hand them to the next worker."""
+        self._stopping = True
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _start_job(self, app, request: Request, job: JobModel):
+        log.debug(f"Starting job {job.id} ({job.type}), attempt {job.attempts}")
+
+        _, task = await create_task(
+            app.state.redis, self._run_job(request, job), id=job.item_id or job.id
+        )
+        self._running[job.id] = task
+
+        def done(_):
+            self._running.pop(job.id, None)
+            self._wakeup.set()
+
+        task.add_done_callback(done)
+
+    async def _heartbeat(self, job: JobModel, task: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            if not await asyncio.to_thread(
+                Jobs.renew_lease, job.id, self.worker_id, self.lease_timeout
+            ):
+                # The job was reclaimed by another worker, so stop running it here
+                log.warning(f"Lost the lease of job {job.id}")
+                task.cancel()
+                return
+
+    async def _run_job(self, request: Request, job: JobModel):
+        heartbeat = asyncio.create_task(self._heartbeat(job, asyncio.current_task()))
+        try:
+            await self.handlers[job.type](request, job)
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                # Cancelled by the heartbeat: the job belongs to another worker
+                pass
+            elif self._stopping:
+                # Shutting down: hand the job to the next worker
+                await asyncio.to_thread(
+                    Jobs.fail_job,
+                    job.id,
+                    self.worker_id,
+                    "Interrupted",
+                    int(time.time()),
+                )
+            else:
+                # Stopped through the task API
+                log.info(f"Job {job.id} ({job.type}) was stopped")
+                await asyncio.to_thread(Jobs.cancel_job, job.id, self.worker_id)
+            raise
+        except Exception as e:
+            log.warning(f"Job {job.id} ({job.type}) failed: {e}")
+            if job.attempts < job.max_attempts:
+                self.retried += 1
+                retry_at = int(time.time() + self.retry_delay * 2 ** (job.attempts - 1))
+            else:
+                self.failed += 1
+                retry_at = None
+
+            await asyncio.to_thread(
+                Jobs.fail_job, job.id, self.worker_id, str(e), retry_at
+            )
+        else:
+            self.completed += 1
+            await asyncio.to_thread(Jobs.complete_job, job.id, self.worker_id)
+        finally:
+            heartbeat.cancel()
+
+
+JOB_QUEUE = JobQueue(
+    concurrency=JOB_QUEUE_CONCURRENCY,
+    lease_timeout=JOB_QUEUE_LEASE_TIMEOUT,
+    max_attempts=JOB_QUEUE_MAX_ATTEMPTS,
+)
@@ -32,6 +32,7 @@ from open_webui.socket.main import (
     get_event_call,
     get_event_emitter,
     get_active_status_by_user_id,
+    CHAT_MESSAGE_BUFFER,
 )
 from open_webui.routers.tasks import (
     generate_queries,
@@ -90,6 +91,7 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
+    StreamFilterPipeline,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
@@ -874,7 +876,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     # Check if the request has chat_id and is inside of a folder
     chat_id = metadata.get("chat_id", None)
     if chat_id and user:
-        chat = Chats.get_chat_by_id_and_user_id(chat_id, user.id)
+        chat = await Chats.get_chat_by_id_and_user_id_async(chat_id, user.id)
         if chat and chat.folder_id:
             folder = Folders.get_folder_by_id_and_user_id(chat.folder_id, user.id)
 
@@ -1235,7 +1237,9 @@ async def process_chat_response(
     request, response, form_data, user, metadata, model, events, tasks
 ):
     async def background_tasks_handler():
-        messages_map = Chats.get_messages_map_by_chat_id(metadata["chat_id"])
+        messages_map = await Chats.get_messages_map_by_chat_id_async(
+            metadata["chat_id"]
+        )
         message = messages_map.get(metadata["message_id"]) if messages_map else None
 
         if message:
@@ -1308,7 +1312,7 @@ async def process_chat_response(
                                 "follow_ups", []
                             )
 
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
@@ -1472,7 +1476,7 @@ async def process_chat_response(
                         else:
                             error = str(error)
 
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1488,7 +1492,7 @@ async def process_chat_response(
                             )
 
                     if "selected_model_id" in response_data:
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1508,7 +1512,9 @@ async def process_chat_response(
                                 }
                             )
 
-                            title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                            title = await Chats.get_chat_title_by_id_async(
+                                metadata["chat_id"]
+                            )
 
                             await event_emitter(
                                 {
@@ -1522,7 +1528,7 @@ async def process_chat_response(
                             )
 
                             # Save message in the database
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
@@ -1532,8 +1538,12 @@ async def process_chat_response(
                             )
 
                             # Send a webhook notification if the user is not active
-                            if not get_active_status_by_user_id(user.id):
-                                webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                            if not await get_active_status_by_user_id(user.id):
+                                webhook_url = (
+                                    await Users.get_user_webhook_url_by_id_async(
+                                        user.id
+                                    )
+                                )
                                 if webhook_url:
                                     await post_webhook(
                                         request.app.state.WEBUI_NAME,
@@ -1995,7 +2005,7 @@ async def process_chat_response(
 
                 return content, content_blocks, end_flag
 
-            message = Chats.get_message_by_id_and_message_id(
+            message = await Chats.get_message_by_id_and_message_id_async(
                 metadata["chat_id"], metadata["message_id"]
             )
 
@@ -2051,7 +2061,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2064,6 +2074,11 @@ async def process_chat_response(
                     nonlocal content_blocks
 
                     response_tool_calls = []
+                    stream_filters = StreamFilterPipeline(
+                        request,
+                        filter_functions,
+                        {"__body__": form_data, **extra_params},
+                    )
 
                     delta_count = 0
                     delta_chunk_size = max(
@@ -2107,13 +2122,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                            data = await stream_filters.process(data)
 
                             if data:
                                 if "event" in data:
@@ -2121,7 +2130,7 @@ async def process_chat_response(
 
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
@@ -2328,8 +2337,13 @@ async def process_chat_response(
                                                 break
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
+                                            await CHAT_MESSAGE_BUFFER.flush(
+                                                metadata["chat_id"],
+                                                metadata["message_id"],
+                                            )
+
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -2895,7 +2909,12 @@ async def process_chat_response(
                             log.debug(e)
                             break
 
-                title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                # Apply buffered message events before the final content is saved
+                await CHAT_MESSAGE_BUFFER.flush(
+                    metadata["chat_id"], metadata["message_id"]
+                )
+
+                title = await Chats.get_chat_title_by_id_async(metadata["chat_id"])
                 data = {
                     "done": True,
                     "content": serialize_content_blocks(content_blocks),
@@ -2904,7 +2923,7 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2913,8 +2932,8 @@ async def process_chat_response(
                     )
 
                 # Send a webhook notification if the user is not active
-                if not get_active_status_by_user_id(user.id):
-                    webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                if not await get_active_status_by_user_id(user.id):
+                    webhook_url = await Users.get_user_webhook_url_by_id_async(user.id)
                     if webhook_url:
                         await post_webhook(
                             request.app.state.WEBUI_NAME,
@@ -2942,7 +2961,7 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2961,26 +2980,18 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filters = StreamFilterPipeline(
+                request, filter_functions, extra_params
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event = await stream_filters.process(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data = await stream_filters.process(data)
 
                 if data:
                     yield data
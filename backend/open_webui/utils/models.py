@@ -2,6 +2,7 @@ import time
 import logging
 import asyncio
 import sys
+from collections import OrderedDict
 
 from aiocache import cached
 from fastapi import Request
@@ -11,6 +12,7 @@ from open_webui.functions import get_function_models
 
 
 from open_webui.models.functions import Functions
+from open_webui.models.groups import Groups
 from open_webui.models.models import Models
 
 
@@ -26,7 +28,12 @@ from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import BYPASS_MODEL_ACCESS_CONTROL, SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    BYPASS_MODEL_ACCESS_CONTROL,
+    MODELS_CACHE_TTL,
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+)
 from open_webui.models.users import UserModel
 
 
@@ -77,17 +84,8 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return function_models + openai_models + ollama_models
 
 
-async def get_all_models(request, refresh: bool = False, user: UserModel = None):
-    if (
-        request.app.state.MODELS
-        and request.app.state.BASE_MODELS
-        and (request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh)
-    ):
-        base_models = request.app.state.BASE_MODELS
-    else:
-        base_models = await get_all_base_models(request, user=user)
-        request.app.state.BASE_MODELS = base_models
-
+def build_models(request, base_models: list, custom_models: list) -> list:
+    """Apply arena models, custom models, actions and filters to the base models."""
     # deep copy the base models to avoid modifying the original list
     models = [model.copy() for model in base_models]
 
@@ -146,7 +144,6 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         for function in Functions.get_functions_by_type("filter", active_only=True)
     ]
 
-    custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             # Applied directly to a base model
@@ -306,9 +303,165 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
                     get_filter_items_from_module(filter_function, function_module)
                 )
 
-    log.debug(f"get_all_models() returned {len(models)} models")
+    return models
+
+
+class ModelRegistry:
+    """
+    Versioned cache of the merged model list.
+
+    Base models fetched from the connections are served stale while a
+    background task re-fetches them once they are older than `ttl` seconds
+    (unless ENABLE_BASE_MODELS_CACHE keeps them until an explicit refresh).
+    The merged list is only rebuilt when the base models were fetched again
+    or a model, function or arena setting was written in this process, and
+    every rebuild bumps `version`. Writes made by other instances are picked
+    up with the next base model fetch.
+
+    Read access is indexed per rebuild, so the models visible to a set of
+    groups are computed once per (version, group set) and shared by every
+    user in those groups.
+    """
+
+    def __init__(self, ttl: int = 1, max_views: int = 256):
+        self.ttl = ttl or 0
+        self.max_views = max_views
+
+        self.version = 0
+        self.models = []
+
+        self._state = None
+        self._base_version = 0
+        self._config_version = 0
+        self._fetched_at = 0.0
+        self._fetch_task = None
+
+        self._public_ids = set()
+        self._group_model_ids = {}  # group_id -> {model_id, ...}
+        self._user_model_ids = {}  # user_id -> {model_id, ...}
+        self._views = OrderedDict()  # (version, group ids) -> {model_id, ...}
+
+    async def _fetch(self, request: Request, user: UserModel = None):
+        request.app.state.BASE_MODELS = await get_all_base_models(request, user=user)
+        self._fetched_at = time.monotonic()
+        self._base_version += 1
+
+    async def fetch(self, request: Request, user: UserModel = None):
+        """Fetch the base models, joining a fetch that is already running."""
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._fetch(request, user))
+        await asyncio.shield(self._fetch_task)
+
+    def revalidate(self, request: Request, user: UserModel = None):
+        """Fetch the base models in the background."""
+        if self._fetch_task is not None and not self._fetch_task.done():
+            return
+
+        async def revalidate_task():
+            try:
+                await self._fetch(request, user)
+            except Exception as e:
+                log.exception(f"Error refreshing base models: {e}")
+
+        self._fetch_task = asyncio.create_task(revalidate_task())
+
+    def invalidate(self):
+        """Rebuild the merged list on the next read, e.g. after a config write."""
+        self._config_version += 1
+
+    async def get_models(
+        self, request: Request, refresh: bool = False, user: UserModel = None
+    ) -> list:
+        if refresh or not request.app.state.BASE_MODELS:
+            await self.fetch(request, user)
+        elif (
+            not request.app.state.config.ENABLE_BASE_MODELS_CACHE
+            and time.monotonic() - self._fetched_at > self.ttl
+        ):
+            self.revalidate(request, user)
+
+        base_models = request.app.state.BASE_MODELS
+        if not base_models:
+            return []
+
+        state = (
+            self._base_version,
+            self._config_version,
+            Models.version,
+            Functions.version,
+        )
+        if state != self._state or not request.app.state.MODELS:
+            custom_models = Models.get_all_models()
+            models = build_models(request, base_models, custom_models)
+            self._index(models, custom_models)
+
+            self.models = models
+            self.version += 1
+            self._state = state
+            request.app.state.MODELS = {model["id"]: model for model in models}
+            log.debug(f"Rebuilt {len(models)} models (registry version {self.version})")
+
+        return self.models
+
+    def _index(self, models: list, custom_models: list):
+        custom_models_by_id = {model.id: model for model in custom_models}
+
+        public_ids = set()
+        group_model_ids = {}
+        user_model_ids = {}
+        for model in models:
+            if model.get("arena"):
+                access_control = (
+                    model.get("info", {}).get("meta", {}).get("access_control", {})
+                )
+            else:
+                model_info = custom_models_by_id.get(model["id"])
+                if not model_info:
+                    # Models without a model entry are only visible when bypassing access control
+                    continue
+
+                access_control = model_info.access_control
+                user_model_ids.setdefault(model_info.user_id, set()).add(model["id"])
+
+            if access_control is None:
+                public_ids.add(model["id"])
+                continue
+
+            read = access_control.get("read", {})
+            for group_id in read.get("group_ids", []):
+                group_model_ids.setdefault(group_id, set()).add(model["id"])
+            for user_id in read.get("user_ids", []):
+                user_model_ids.setdefault(user_id, set()).add(model["id"])
+
+        self._public_ids = public_ids
+        self._group_model_ids = group_model_ids
+        self._user_model_ids = user_model_ids
+        self._views.clear()
+
+    def get_accessible_model_ids(self, user: UserModel) -> set:
+        group_ids = frozenset(Groups.get_group_ids_by_member_id(user.id))
+
+        key = (self.version, group_ids)
+        model_ids = self._views.get(key)
+        if model_ids is None:
+            model_ids = self._public_ids.union(
+                *(self._group_model_ids.get(group_id, ()) for group_id in group_ids)
+            )
+            self._views[key] = model_ids
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(key)
+
+        return model_ids | self._user_model_ids.get(user.id, set())
 
-    request.app.state.MODELS = {model["id"]: model for model in models}
+
+MODEL_REGISTRY = ModelRegistry(ttl=MODELS_CACHE_TTL)
+
+
+async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    models = await MODEL_REGISTRY.get_models(request, refresh=refresh, user=user)
+    log.debug(f"get_all_models() returned {len(models)} models")
     return models
 
 
@@ -341,32 +494,7 @@ def get_filtered_models(models, user):
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
-        filtered_models = []
-        for model in models:
-            if model.get("arena"):
-                if has_access(
-                    user.id,
-                    type="read",
-                    access_control=model.get("info", {})
-                    .get("meta", {})
-                    .get("access_control", {}),
-                ):
-                    filtered_models.append(model)
-                continue
-
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if (
-                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or user.id == model_info.user_id
-                    or has_access(
-                        user.id,
-                        type="read",
-                        access_control=model_info.access_control,
-                    )
-                ):
-                    filtered_models.append(model)
-
-        return filtered_models
+        model_ids = MODEL_REGISTRY.get_accessible_model_ids(user)
+        return [model for model in models if model["id"] in model_ids]
     else:
         return models
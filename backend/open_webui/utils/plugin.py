@@ -75,10 +75,9 @@ def load_tool_module_by_id(tool_id, content=None):
         if not tool:
             raise Exception(f"Toolkit not found: {tool_id}")
 
-        content = tool.content
-
-        content = replace_imports(content)
-        Tools.update_tool_by_id(tool_id, {"content": content})
+        content = replace_imports(tool.content)
+        if content != tool.content:
+            Tools.update_tool_content_by_id(tool_id, content)
     else:
         frontmatter = extract_frontmatter(content)
         # Install required packages found within the frontmatter
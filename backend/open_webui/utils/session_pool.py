@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ClientSessionPool:
+    """
+    Long-lived aiohttp sessions for upstream backends, one per origin.
+
+    Requests to the same backend reuse kept-alive connections (and cached
+    DNS lookups) instead of opening a new TCP/TLS connection per call. Each
+    origin gets its own connector limited to `limit_per_host` concurrent
+    connections (0 for no limit). Requests that do not pass a timeout of
+    their own get aiohttp's default of 300 seconds, like a new session would.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = 100,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        # (origin, event loop) -> session; sessions cannot be shared between loops
+        self._sessions = {}
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        key = (self.get_origin(url), asyncio.get_running_loop())
+
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                # Sessions are shared between users, never keep upstream cookies
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trust_env=True,
+            )
+            self._sessions[key] = session
+        return session
+
+    def get_stats(self) -> dict:
+        """Connection usage per origin."""
+        stats = {}
+        for (origin, _), session in list(self._sessions.items()):
+            connector = session.connector
+            if session.closed or connector is None:
+                continue
+
+            in_use = len(getattr(connector, "_acquired", ()))
+            idle = sum(
+                len(conns) for conns in getattr(connector, "_conns", {}).values()
+            )
+            waiting = sum(
+                len(waiters) for waiters in getattr(connector, "_waiters", {}).values()
+            )
+
+            origin_stats = stats.setdefault(
+                origin, {"in_use": 0, "idle": 0, "waiting": 0}
+            )
+            origin_stats["in_use"] += in_use
+            origin_stats["idle"] += idle
+            origin_stats["waiting"] += waiting
+
+        for origin_stats in stats.values():
+            origin_stats["saturation"] = (
+                origin_stats["in_use"] / self.limit_per_host
+                if self.limit_per_host
+                else 0.0
+            )
+        return stats
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                log.debug(f"Error closing client session: {e}")
+
+
+CLIENT_SESSION_POOL = ClientSessionPool(
+    limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    keepalive_timeout=AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+)
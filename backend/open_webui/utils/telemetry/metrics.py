@@ -8,6 +8,10 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* webui.http_client.connections.{in_use,idle,waiting} (gauges, per origin)
+* webui.db.connections.{in_use,idle} (gauges, per engine)
+* webui.db.connections.checkouts (counter, per engine)
+* webui.db.connections.hold_time (gauge, average milliseconds, per engine)
 
 Attributes used: http.method, http.route, http.status_code
 
@@ -18,7 +22,7 @@ high-cardinality label sets.
 from __future__ import annotations
 
 import time
-from typing import Dict, List, Sequence, Any
+from typing import Callable, Dict, List, Sequence, Any
 from base64 import b64encode
 
 from fastapi import FastAPI, Request
@@ -45,7 +49,9 @@ from open_webui.env import (
     OTEL_METRICS_OTLP_SPAN_EXPORTER,
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
 )
-from open_webui.socket.main import get_active_user_ids
+from open_webui.socket.main import get_active_user_count
+from open_webui.utils.session_pool import CLIENT_SESSION_POOL
+from open_webui.internal.db import POOL_METRICS
 from open_webui.models.users import Users
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
@@ -132,7 +138,7 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
     ) -> Sequence[metrics.Observation]:
         return [
             metrics.Observation(
-                value=len(get_active_user_ids()),
+                value=get_active_user_count(),
             )
         ]
 
@@ -159,6 +165,81 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_active_users],
     )
 
+    def observe_client_connections(
+        key: str,
+    ) -> Callable[[metrics.CallbackOptions], Sequence[metrics.Observation]]:
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(value=stats[key], attributes={"origin": origin})
+                for origin, stats in CLIENT_SESSION_POOL.get_stats().items()
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        name="webui.http_client.connections.in_use",
+        description="Upstream connections in use, per origin",
+        unit="connections",
+        callbacks=[observe_client_connections("in_use")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.http_client.connections.idle",
+        description="Idle kept-alive upstream connections, per origin",
+        unit="connections",
+        callbacks=[observe_client_connections("idle")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.http_client.connections.waiting",
+        description="Requests waiting for a free upstream connection, per origin",
+        unit="requests",
+        callbacks=[observe_client_connections("waiting")],
+    )
+
+    def observe_db_connections(
+        key: str,
+    ) -> Callable[[metrics.CallbackOptions], Sequence[metrics.Observation]]:
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(value=stats[key], attributes={"engine": name})
+                for name, stats in POOL_METRICS.get_stats().items()
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        name="webui.db.connections.in_use",
+        description="Database connections checked out of the pool, per engine",
+        unit="connections",
+        callbacks=[observe_db_connections("in_use")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.db.connections.idle",
+        description="Idle database connections in the pool, per engine",
+        unit="connections",
+        callbacks=[observe_db_connections("idle")],
+    )
+
+    meter.create_observable_counter(
+        name="webui.db.connections.checkouts",
+        description="Database connection checkouts, per engine",
+        unit="1",
+        callbacks=[observe_db_connections("checkouts")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.db.connections.hold_time",
+        description="Average time a database connection is checked out, per engine",
+        unit="ms",
+        callbacks=[observe_db_connections("avg_hold_ms")],
+    )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):
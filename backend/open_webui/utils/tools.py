@@ -6,6 +6,7 @@ import aiohttp
 import asyncio
 import yaml
 import json
+import time
 
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
@@ -23,6 +24,7 @@ from typing import (
     Optional,
     Type,
 )
+from collections import OrderedDict
 from functools import update_wrapper, partial
 
 
@@ -36,9 +38,11 @@ from langchain_core.utils.function_calling import (
 
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
-from open_webui.utils.plugin import load_tool_module_by_id
+from open_webui.utils.misc import calculate_sha256_string
+from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
 from open_webui.env import (
     SRC_LOG_LEVELS,
+    TOOLS_CACHE_TTL,
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
@@ -94,7 +98,7 @@ async def get_tools(
     tools_dict = {}
 
     for tool_id in tool_ids:
-        tool = Tools.get_tool_by_id(tool_id)
+        tool = TOOL_REGISTRY.get_tool(request, tool_id)
         if tool is None:
 
             if tool_id.startswith("server:"):
@@ -210,35 +214,16 @@ async def get_tools(
             else:
                 continue
         else:
-            module = request.app.state.TOOLS.get(tool_id, None)
-            if module is None:
-                module, _ = load_tool_module_by_id(tool_id)
-                request.app.state.TOOLS[tool_id] = module
-
+            module = tool["module"]
             extra_params["__id__"] = tool_id
 
-            # Set valves for the tool
-            if hasattr(module, "valves") and hasattr(module, "Valves"):
-                valves = Tools.get_tool_valves_by_id(tool_id) or {}
-                module.valves = module.Valves(**valves)
             if hasattr(module, "UserValves"):
                 extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
                     **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
                 )
 
-            for spec in tool.specs:
-                # TODO: Fix hack for OpenAI API
-                # Some times breaks OpenAI but others don't. Leaving the comment
-                for val in spec.get("parameters", {}).get("properties", {}).values():
-                    if val.get("type") == "str":
-                        val["type"] = "string"
-
-                # Remove internal reserved parameters (e.g. __id__, __user__)
-                spec["parameters"]["properties"] = {
-                    key: val
-                    for key, val in spec["parameters"]["properties"].items()
-                    if not key.startswith("__")
-                }
+            for spec in tool["specs"]:
+                spec = copy.deepcopy(spec)
 
                 # convert to function that takes only model params and inserts custom params
                 function_name = spec["name"]
@@ -247,13 +232,6 @@ async def get_tools(
                     tool_function, extra_params
                 )
 
-                # TODO: Support Pydantic models as parameters
-                if callable.__doc__ and callable.__doc__.strip() != "":
-                    s = re.split(":(param|return)", callable.__doc__, 1)
-                    spec["description"] = s[0]
-                else:
-                    spec["description"] = function_name
-
                 tool_dict = {
                     "tool_id": tool_id,
                     "callable": callable,
@@ -516,32 +494,202 @@ def convert_openapi_to_tool_payload(openapi_spec):
     return tool_payload
 
 
-async def set_tool_servers(request: Request):
-    request.app.state.TOOL_SERVERS = await get_tool_servers_data(
-        request.app.state.config.TOOL_SERVER_CONNECTIONS
-    )
+class ToolRegistry:
+    """
+    Caches loaded tools with their prepared specs, and the tool servers' data.
+
+    A tool module is only reloaded when the content of the tool changes, and
+    its specs are read again when the tool is updated. Updates made through
+    `Tools` in this process are picked up on the next lookup, updates made by
+    other replicas within `ttl` seconds by a check in the background, which
+    also fetches the tool server specs again. Valves are read on every lookup,
+    so that changes made on any replica apply to the next call. Tool payloads
+    converted from OpenAPI documents are cached by the hash of the document.
+    """
+
+    def __init__(self, ttl: int = 300, max_openapi_payloads: int = 64):
+        self.ttl = ttl
+        self.max_openapi_payloads = max_openapi_payloads
+
+        self._tools = {}  # tool id -> entry
+        self._version = Tools.version
+        self._checked_at = time.time()
+        self._check_task = None
+
+        self._openapi_payloads = OrderedDict()  # document hash -> tool payload
+        self._servers_hash = None
+        self._servers_fetched_at = 0
+        self._servers_task = None
+
+    def _load_tool(self, request: Request, tool_id: str) -> Optional[dict]:
+        tool = Tools.get_tool_by_id(tool_id)
+        if tool is None:
+            self._tools.pop(tool_id, None)
+            return None
+
+        content_hash = calculate_sha256_string(replace_imports(tool.content))
+
+        entry = self._tools.get(tool_id)
+        if entry is not None and entry["hash"] == content_hash:
+            module = entry["module"]
+        else:
+            module, _ = load_tool_module_by_id(tool_id)
+            request.app.state.TOOLS[tool_id] = module
+
+        specs = copy.deepcopy(tool.specs)
+        for spec in specs:
+            # TODO: Fix hack for OpenAI API
+            # Some times breaks OpenAI but others don't. Leaving the comment
+            for val in spec.get("parameters", {}).get("properties", {}).values():
+                if val.get("type") == "str":
+                    val["type"] = "string"
+
+            # Remove internal reserved parameters (e.g. __id__, __user__)
+            spec["parameters"]["properties"] = {
+                key: val
+                for key, val in spec["parameters"]["properties"].items()
+                if not key.startswith("__")
+            }
+
+            # TODO: Support Pydantic models as parameters
+            doc = getattr(module, spec["name"]).__doc__
+            if doc and doc.strip() != "":
+                spec["description"] = re.split(":(param|return)", doc, 1)[0]
+            else:
+                spec["description"] = spec["name"]
+
+        entry = {
+            "updated_at": tool.updated_at,
+            "hash": content_hash,
+            "module": module,
+            "specs": specs,
+        }
+        self._tools[tool_id] = entry
+        return entry
+
+    def _check_tools(self, request: Request):
+        tool_ids = list(self._tools)
+        updated_at = Tools.get_tool_updated_at_by_ids(tool_ids)
+
+        for tool_id in tool_ids:
+            entry = self._tools.get(tool_id)
+            if tool_id not in updated_at:
+                self._tools.pop(tool_id, None)
+            elif entry is None or entry["updated_at"] != updated_at[tool_id]:
+                try:
+                    self._load_tool(request, tool_id)
+                except Exception as e:
+                    log.exception(f"Error reloading tool {tool_id}: {e}")
+                    self._tools.pop(tool_id, None)
+
+        self._checked_at = time.time()
 
-    if request.app.state.redis is not None:
-        await request.app.state.redis.set(
-            "tool_servers", json.dumps(request.app.state.TOOL_SERVERS)
+    async def _check_tools_in_background(self, request: Request):
+        try:
+            await asyncio.to_thread(self._check_tools, request)
+        except Exception as e:
+            log.exception(f"Error checking tools: {e}")
+
+    def get_tool(self, request: Request, tool_id: str) -> Optional[dict]:
+        if self._version != Tools.version:
+            self._version = Tools.version
+            self._check_tools(request)
+        elif time.time() - self._checked_at > self.ttl and (
+            self._check_task is None or self._check_task.done()
+        ):
+            self._checked_at = time.time()
+            self._check_task = asyncio.create_task(
+                self._check_tools_in_background(request)
+            )
+
+        entry = self._tools.get(tool_id)
+        if entry is None:
+            entry = self._load_tool(request, tool_id)
+
+        if entry is None:
+            return None
+
+        # Set valves for the tool
+        module = entry["module"]
+        if hasattr(module, "valves") and hasattr(module, "Valves"):
+            valves = Tools.get_tool_valves_by_id(tool_id) or {}
+            module.valves = module.Valves(**valves)
+        return entry
+
+    def get_openapi_tool_payload(self, openapi_spec: dict, document_hash: str):
+        payload = self._openapi_payloads.get(document_hash)
+        if payload is None:
+            payload = convert_openapi_to_tool_payload(openapi_spec)
+            self._openapi_payloads[document_hash] = payload
+            if len(self._openapi_payloads) > self.max_openapi_payloads:
+                self._openapi_payloads.popitem(last=False)
+        else:
+            self._openapi_payloads.move_to_end(document_hash)
+
+        return copy.deepcopy(payload)
+
+    async def set_tool_servers(self, request: Request):
+        tool_servers = await get_tool_servers_data(
+            request.app.state.config.TOOL_SERVER_CONNECTIONS
         )
+        tool_servers_json = json.dumps(tool_servers)
 
-    return request.app.state.TOOL_SERVERS
+        request.app.state.TOOL_SERVERS = tool_servers
+        self._servers_hash = calculate_sha256_string(tool_servers_json)
+        self._servers_fetched_at = time.time()
 
+        if request.app.state.redis is not None:
+            # Other replicas only load the servers again when the hash changes
+            async with request.app.state.redis.pipeline() as pipe:
+                pipe.set("tool_servers", tool_servers_json)
+                pipe.set("tool_servers:hash", self._servers_hash)
+                await pipe.execute()
 
-async def get_tool_servers(request: Request):
-    tool_servers = []
-    if request.app.state.redis is not None:
+        return tool_servers
+
+    async def _set_tool_servers_in_background(self, request: Request):
         try:
-            tool_servers = json.loads(await request.app.state.redis.get("tool_servers"))
-            request.app.state.TOOL_SERVERS = tool_servers
+            await self.set_tool_servers(request)
         except Exception as e:
-            log.error(f"Error fetching tool_servers from Redis: {e}")
+            log.exception(f"Error refreshing tool servers: {e}")
+
+    async def get_tool_servers(self, request: Request):
+        tool_servers = request.app.state.TOOL_SERVERS
+        if request.app.state.redis is not None:
+            try:
+                servers_hash = await request.app.state.redis.get("tool_servers:hash")
+                if servers_hash and servers_hash != self._servers_hash:
+                    tool_servers = json.loads(
+                        await request.app.state.redis.get("tool_servers")
+                    )
+                    request.app.state.TOOL_SERVERS = tool_servers
+                    self._servers_hash = servers_hash
+            except Exception as e:
+                log.error(f"Error fetching tool_servers from Redis: {e}")
 
-    if not tool_servers:
-        tool_servers = await set_tool_servers(request)
+        if not tool_servers:
+            return await self.set_tool_servers(request)
 
-    return tool_servers
+        if time.time() - self._servers_fetched_at > self.ttl and (
+            self._servers_task is None or self._servers_task.done()
+        ):
+            self._servers_fetched_at = time.time()
+            self._servers_task = asyncio.create_task(
+                self._set_tool_servers_in_background(request)
+            )
+
+        return tool_servers
+
+
+TOOL_REGISTRY = ToolRegistry(ttl=TOOLS_CACHE_TTL)
+
+
+async def set_tool_servers(request: Request):
+    return await TOOL_REGISTRY.set_tool_servers(request)
+
+
+async def get_tool_servers(request: Request):
+    return await TOOL_REGISTRY.get_tool_servers(request)
 
 
 async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
@@ -591,10 +739,12 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
     data = {
         "openapi": res,
         "info": res.get("info", {}),
-        "specs": convert_openapi_to_tool_payload(res),
+        "specs": TOOL_REGISTRY.get_openapi_tool_payload(
+            res, calculate_sha256_string(text_content)
+        ),
     }
 
-    log.info(f"Fetched data: {data}")
+    log.debug(f"Fetched data: {data}")
     return data
 
 